@@ -0,0 +1,157 @@
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class Overloaded(Exception):
+    """A request shed by admission control; status is 429 (queue full) or 503 (waited too long)"""
+    
+    def __init__(self, status, message, retry_after):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AdmissionQueue:
+    """
+    Bounded admission for expensive requests.
+    
+    At most concurrency requests run at once; up to max_queue more wait in
+    FIFO order, each for at most max_wait seconds. A finishing request hands
+    its slot straight to the oldest waiter, so waits stay ordered and
+    bounded instead of piling up behind whoever wins the lock. Anything
+    beyond that is shed at once: 429 when the queue is full, 503 when a
+    wait times out, both with a Retry-After estimated from the recent
+    service time.
+    """
+    
+    def __init__(self, concurrency=4, max_queue=64, max_wait=5.0):
+        if concurrency < 1 or max_queue < 0:
+            raise ValueError('concurrency must be at least 1 and max_queue non-negative')
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self.admitted = 0
+        self.shed = {'queue_full': 0, 'timeout': 0}
+        self.wait_seconds = 0.0
+        self.service_seconds = 0.05
+        self._waiters = deque()
+        self._lock = threading.Lock()
+    
+    @property
+    def depth(self):
+        return len(self._waiters)
+    
+    def retry_after(self):
+        """Whole seconds until the current backlog should have drained"""
+        backlog = len(self._waiters) + self.active
+        return max(1, math.ceil(backlog * self.service_seconds / self.concurrency))
+    
+    @contextmanager
+    def admit(self):
+        """Hold a slot for the body of the with block; yields the seconds spent queued"""
+        start = time.perf_counter()
+        waiter = None
+        with self._lock:
+            if self.active < self.concurrency and not self._waiters:
+                self.active += 1
+            elif len(self._waiters) >= self.max_queue:
+                self.shed['queue_full'] += 1
+                raise Overloaded(429, 'Too many evaluations in progress, retry shortly', self.retry_after())
+            else:
+                waiter = threading.Event()
+                self._waiters.append(waiter)
+        
+        if waiter is not None and not waiter.wait(self.max_wait):
+            with self._lock:
+                # The slot may have been handed over between the timeout and taking the lock
+                if not waiter.is_set():
+                    self._waiters.remove(waiter)
+                    self.shed['timeout'] += 1
+                    raise Overloaded(503, 'Evaluation queue is saturated, retry shortly', self.retry_after())
+        
+        started = time.perf_counter()
+        with self._lock:
+            self.admitted += 1
+            self.wait_seconds += started - start
+        try:
+            yield started - start
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                # Exponentially weighted service time for Retry-After estimates
+                self.service_seconds += (elapsed - self.service_seconds) * 0.1
+                if self._waiters:
+                    self._waiters.popleft().set()
+                else:
+                    self.active -= 1
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'concurrency': self.concurrency,
+                'active': self.active,
+                'queue_depth': len(self._waiters),
+                'max_queue': self.max_queue,
+                'admitted': self.admitted,
+                'shed': dict(self.shed),
+                'wait_seconds': self.wait_seconds,
+                'service_seconds': self.service_seconds
+            }
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error')
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution.
+    
+    The first caller (the leader) runs the function; callers arriving with
+    the same key while it runs wait for and share its result, or its
+    exception. Nothing is cached once the call completes.
+    """
+    
+    def __init__(self):
+        self.coalesced = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+    
+    def do(self, key, func):
+        """(result, shared) where shared is True when another caller computed it"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+        
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+        
+        try:
+            flight.result = func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+    
+    def in_flight(self):
+        return len(self._flights)
@@ -1,67 +1,720 @@
-from flask import Flask, render_template, request, jsonify
-from evaluation_ai import evaluator
+import time
+STARTUP_BEGAN = time.perf_counter()  # cold-start clock for the startup gauges on /metrics
+
+from flask import Flask, Response, g, render_template, request, jsonify, stream_with_context
+from admission import AdmissionQueue, Overloaded, SingleFlight
+from bulk_import import RowError, chunked, iter_rows, upload_format
+import evaluation_ai
+from evaluation_cache import EvaluationCache
+from evaluation_result import dumps, dumps_many
+from department_reports import DepartmentReports, slug
+from evaluation_store import EvaluationStore
+from growth_model import promotion_ready
+from http_cache import StaticPage, compress_response, input_etag
+from job_queue import JobManager
+from metrics import Metrics, admission_collector, cache_collector
+from risk_model import RISKS, rank_workforce
+from rubrics import DEFAULT_RUBRICS_DIR, RubricRegistry
 from datetime import datetime
+import json
 import os
+import threading
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-123')
 
+# 'lru' fills lazily; 'table' precomputes the whole score grid when the evaluator is first needed
+EVALUATION_CACHE_MODE = os.environ.get('EVALUATION_CACHE_MODE', 'lru')
+EVALUATION_CACHE_SIZE = int(os.environ.get('EVALUATION_CACHE_SIZE', 65536))
+
+# Evaluation history, one pooled SQLite connection per worker
+evaluation_store = EvaluationStore(os.environ.get('EVALUATION_DB_PATH', 'evaluations.db'))
+
+# Bulk re-scoring of the archive on a process pool, checkpointed under EVALUATION_JOBS_DIR
+job_manager = JobManager(evaluation_store.path, os.environ.get('EVALUATION_JOBS_DIR', 'jobs'))
+
+# Department report packets rendered on their own process pool, EVALUATION_REPORT_WORKERS wide (default: one per core)
+report_workers = os.environ.get('EVALUATION_REPORT_WORKERS')
+department_reports = DepartmentReports(evaluation_store, int(report_workers) if report_workers else None)
+
+# Latency histograms and counters on /metrics; off unless EVALUATION_METRICS=1
+metrics = Metrics(enabled=os.environ.get('EVALUATION_METRICS', '0') == '1')
+
+# At most EVALUATION_CONCURRENCY evaluations run at once and EVALUATION_QUEUE_SIZE more wait up to
+# EVALUATION_QUEUE_TIMEOUT seconds; beyond that requests are shed with 429/503 and a Retry-After
+admission = AdmissionQueue(
+    concurrency=int(os.environ.get('EVALUATION_CONCURRENCY', 4)),
+    max_queue=int(os.environ.get('EVALUATION_QUEUE_SIZE', 64)),
+    max_wait=float(os.environ.get('EVALUATION_QUEUE_TIMEOUT', 5))
+)
+# Identical /evaluate submissions in flight at the same time share one evaluation
+coalescer = SingleFlight()
+metrics.collect(admission_collector(admission, coalescer))
+
+# Compiled rubrics per department; EVALUATION_RUBRIC_RELOAD=<seconds> re-reads changed files while serving
+rubric_reload = os.environ.get('EVALUATION_RUBRIC_RELOAD')
+rubric_registry = RubricRegistry(DEFAULT_RUBRICS_DIR, float(rubric_reload) if rubric_reload else None)
+
+# One evaluator and cache per compiled rubric version, all sharing the population statistics
+rubric_caches = {}
+rubric_caches_lock = threading.Lock()
+evaluator_state = {'cache': None}
+
+def default_cache():
+    """
+    Cache of the shared evaluator. evaluation_ai builds the evaluator on first
+    access, so neither exists until the warm-up or the first request needs them.
+    """
+    cache = evaluator_state['cache']
+    if cache is None:
+        with rubric_caches_lock:
+            cache = evaluator_state['cache']
+            if cache is None:
+                evaluator = metrics.instrument(evaluation_ai.evaluator)
+                cache = EvaluationCache(evaluator, mode=EVALUATION_CACHE_MODE, maxsize=EVALUATION_CACHE_SIZE)
+                metrics.collect(cache_collector(cache))
+                rubric_caches[evaluator.rubric.version] = evaluator_state['cache'] = cache
+    return cache
+
+def cache_for(department):
+    """Evaluation cache of the department's rubric; rubrics first seen after startup get an 'lru' cache"""
+    evaluator = default_cache().evaluator
+    rubric = rubric_registry.for_department(department)
+    cache = rubric_caches.get(rubric.version)
+    if cache is None:
+        with rubric_caches_lock:
+            cache = rubric_caches.get(rubric.version)
+            if cache is None:
+                rubric_evaluator = metrics.instrument(evaluator.with_rubric(rubric))
+                if rubric_evaluator.benchmarks is not evaluator.benchmarks:
+                    rubric_evaluator.load_benchmarks(evaluation_store)
+                cache = EvaluationCache(rubric_evaluator, mode='lru', maxsize=EVALUATION_CACHE_SIZE)
+                # A reload may have superseded this rubric meanwhile; serve it once but keep no cache for it
+                if rubric.version in rubric_registry.versions:
+                    rubric_caches[rubric.version] = cache
+    return cache
+
+def evict_rubric_caches():
+    """Drop the caches of rubric versions the last reload superseded"""
+    with rubric_caches_lock:
+        for version in [version for version in rubric_caches if version not in rubric_registry.versions]:
+            del rubric_caches[version]
+
+if rubric_registry.check_interval is not None:
+    @app.before_request
+    def reload_rubrics():
+        if rubric_registry.maybe_reload():
+            evict_rubric_caches()
+
+if metrics.enabled:
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+    
+    @app.after_request
+    def record_request(response):
+        endpoint = request.endpoint or 'unknown'
+        metrics.request_seconds.observe(time.perf_counter() - g.request_started, (('endpoint', endpoint),))
+        metrics.count(metrics.requests, endpoint=endpoint, method=request.method, status=response.status_code)
+        return response
+
+# gzip (and brotli when installed) for compressible responses, negotiated per request
+if os.environ.get('EVALUATION_COMPRESSION', '1') == '1':
+    @app.after_request
+    def compress(response):
+        return compress_response(request, response)
+
+# Seed population percentiles and peer benchmarks from everything already stored
+def warm_up_population():
+    try:
+        default_cache().evaluator.load_population(evaluation_store)
+    except Exception as e:
+        app.logger.warning('Population warm-up skipped: %s', e)
+
+# Serverless cold starts: EVALUATION_FAST_START=1 defers the warm-up to the first request
+FAST_START = os.environ.get('EVALUATION_FAST_START', '0') == '1'
+startup = {'import_seconds': None, 'first_response_seconds': None, 'warmed_up': not FAST_START}
+startup_lock = threading.Lock()
+
+if FAST_START:
+    @app.before_request
+    def deferred_warm_up():
+        if not startup['warmed_up']:
+            with startup_lock:
+                if not startup['warmed_up']:
+                    warm_up_population()
+                    startup['warmed_up'] = True
+else:
+    warm_up_population()
+
+@app.after_request
+def record_first_response(response):
+    if startup['first_response_seconds'] is None:
+        startup['first_response_seconds'] = time.perf_counter() - STARTUP_BEGAN
+    return response
+
+def startup_collector():
+    """Cold-start gauges, measured from the first line of this module"""
+    labels = {'fast_start': str(int(FAST_START))}
+    gauges = [('app_startup_import_seconds', 'Seconds to import the app', startup['import_seconds']),
+              ('app_startup_first_response_seconds', 'Seconds from import to the first response',
+               startup['first_response_seconds'])]
+    return [(name, 'gauge', help_text, value, labels) for name, help_text, value in gauges if value is not None]
+
+metrics.collect(startup_collector)
+
+# The index page has no per-request content: render it once, serve it with cache headers
+index_page = StaticPage(lambda: render_template('index.html'))
+
 @app.route('/')
 def home():
-    return render_template('index.html')
+    return index_page.response(request, Response)
+
+def build_employee_info(source, tenure_months):
+    """Employee fields echoed back with every evaluation"""
+    return {
+        'name': source.get('employee_name', 'Employee'),
+        'employee_id': source.get('employee_id', ''),
+        'department': source.get('department', 'General'),
+        'position': source.get('position', 'Staff'),
+        'period': source.get('period', 'Q1 2024'),
+        'reviewer_name': source.get('reviewer_name', 'Manager'),
+        'tenure_months': tenure_months,
+        'evaluation_date': datetime.now().strftime('%B %d, %Y')
+    }
+
+# Fields added by the app rather than the evaluator, and what they are derived from
+RESPONSE_ONLY_FIELDS = ('name', 'employee_id', 'department', 'position', 'period', 'reviewer_name',
+                        'tenure_months', 'evaluation_date', 'ai_score', 'confidence', 'predicted_growth',
+                        'benchmark_comparison')
+UI_FIELD_SOURCES = {'benchmark_comparison': ('role_benchmark', 'tenure_benchmark')}
+
+# Always evaluated so the stored history row is complete whatever the client selected
+PERSISTED_FIELDS = ('overall_score', 'detailed_scores', 'performance_level', 'promotion_readiness',
+                    'evaluation_timestamp')
+
+def parse_selection(source):
+    """Comma-separated layers= and fields= from a request, None when absent"""
+    def split(name):
+        value = source.get(name)
+        return [item.strip() for item in value.split(',') if item.strip()] if value else None
+    return split('layers'), split('fields')
+
+def response_fields(evaluator, layers, fields):
+    """Response keys for a layers=/fields= selection, or None for the full result"""
+    if layers is None and fields is None:
+        return None
+    evaluator.select_layers(layers, [field for field in fields or () if field not in RESPONSE_ONLY_FIELDS])
+    wanted = list(fields or ())
+    for layer in layers or ():
+        wanted.extend(evaluator.LAYER_FIELDS[layer])
+    return wanted
+
+def evaluator_fields(wanted):
+    """Evaluator output needed to build the selected response and the stored row"""
+    if wanted is None:
+        return None
+    needed = [field for field in wanted if field not in RESPONSE_ONLY_FIELDS]
+    for field in wanted:
+        needed.extend(UI_FIELD_SOURCES.get(field, ()))
+    return needed + [field for field in PERSISTED_FIELDS if field not in needed]
+
+def error_response(endpoint, message, kind='validation'):
+    """Count the error and return it in the usual {'error': ...} shape"""
+    metrics.count(metrics.errors, endpoint=endpoint, kind=kind)
+    return jsonify({'error': message})
+
+def shed_response(endpoint, overloaded):
+    """429/503 with Retry-After for a request turned away by admission control"""
+    metrics.count(metrics.errors, endpoint=endpoint, kind='overloaded')
+    response = jsonify({'error': str(overloaded)})
+    response.status_code = overloaded.status
+    response.headers['Retry-After'] = str(overloaded.retry_after)
+    return response
+
+def admitted(endpoint, func):
+    """Run func once an evaluation slot is free; raises Overloaded when it is shed instead"""
+    with admission.admit() as waited:
+        metrics.observe(metrics.queue_wait_seconds, waited, endpoint=endpoint)
+        return func()
+
+def state_etag(inputs, versions, evaluation_date, evaluator):
+    """
+    input_etag() that also covers the store and the learned population: the
+    latest stored evaluation id and the population version. Computed again
+    after storing, it is the tag of the response just produced.
+    """
+    return input_etag(inputs, versions, evaluation_date, evaluation_store.last_id(), evaluator.population_version())
+
+def not_modified(etag):
+    """304 for a client that already holds the response to these exact inputs"""
+    response = Response(status=304)
+    response.set_etag(etag, weak=True)
+    return response
+
+def add_ui_fields(result):
+    """Add enhanced fields for UI"""
+    result['ai_score'] = round(result['overall_score'] * 0.95 + 0.5, 2)
+    result['confidence'] = "High" if result['overall_score'] >= 7 else "Medium"
+    result['predicted_growth'] = "Strong" if result['overall_score'] >= 7 else "Moderate"
+    if 'role_benchmark' in result:
+        role_benchmark = result['role_benchmark']
+        result['benchmark_comparison'] = (role_benchmark['status'] if 'peer_count' in role_benchmark
+                                          else result['tenure_benchmark']['status'])
+    return result
 
 @app.route('/evaluate', methods=['POST'])
 def evaluate_performance():
     try:
-        # Get form data
-        scores = {
-            'quality_of_work': int(request.form.get('quality_of_work', 5)),
-            'productivity': int(request.form.get('productivity', 5)),
-            'teamwork': int(request.form.get('teamwork', 5)),
-            'communication': int(request.form.get('communication', 5)),
-            'initiative': int(request.form.get('initiative', 5))
-        }
+        with metrics.stage('evaluate_performance', 'parse'):
+            # The department's rubric decides which criteria are scored
+            cache = cache_for(request.form.get('department', 'General'))
+            
+            # Get form data
+            scores = {key: int(request.form.get(key, 5)) for key in cache.evaluator.rubric.criteria}
+            
+            # Validate scores
+            for key, value in scores.items():
+                if value < 1 or value > 10:
+                    return error_response('evaluate_performance', f'{key} must be between 1 and 10')
+            
+            # Get additional parameters
+            tenure_months = int(request.form.get('tenure_months', 12))
+            
+            # Employee info
+            employee_info = build_employee_info(request.form, tenure_months)
+            
+            # Optional layers=/fields= selection (form or query string) for lean responses
+            try:
+                wanted = response_fields(cache.evaluator, *parse_selection(request.values))
+            except ValueError as e:
+                return error_response('evaluate_performance', str(e))
+            
+            # An identical resubmission is answered from the client's copy, without re-evaluating or storing,
+            # while nothing has been stored or learned since that copy (history and percentiles shape it)
+            inputs = list(request.values.items(multi=True))
+            versions = (cache.evaluator.rubric.version, cache.evaluator.risk_model.version)
+            etag = state_etag(inputs, versions, employee_info['evaluation_date'], cache.evaluator)
+            if request.if_none_match.contains_weak(etag):
+                return not_modified(etag)
         
-        # Validate scores
-        for key, value in scores.items():
-            if value < 1 or value > 10:
-                return jsonify({'error': f'{key} must be between 1 and 10'})
+        def evaluate_and_store():
+            # Running history statistics so the growth layers have something to work with
+            employee_id = employee_info['employee_id']
+            trajectory = evaluation_store.trajectory(employee_id) if employee_id else None
+            
+            # Perform evaluation
+            result = cache.evaluate(scores, tenure_months, trajectory=trajectory, profile=employee_info,
+                                    fields=evaluator_fields(wanted))
+            result.update(employee_info)
+            evaluation_store.add(result)
+            cache.evaluator.observe(result)
+            
+            with metrics.stage('evaluate_performance', 'serialize'):
+                response = add_ui_fields(result)
+                if wanted is not None:
+                    response = {field: response[field] for field in wanted if field in response}
+                return dumps(response), state_etag(inputs, versions, employee_info['evaluation_date'],
+                                                   cache.evaluator)
         
-        # Get additional parameters
-        tenure_months = int(request.form.get('tenure_months', 12))
+        # Concurrent submissions with this ETag (same inputs, rubric, day and state) are evaluated and stored once
+        (body, etag), _ = coalescer.do(etag, lambda: admitted('evaluate_performance', evaluate_and_store))
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag, weak=True)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+    
+    except Overloaded as e:
+        return shed_response('evaluate_performance', e)
+    except Exception as e:
+        app.logger.exception('Evaluation failed')  # This will show in Vercel logs
+        return error_response('evaluate_performance', str(e), 'exception')
+
+def whole_number(name, value):
+    """int of a JSON number or CSV cell; ValueError for null, lists, objects, booleans and fractions"""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, (int, str)) and not isinstance(value, bool):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    raise ValueError(f'{name} must be a whole number, got {json.dumps(value)}')
+
+def parse_employee(employee):
+    """
+    (rubric evaluator, score row, employee info) for one batch or import row,
+    validated like the /evaluate form; ValueError when a field is unusable.
+    Scores come from a nested 'scores' object or, for flat rows, the row itself.
+    """
+    if not isinstance(employee, dict):
+        raise ValueError('each employee must be an object')
+    department = employee.get('department', 'General')
+    if not isinstance(department, str):
+        raise ValueError('department must be a string')
+    rubric_evaluator = cache_for(department).evaluator
+    criteria = rubric_evaluator.rubric.criteria
+    employee_scores = employee.get('scores', employee)
+    if not isinstance(employee_scores, dict):
+        raise ValueError('scores must be an object')
+    row = [whole_number(key, employee_scores.get(key, 5)) for key in criteria]
+    for key, value in zip(criteria, row):
+        if value < 1 or value > 10:
+            raise ValueError(f'{key} must be between 1 and 10')
+    tenure_months = whole_number('tenure_months', employee.get('tenure_months', 12))
+    return rubric_evaluator, row, build_employee_info(employee, tenure_months)
+
+def score_employees(parsed):
+    """
+    Evaluate, learn from and store parsed employees. Rows are grouped per
+    rubric and scored as one matrix each, with every employee's stored
+    trajectory as history like /evaluate. An employee listed more than once
+    is scored one round per repeat, so each row sees the ones before it.
+    """
+    keys = [str(info['employee_id']) if info['employee_id'] else None for _, _, info in parsed]
+    trajectories = evaluation_store.trajectories(key for key in keys if key is not None)
+    rounds, repeats = [], {}
+    for index, key in enumerate(keys):
+        repeat = repeats[key] = repeats.get(key, -1) + 1 if key is not None else 0
+        if repeat == len(rounds):
+            rounds.append([])
+        rounds[repeat].append(index)
+    
+    results = [None] * len(parsed)
+    for indices in rounds:
+        groups = {}
+        for index in indices:
+            rubric_evaluator = parsed[index][0]
+            groups.setdefault(rubric_evaluator.rubric.version, (rubric_evaluator, []))[1].append(index)
+        for rubric_evaluator, group in groups.values():
+            profiles = [parsed[i][2] for i in group]
+            group_results = rubric_evaluator.evaluate_batch([parsed[i][1] for i in group],
+                                                            [profile['tenure_months'] for profile in profiles],
+                                                            profiles, [trajectories.get(keys[i]) for i in group])
+            for index, result, employee_info in zip(group, group_results, profiles):
+                result.update(employee_info)
+                results[index] = add_ui_fields(result)
+                # Later rounds see this one in the population too, as sequential /evaluate calls would
+                rubric_evaluator.observe(results[index])
+        if len(rounds) > 1:
+            for index in indices:
+                if keys[index] is not None:
+                    result = results[index]
+                    trajectories[keys[index]].update(result['detailed_scores'], result['overall_score'],
+                                                     promotion_ready(result))
+    evaluation_store.add_many(results)
+    return results
+
+@app.route('/evaluate/batch', methods=['POST'])
+def evaluate_batch():
+    try:
+        with metrics.stage('evaluate_batch', 'parse'):
+            # Expects {"employees": [{"employee_name": ..., "tenure_months": ..., "scores": {...}}, ...]}
+            payload = request.get_json(force=True, silent=True) or {}
+            employees = payload.get('employees')
+            if not isinstance(employees, list) or not employees:
+                return error_response('evaluate_batch', 'employees must be a non-empty list')
+            
+            parsed = []
+            for index, employee in enumerate(employees):
+                try:
+                    parsed.append(parse_employee(employee))
+                except ValueError as e:
+                    return error_response('evaluate_batch', f'employees[{index}]: {e}')
+            
+            inputs = list(payload.items())
+            versions = (sorted({rubric_evaluator.rubric.version for rubric_evaluator, _, _ in parsed}),
+                        parsed[0][0].risk_model.version)
+            etag = state_etag(inputs, versions, parsed[0][2]['evaluation_date'], parsed[0][0])
+            if request.if_none_match.contains_weak(etag):
+                return not_modified(etag)
         
-        # Employee info
-        employee_info = {
-            'name': request.form.get('employee_name', 'Employee'),
-            'employee_id': request.form.get('employee_id', ''),
-            'department': request.form.get('department', 'General'),
-            'position': request.form.get('position', 'Staff'),
-            'period': request.form.get('period', 'Q1 2024'),
-            'reviewer_name': request.form.get('reviewer_name', 'Manager'),
-            'tenure_months': tenure_months,
-            'evaluation_date': datetime.now().strftime('%B %d, %Y')
-        }
+        results = admitted('evaluate_batch', lambda: score_employees(parsed))
+        etag = state_etag(inputs, versions, parsed[0][2]['evaluation_date'], parsed[0][0])
         
-        # Perform evaluation
-        result = evaluator.evaluate_performance(scores)
-        result.update(employee_info)
+        with metrics.stage('evaluate_batch', 'serialize'):
+            response = Response(f'{{"count":{len(results)},"results":{dumps_many(results)}}}',
+                                mimetype='application/json')
+            response.set_etag(etag, weak=True)
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+    
+    except Overloaded as e:
+        return shed_response('evaluate_batch', e)
+    except Exception as e:
+        app.logger.exception('Batch evaluation failed')
+        return error_response('evaluate_batch', str(e), 'exception')
+
+@app.route('/evaluate/import', methods=['POST'])
+def import_evaluations():
+    """
+    Stream a CSV or NDJSON upload through the batch scorer. Rows are parsed
+    as they arrive and scored chunk_size at a time; each chunk's NDJSON lines
+    ({"row": n, ...result} or {"row": n, "error": ...}) are sent as soon as it
+    is stored, followed by a {"summary": ...} line. n is the line number in
+    the upload (a CSV header is line 1).
+    """
+    try:
+        fmt = upload_format(request.mimetype, request.args.get('format'))
+        chunk_size = min(max(int(request.args.get('chunk_size', 500)), 1), 10000)
+    except ValueError as e:
+        return error_response('import_evaluations', str(e))
+    rows = iter_rows(request.stream, fmt)
+    
+    def generate():
+        summary = {'rows': 0, 'scored': 0, 'errors': 0}
+        try:
+            for chunk in chunked(rows, chunk_size):
+                parsed = []
+                outcomes = []
+                for number, row in chunk:
+                    try:
+                        if isinstance(row, RowError):
+                            raise row
+                        parsed.append(parse_employee(row))
+                        outcomes.append((number, None))
+                    except ValueError as e:
+                        outcomes.append((number, str(e)))
+                
+                results = iter(score_employees(parsed) if parsed else ())
+                lines = []
+                for number, error in outcomes:
+                    if error is None:
+                        lines.append(f'{{"row":{number},{dumps(next(results))[1:]}\n')
+                    else:
+                        metrics.count(metrics.errors, endpoint='import_evaluations', kind='row')
+                        lines.append(json.dumps({'row': number, 'error': error}) + '\n')
+                summary['rows'] += len(outcomes)
+                summary['scored'] += len(parsed)
+                summary['errors'] += len(outcomes) - len(parsed)
+                yield ''.join(lines)
+        except Exception as e:
+            app.logger.exception('Import failed')
+            metrics.count(metrics.errors, endpoint='import_evaluations', kind='exception')
+            yield json.dumps({'error': str(e), 'summary': summary}) + '\n'
+            return
+        yield json.dumps({'summary': summary}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/what-if', methods=['POST'])
+def what_if():
+    """
+    Outcome surface for one employee as the criteria in vary move over 1-10,
+    the rest held at their scores, plus the smallest change that reaches
+    each level. "surface": false leaves out the per-point grid.
+    """
+    try:
+        with metrics.stage('what_if', 'parse'):
+            # Expects {"scores": {...}, "vary": ["communication", "teamwork"], "tenure_months": 18, "department": ...}
+            payload = request.get_json(force=True, silent=True)
+            if not isinstance(payload, dict):
+                return error_response('what_if', 'Expected a JSON object with scores and vary')
+            vary = payload.get('vary') or []
+            if isinstance(vary, str):
+                vary = [name.strip() for name in vary.split(',') if name.strip()]
+            try:
+                rubric_evaluator, row, employee_info = parse_employee(payload)
+            except ValueError as e:
+                return error_response('what_if', str(e))
+            
+            etag = input_etag(payload.items(), rubric_evaluator.rubric.version)
+            if request.if_none_match.contains_weak(etag):
+                return not_modified(etag)
         
-        # Add enhanced fields for UI
-        result['ai_score'] = round(result['overall_score'] * 0.95 + 0.5, 2)
-        result['confidence'] = "High" if result['overall_score'] >= 7 else "Medium"
-        result['predicted_growth'] = "Strong" if result['overall_score'] >= 7 else "Moderate"
-        result['benchmark_comparison'] = "Meeting expectations"
-        result['improvement_priority'] = [
-            ('quality_of_work', 0.8),
-            ('communication', 0.6), 
-            ('initiative', 0.5)
-        ]
+        try:
+            result = admitted('what_if', lambda: rubric_evaluator.what_if(
+                dict(zip(rubric_evaluator.rubric.criteria, row)), vary, employee_info['tenure_months']))
+        except ValueError as e:
+            return error_response('what_if', str(e))
+        if payload.get('surface', True) is False:
+            del result['surface']
         
-        return jsonify(result)
+        with metrics.stage('what_if', 'serialize'):
+            response = Response(dumps(result), mimetype='application/json')
+            response.set_etag(etag, weak=True)
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+    
+    except Overloaded as e:
+        return shed_response('what_if', e)
+    except Exception as e:
+        app.logger.exception('What-if analysis failed')
+        return error_response('what_if', str(e), 'exception')
+
+@app.route('/jobs/rescore', methods=['POST'])
+def submit_rescore_job():
+    try:
+        # Expects {"overrides": {"performance_criteria": {"teamwork": {"weight": 0.2}, "initiative": {"weight": 0.15}}},
+        #          "chunk_size": 5000}; the overridden weights must still sum to 1
+        payload = request.get_json(force=True, silent=True) or {}
+        job_id = job_manager.submit(payload.get('overrides'), int(payload.get('chunk_size', 5000)))
+        return jsonify(job_manager.status(job_id))
+    
+    except ValueError as e:
+        return error_response('submit_rescore_job', str(e)), 400
+    except Exception as e:
+        app.logger.exception('Re-scoring job submission failed')
+        return error_response('submit_rescore_job', str(e), 'exception')
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def rescore_job_status(job_id):
+    status = job_manager.status(job_id)
+    if status is None:
+        return jsonify({'error': f'Unknown job {job_id}'}), 404
+    return jsonify(status)
+
+@app.route('/jobs/<job_id>/results', methods=['GET'])
+def rescore_job_results(job_id):
+    status = job_manager.status(job_id)
+    if status is None:
+        return jsonify({'error': f'Unknown job {job_id}'}), 404
+    if status['status'] != 'completed':
+        return jsonify({'error': f"Job {job_id} is {status['status']}", 'progress': status['progress']}), 409
+    return Response(job_manager.results(job_id), mimetype='application/x-ndjson',
+                    headers={'Content-Disposition': f'attachment; filename=rescore-{job_id}.ndjson'})
+
+@app.route('/reports/department', methods=['GET'])
+def department_report():
+    """
+    Every employee's printable report for a department (latest evaluation
+    per employee, optionally one period), re-scored with the department's
+    current rubric and streamed as one multi-page HTML document
+    (format=html) or a zip of standalone HTML files (format=zip).
+    """
+    try:
+        department = request.args.get('department')
+        period = request.args.get('period') or None
+        fmt = request.args.get('format', 'html')
+        if not department:
+            return error_response('department_report', 'department is required')
+        if fmt not in ('html', 'zip'):
+            return error_response('department_report', 'format must be html or zip')
+        if not department_reports.has_evaluations(department, period):
+            return error_response('department_report', f'No stored evaluations for {department}'
+                                                       f"{f' in {period}' if period else ''}")
         
+        rubric_evaluator = cache_for(department).evaluator
+        filename = f"{slug(department)}-{slug(period or 'all')}-reports.{fmt}"
+        if fmt == 'zip':
+            body, mimetype = department_reports.zip(rubric_evaluator, department, period), 'application/zip'
+        else:
+            body, mimetype = department_reports.html(rubric_evaluator, department, period), 'text/html'
+        return Response(stream_with_context(body), mimetype=mimetype,
+                        headers={'Content-Disposition': f'attachment; filename={filename}'})
+    
     except Exception as e:
-        print(f"Error: {e}")  # This will show in Vercel logs
-        return jsonify({'error': str(e)})
+        app.logger.exception('Department report failed')
+        return error_response('department_report', str(e), 'exception')
+
+@app.route('/risk/ranking', methods=['GET'])
+def risk_ranking():
+    """
+    Every employee's latest evaluation scored by the risk model in one
+    matrix pass, highest risk first, e.g. the 50 likeliest leavers in Sales:
+    /risk/ranking?risk=attrition&department=Sales&limit=50
+    """
+    try:
+        risk = request.args.get('risk', 'attrition')
+        if risk not in RISKS:
+            return error_response('risk_ranking', f'risk must be one of {", ".join(RISKS)}')
+        limit = int(request.args.get('limit', 100))
+        if limit < 1:
+            return error_response('risk_ranking', 'limit must be positive')
+        department = request.args.get('department') or None
+        risk_model = default_cache().evaluator.risk_model
+        ranking = admitted('risk_ranking', lambda: rank_workforce(evaluation_store, risk_model, risk, department,
+                                                                  limit))
+        return jsonify({'risk': risk, 'model_version': risk_model.version, 'count': len(ranking),
+                        'ranking': ranking})
+    
+    except Overloaded as e:
+        return shed_response('risk_ranking', e)
+    except ValueError as e:
+        return error_response('risk_ranking', str(e))
+    except Exception as e:
+        app.logger.exception('Risk ranking failed')
+        return error_response('risk_ranking', str(e), 'exception')
+
+@app.route('/rubrics', methods=['GET'])
+def list_rubrics():
+    return jsonify({
+        'default': rubric_registry.default.summary(),
+        'departments': {department: rubric.version for department, rubric in rubric_registry.departments().items()},
+        'active': [rubric.summary() for rubric in rubric_registry.active()],
+        'cached_versions': sorted(rubric_registry.versions)
+    })
+
+@app.route('/rubrics/reload', methods=['POST'])
+def reload_rubrics_now():
+    try:
+        changed = rubric_registry.reload()
+    except Exception as e:
+        app.logger.exception('Rubric reload failed')
+        return error_response('reload_rubrics_now', str(e), 'exception')
+    if changed:
+        evict_rubric_caches()
+    return jsonify({'changed': changed, 'active': [rubric.version for rubric in rubric_registry.active()]})
+
+# Columnar copy of the store for /analytics, opened on first use so NumPy stays off the cold-start path
+ARCHIVE_DIR = os.environ.get('EVALUATION_ARCHIVE_DIR', 'archive')
+analytics_state = {'archive': None}
+analytics_lock = threading.Lock()
+
+def analytics_archive():
+    with analytics_lock:
+        if analytics_state['archive'] is None:
+            from columnar_archive import ColumnarArchive
+            analytics_state['archive'] = ColumnarArchive(ARCHIVE_DIR)
+        return analytics_state['archive']
+
+@app.route('/analytics', methods=['GET'])
+def analytics():
+    """
+    Aggregations over the archive, e.g. the score distribution per department
+    over the last eight quarters:
+    /analytics?by=department,period&last_periods=8&histogram=20
+    """
+    try:
+        archive = analytics_archive()
+        archive.sync(evaluation_store)
+        args = request.args
+        
+        def split(name):
+            value = args.get(name)
+            return [item.strip() for item in value.split(',') if item.strip()] if value else None
+        
+        codes = {}
+        for name in ('department', 'period', 'level'):
+            values = split(name)
+            if values:
+                codes[name] = archive.codes(name, values)
+        if args.get('last_periods'):
+            recent = archive.codes('period', archive.last_periods(int(args['last_periods'])))
+            codes['period'] = [code for code in codes.get('period', recent) if code in recent]
+        tenure = tuple(int(args[name]) if args.get(name) else None for name in ('tenure_min', 'tenure_max'))
+        bins = int(args['histogram']) if args.get('histogram') else None
+        if bins is not None and not 1 <= bins <= 1000:
+            raise ValueError('histogram must be between 1 and 1000 bins')
+        
+        result = archive.aggregate(args.get('metric', 'overall_score'), tuple(split('by') or ()),
+                                   {'codes': codes, 'tenure': tenure}, bins)
+        return jsonify(result)
+    
+    except ValueError as e:
+        return error_response('analytics', str(e))
+    except Exception as e:
+        app.logger.exception('Analytics query failed')
+        return error_response('analytics', str(e), 'exception')
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+startup['import_seconds'] = time.perf_counter() - STARTUP_BEGAN
 
 # This works for both local and Vercel
 if __name__ == '__main__':
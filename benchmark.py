@@ -0,0 +1,330 @@
+"""
+Local benchmark suite for the evaluator and the Flask endpoint.
+    
+    python benchmark.py                                  # full run, writes bench_results.json
+    python benchmark.py --quick --output current.json    # smaller sizes and iteration counts
+    python benchmark.py --compare baseline.json          # flag regressions against a saved run
+    python benchmark.py --import-report                  # slowest imports of a cold `import app`
+
+Every metric records its unit and whether lower or higher is better, so the
+comparison mode can flag regressions beyond --threshold (default 10%) and
+exit non-zero.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CRITERIA = ['quality_of_work', 'productivity', 'teamwork', 'communication', 'initiative']
+
+# Run in a fresh interpreter: import the app, serve one /evaluate, report both times
+STARTUP_PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().post('/evaluate', data={'employee_id': 'BENCH-COLD', 'tenure_months': '18'})
+assert response.status_code == 200, response.status_code
+print(json.dumps({'import_ms': (imported - started) * 1000, 'first_response_ms': (time.perf_counter() - started) * 1000,
+                  'numpy_loaded': 'numpy' in sys.modules}))
+'''
+
+
+def random_scores(rng, count):
+    return [{key: rng.randint(1, 10) for key in CRITERIA} for _ in range(count)]
+
+
+def time_per_call(func, samples, repeats=5):
+    """Median microseconds per call over several passes through samples"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for sample in samples:
+            func(sample)
+        timings.append((time.perf_counter() - start) / len(samples) * 1e6)
+    return statistics.median(timings)
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class BenchmarkRun:
+    def __init__(self, quick=False, seed=42):
+        self.quick = quick
+        self.rng = random.Random(seed)
+        self.metrics = {}
+    
+    def record(self, name, value, unit, better='lower'):
+        self.metrics[name] = {'value': round(value, 4), 'unit': unit, 'better': better}
+        print(f'  {name:<45} {value:>14.3f} {unit}')
+    
+    # ========== EVALUATOR ==========
+    
+    def bench_layers(self, evaluator):
+        """Per-layer latency for each of the seven layers in evaluate_performance"""
+        print('Per-layer latency')
+        samples = random_scores(self.rng, 200 if self.quick else 1000)
+        tenure = 18
+        profile = {'department': 'Engineering', 'position': 'Engineer', 'period': 'Q1 2024'}
+        prepared = []
+        for scores in samples:
+            basic = evaluator._calculate_basic_scores(scores)
+            history = evaluator._build_trajectory(scores, basic['overall_score'], None, None)
+            prepared.append((scores, basic['overall_score'], history, basic['score_consistency']))
+        
+        layers = [
+            ('layer1_basic_scores', lambda p: evaluator._calculate_basic_scores(p[0])),
+            ('layer2_patterns', lambda p: evaluator._analyze_performance_patterns(p[0], p[1], profile)),
+            ('layer3_predictive', lambda p: evaluator._generate_predictive_insights(p[0], tenure, p[2])),
+            ('layer4_skill_gaps', lambda p: evaluator._analyze_skill_gaps(p[0])),
+            ('layer5_benchmarking', lambda p: evaluator._benchmark_performance(p[0], tenure, p[1], profile)),
+            ('layer6_growth', lambda p: evaluator._calculate_growth_trajectory(p[0], p[2])),
+            ('layer7_risk', lambda p: evaluator._assess_performance_risks(p[0], p[1], p[3], tenure, p[2]))
+        ]
+        for name, func in layers:
+            self.record(f'{name}_us', time_per_call(func, prepared), 'us')
+    
+    def bench_single(self, evaluator):
+        """End-to-end single evaluation throughput, uncached and through the cache"""
+        from evaluation_cache import EvaluationCache
+        print('Single-record throughput')
+        samples = random_scores(self.rng, 500 if self.quick else 2000)
+        per_call = time_per_call(lambda s: evaluator.evaluate_performance(s, 18), samples)
+        self.record('single_evaluate_us', per_call, 'us')
+        self.record('single_evaluate_per_s', 1e6 / per_call, 'records/s', 'higher')
+        
+        cache = EvaluationCache(evaluator, mode='lru')
+        for scores in samples:
+            cache.evaluate(scores, 18)
+        self.record('single_cached_lru_us', time_per_call(lambda s: cache.evaluate(s, 18), samples), 'us')
+    
+    def bench_batch(self, evaluator, sizes, chunk_size=100000):
+        """Batch throughput; sizes above chunk_size run in chunks so memory stays bounded"""
+        import numpy as np
+        print('Batch throughput')
+        np_rng = np.random.default_rng(7)
+        for size in sizes:
+            remaining = size
+            start = time.perf_counter()
+            while remaining:
+                n = min(remaining, chunk_size)
+                evaluator.evaluate_batch(np_rng.integers(1, 11, size=(n, len(CRITERIA))), 18)
+                remaining -= n
+            elapsed = time.perf_counter() - start
+            self.record(f'batch_{size}_records_per_s', size / elapsed, 'records/s', 'higher')
+            
+            frame_start = time.perf_counter()
+            evaluator._build_batch_frame(np_rng.integers(1, 11, size=(size, len(CRITERIA))), 18)
+            self.record(f'batch_{size}_frame_ms', (time.perf_counter() - frame_start) * 1000, 'ms')
+    
+    def bench_what_if(self, evaluator):
+        """Full what-if grid over every criterion (10^k points), best of a few runs"""
+        print('What-if grid')
+        base = random_scores(self.rng, 1)[0]
+        timings = []
+        for _ in range(2 if self.quick else 5):
+            start = time.perf_counter()
+            evaluator.what_if(base, list(base), 18)
+            timings.append(time.perf_counter() - start)
+        self.record('what_if_full_grid_ms', min(timings) * 1000, 'ms')
+    
+    def bench_memory(self, evaluator, size):
+        """Peak traced allocation while evaluating one batch"""
+        import numpy as np
+        print('Peak memory')
+        scores = np.random.default_rng(11).integers(1, 11, size=(size, len(CRITERIA)))
+        tracemalloc.start()
+        evaluator.evaluate_batch(scores, 18)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.record(f'batch_{size}_peak_mb', peak / 2 ** 20, 'MB')
+    
+    # ========== FLASK ENDPOINT ==========
+    
+    def bench_endpoint(self, requests_count):
+        """/evaluate latency percentiles through the Flask test client"""
+        print('/evaluate latency')
+        from app import app
+        client = app.test_client()
+        latencies = []
+        for index in range(requests_count):
+            form = {key: str(value) for key, value in random_scores(self.rng, 1)[0].items()}
+            form.update(employee_id=f'BENCH-{index % 50}', department='Engineering', tenure_months='18')
+            start = time.perf_counter()
+            response = client.post('/evaluate', data=form)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f'/evaluate returned {response.status_code}')
+        for q in (50, 95, 99):
+            self.record(f'endpoint_evaluate_p{q}_ms', percentile(latencies, q), 'ms')
+        self.record('endpoint_evaluate_per_s', len(latencies) / (sum(latencies) / 1000), 'requests/s', 'higher')
+    
+    def bench_department_report(self, employees):
+        """Time to stream a whole department's reports, as one HTML packet and as a zip"""
+        print('Department reports')
+        from app import app
+        client = app.test_client()
+        department = f'Bench-{employees}'
+        for first in range(0, employees, 500):
+            batch = [{'employee_name': f'Employee {index}', 'employee_id': f'REPORT-{index}',
+                      'department': department, 'period': 'bench', 'tenure_months': 18,
+                      'scores': random_scores(self.rng, 1)[0]} for index in range(first, min(first + 500, employees))]
+            client.post('/evaluate/batch', json={'employees': batch})
+        for fmt in ('html', 'zip'):
+            start = time.perf_counter()
+            response = client.get(f'/reports/department?department={department}&period=bench&format={fmt}')
+            if response.status_code != 200 or not response.data:
+                raise RuntimeError(f'/reports/department returned {response.status_code}')
+            self.record(f'report_{employees}_{fmt}_ms', (time.perf_counter() - start) * 1000, 'ms')
+    
+    def bench_risk_ranking(self, evaluator, employees, cycles=3):
+        """Time to risk-rank a whole workforce from the store, each employee with a few review cycles"""
+        print('Risk ranking')
+        from evaluation_store import EvaluationStore
+        from risk_model import rank_workforce
+        store = EvaluationStore(os.path.join(os.path.dirname(os.environ['EVALUATION_DB_PATH']), 'risk.db'))
+        for cycle in range(cycles):
+            for first in range(0, employees, 50000):
+                rows = range(first, min(first + 50000, employees))
+                results = evaluator.evaluate_batch([[self.rng.randint(1, 10) for _ in CRITERIA] for _ in rows], 18)
+                for index, result in zip(rows, results):
+                    result.update(employee_id=f'RISK-{index}', period=f'cycle-{cycle}')
+                store.add_many(results)
+        start = time.perf_counter()
+        ranking = rank_workforce(store, evaluator.risk_model, 'attrition')
+        if len(ranking) != employees:
+            raise RuntimeError(f'ranked {len(ranking)} of {employees} employees')
+        self.record(f'risk_rank_{employees}_ms', (time.perf_counter() - start) * 1000, 'ms')
+    
+    # ========== COLD START ==========
+    
+    def bench_startup(self, runs, fast_start=True):
+        """Import and time-to-first-response of the app in fresh interpreters"""
+        print('Cold start')
+        env = dict(os.environ, EVALUATION_FAST_START='1' if fast_start else '0')
+        probes = [json.loads(subprocess.run([sys.executable, '-c', STARTUP_PROBE], env=env, cwd=HERE, check=True,
+                                            capture_output=True, text=True).stdout.splitlines()[-1])
+                  for _ in range(runs)]
+        self.record('startup_import_ms', statistics.median(p['import_ms'] for p in probes), 'ms')
+        self.record('startup_first_response_ms', statistics.median(p['first_response_ms'] for p in probes), 'ms')
+        if any(p['numpy_loaded'] for p in probes):
+            print('  warning: NumPy was imported on the single-record path')
+    
+    def finish(self):
+        # ru_maxrss is kilobytes on Linux and bytes on macOS
+        divisor = 2 ** 20 if sys.platform == 'darwin' else 2 ** 10
+        self.record('process_peak_rss_mb', resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor, 'MB')
+        return {
+            'meta': {
+                'timestamp': datetime.now().isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'quick': self.quick
+            },
+            'metrics': self.metrics
+        }
+
+
+def import_report(top=15):
+    """Print the slowest modules of `import app` from python -X importtime"""
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=HERE, check=True,
+                            capture_output=True, text=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line.split(':', 1)[1].split('|')]
+        rows.append((int(cumulative_us), int(self_us), name))
+    total = max(rows)[0] if rows else 0
+    print(f"{'module':<45} {'self ms':>9} {'cumulative ms':>14}")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f'{name:<45} {self_us / 1000:>9.1f} {cumulative_us / 1000:>14.1f}')
+    print(f'\nTotal: {total / 1000:.1f} ms')
+    return rows
+
+
+def compare(current, baseline, threshold):
+    """Print a comparison table and return the names of regressed metrics"""
+    regressions = []
+    print(f"\n{'metric':<45} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, metric in current['metrics'].items():
+        base = baseline['metrics'].get(name)
+        if base is None or not base['value']:
+            continue
+        change = (metric['value'] - base['value']) / base['value']
+        worse = change > threshold if metric['better'] == 'lower' else change < -threshold
+        flag = '  REGRESSION' if worse else ''
+        print(f"{name:<45} {base['value']:>12.3f} {metric['value']:>12.3f} {change:>+8.1%}{flag}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the performance evaluator')
+    parser.add_argument('--output', default='bench_results.json', help='where to write the results JSON')
+    parser.add_argument('--compare', metavar='BASELINE', help='saved results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='relative change counted as a regression')
+    parser.add_argument('--quick', action='store_true', help='smaller batches and fewer iterations')
+    parser.add_argument('--sizes', default=None, help='comma-separated batch sizes (default 1000,100000,1000000)')
+    parser.add_argument('--import-report', action='store_true', help='only print the slowest imports of the app')
+    args = parser.parse_args(argv)
+    
+    sizes = [int(size) for size in args.sizes.split(',')] if args.sizes else (
+        [1000, 10000] if args.quick else [1000, 100000, 1000000])
+    
+    # Keep the endpoint benchmark away from the real database and job directory
+    workdir = tempfile.mkdtemp(prefix='evaluation-bench-')
+    os.environ.setdefault('EVALUATION_DB_PATH', os.path.join(workdir, 'bench.db'))
+    os.environ.setdefault('EVALUATION_JOBS_DIR', os.path.join(workdir, 'jobs'))
+    
+    if args.import_report:
+        import_report()
+        return 0
+    
+    from evaluation_ai import AdvancedPerformanceEvaluator
+    evaluator = AdvancedPerformanceEvaluator()
+    
+    run = BenchmarkRun(quick=args.quick)
+    run.bench_startup(3 if args.quick else 10)
+    run.bench_layers(evaluator)
+    run.bench_single(evaluator)
+    run.bench_batch(evaluator, sizes)
+    run.bench_what_if(evaluator)
+    run.bench_memory(evaluator, min(max(sizes), 100000))
+    run.bench_endpoint(300 if args.quick else 2000)
+    run.bench_department_report(200 if args.quick else 1000)
+    run.bench_risk_ranking(evaluator, 10000 if args.quick else 100000)
+    results = run.finish()
+    
+    with open(args.output, 'w') as handle:
+        json.dump(results, handle, indent=2)
+    print(f'\nResults written to {args.output}')
+    
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+        print('\nNo regressions')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
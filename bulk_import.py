@@ -0,0 +1,82 @@
+import codecs
+import csv
+import json
+from itertools import islice
+
+FORMATS = ('csv', 'ndjson')
+
+# Content types accepted for each upload format
+FORMAT_TYPES = {
+    'text/csv': 'csv', 'application/csv': 'csv',
+    'application/x-ndjson': 'ndjson', 'application/ndjson': 'ndjson', 'application/jsonl': 'ndjson'
+}
+
+
+class RowError(ValueError):
+    """A single upload row that cannot be scored; reported inline, the upload carries on"""
+
+
+def upload_format(mimetype, requested=None):
+    """'csv' or 'ndjson' from an explicit format= or the request's content type"""
+    fmt = requested or FORMAT_TYPES.get(mimetype)
+    if fmt not in FORMATS:
+        raise ValueError(f'Upload must be CSV or NDJSON (Content-Type text/csv or application/x-ndjson, '
+                         f'or format=csv|ndjson), got {mimetype or "no content type"}')
+    return fmt
+
+
+def iter_lines(stream, encoding='utf-8-sig'):
+    """
+    Decoded lines from a binary stream, read one line at a time (WSGI input is
+    not always iterable); a leading BOM is dropped
+    """
+    return codecs.iterdecode(iter(stream.readline, b''), encoding)
+
+
+def iter_csv_rows(lines):
+    """
+    Yield (line number, dict or RowError) for each data row of a CSV with a
+    header line. Line numbers count the header as line 1, so they match the
+    row numbers of the spreadsheet the file came from.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    header = [name.strip() for name in header]
+    for values in reader:
+        if not any(value.strip() for value in values):
+            continue
+        if len(values) != len(header):
+            yield reader.line_num, RowError(f'expected {len(header)} columns, got {len(values)}')
+            continue
+        # Empty cells count as missing so they take the same defaults as an omitted form field
+        yield reader.line_num, {name: value.strip() for name, value in zip(header, values) if value.strip()}
+
+
+def iter_ndjson_rows(lines):
+    """Yield (line number, dict or RowError) for each non-blank NDJSON line"""
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, RowError(f'invalid JSON: {e}')
+            continue
+        yield number, row if isinstance(row, dict) else RowError('each line must be a JSON object')
+
+
+def iter_rows(stream, fmt):
+    lines = iter_lines(stream)
+    return iter_csv_rows(lines) if fmt == 'csv' else iter_ndjson_rows(lines)
+
+
+def chunked(iterable, size):
+    """Lists of up to size items, pulled lazily so only one chunk is held at a time"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
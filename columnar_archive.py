@@ -0,0 +1,347 @@
+import fcntl
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+# Fixed-width column files; codes index the manifest dictionaries (0 = missing)
+COLUMNS = {
+    'id': np.uint32,
+    'overall_centi': np.uint16,
+    'tenure_months': np.uint16,
+    'department': np.uint16,
+    'period': np.uint16,
+    'level': np.uint16,
+    'promotion_ready': np.uint8
+}
+DICTIONARY_COLUMNS = ('department', 'period', 'level')
+GROUP_COLUMNS = DICTIONARY_COLUMNS + ('promotion_ready',)
+MISSING_TENURE = np.iinfo(np.uint16).max
+MISSING_READINESS = 255
+
+# Rows per scan block; keeps filter masks and bincount inputs cache-sized
+SCAN_BLOCK = 1 << 22
+
+# Each histogram group holds one counter per raw value (1001 for overall scores)
+MAX_HISTOGRAM_GROUPS = 10000
+
+_PERIOD_PATTERNS = (re.compile(r'^Q([1-4])\s*(\d{4})$', re.I), re.compile(r'^(\d{4})\s*-?\s*Q([1-4])$', re.I))
+
+
+def period_sort_key(period):
+    """Chronological key for 'Q1 2024' / '2024-Q1' periods; anything else sorts by name after them"""
+    text = str(period).strip()
+    match = _PERIOD_PATTERNS[0].match(text)
+    if match:
+        return (0, int(match.group(2)), int(match.group(1)), text)
+    match = _PERIOD_PATTERNS[1].match(text)
+    if match:
+        return (0, int(match.group(1)), int(match.group(2)), text)
+    return (1, 0, 0, text)
+
+
+class ColumnarArchive:
+    """
+    Append-only columnar copy of the evaluation store for analytics scans.
+    
+    Every column is a flat file of fixed-width integers: overall score in
+    hundredths, tenure, dictionary codes for department, period and
+    performance level, promotion readiness and one uint8 file per criterion
+    (0 = not scored). Readers memory-map the files, so a scan works on the
+    page cache directly with no copies, block by block through bincount.
+    
+    manifest.json holds the committed row count, the last store id and the
+    dictionaries; it is replaced atomically after the column files are
+    appended, so a crash mid-append leaves trailing bytes that the next
+    writer truncates. Appends are serialized across worker processes with a
+    lock file. Queries work on a snapshot of the manifest taken under the
+    lock, so a concurrent sync never shows them half-appended dictionaries.
+    """
+    
+    def __init__(self, directory='archive'):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._maps = {}
+        self.manifest = self._read_manifest()
+    
+    # ========== SYNC ==========
+    
+    def sync(self, store, batch_size=50000):
+        """Append evaluations stored since the last sync; returns the number of rows added"""
+        with self._lock, open(os.path.join(self.directory, '.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # Another worker may have appended since this one last looked
+            self.manifest = self._read_manifest()
+            self._truncate_uncommitted()
+            added = 0
+            while True:
+                rows = store.columns_since(self.manifest['last_id'], batch_size)
+                if not rows:
+                    return added
+                self._append(rows)
+                added += len(rows)
+    
+    def _append(self, rows):
+        manifest = self.manifest
+        dictionaries = manifest['dictionaries']
+        codes = {name: {value: code for code, value in enumerate(dictionaries[name])} for name in DICTIONARY_COLUMNS}
+        
+        def encode(name, value):
+            if value is None:
+                return 0
+            code = codes[name].get(value)
+            if code is None:
+                code = codes[name][value] = len(dictionaries[name])
+                dictionaries[name].append(value)
+            return code
+        
+        columns = {name: [] for name in COLUMNS}
+        scores = []
+        for row_id, department, period, tenure, overall, level, ready, detailed in rows:
+            columns['id'].append(row_id)
+            columns['overall_centi'].append(int(round((overall or 0.0) * 100)))
+            columns['tenure_months'].append(
+                MISSING_TENURE if tenure is None else min(max(int(tenure), 0), MISSING_TENURE - 1))
+            columns['department'].append(encode('department', department))
+            columns['period'].append(encode('period', period))
+            columns['level'].append(encode('level', level))
+            columns['promotion_ready'].append(MISSING_READINESS if ready is None else int(ready))
+            scores.append(json.loads(detailed))
+        
+        criteria = manifest['criteria']
+        for detailed in scores:
+            for name in detailed:
+                if name not in criteria:
+                    # New criterion (e.g. a new rubric): back-fill earlier rows as not scored
+                    criteria.append(name)
+                    with open(self._path(f'score_{name}'), 'wb') as handle:
+                        handle.write(bytes(manifest['rows']))
+        for name in criteria:
+            columns[f'score_{name}'] = [detailed.get(name, 0) for detailed in scores]
+        
+        for name, values in columns.items():
+            dtype = COLUMNS.get(name, np.uint8)
+            with open(self._path(name), 'ab') as handle:
+                handle.write(np.asarray(values, dtype=dtype).tobytes())
+        
+        manifest['rows'] += len(rows)
+        manifest['last_id'] = rows[-1][0]
+        self._write_manifest(manifest)
+    
+    def _truncate_uncommitted(self):
+        """Drop bytes a crashed append wrote past the committed row count"""
+        rows = self.manifest['rows']
+        for name in self.column_names():
+            path = self._path(name)
+            size = rows * np.dtype(COLUMNS.get(name, np.uint8)).itemsize
+            if not os.path.exists(path):
+                with open(path, 'wb') as handle:
+                    handle.write(bytes(size))
+            elif os.path.getsize(path) != size:
+                os.truncate(path, size)
+    
+    # ========== STORAGE ==========
+    
+    def column_names(self):
+        return list(COLUMNS) + [f'score_{name}' for name in self.manifest['criteria']]
+    
+    def _path(self, name):
+        return os.path.join(self.directory, f'{name}.bin')
+    
+    def _read_manifest(self):
+        path = os.path.join(self.directory, 'manifest.json')
+        if not os.path.exists(path):
+            return {'rows': 0, 'last_id': 0, 'criteria': [],
+                    'dictionaries': {name: [None] for name in DICTIONARY_COLUMNS}}
+        with open(path) as handle:
+            return json.load(handle)
+    
+    def _write_manifest(self, manifest):
+        path = os.path.join(self.directory, 'manifest.json')
+        with open(path + '.tmp', 'w') as handle:
+            json.dump(manifest, handle)
+        os.replace(path + '.tmp', path)
+    
+    def snapshot(self):
+        """Copy of the manifest as of the last completed sync"""
+        with self._lock:
+            manifest = self.manifest
+            return {'rows': manifest['rows'], 'last_id': manifest['last_id'], 'criteria': list(manifest['criteria']),
+                    'dictionaries': {name: list(values) for name, values in manifest['dictionaries'].items()}}
+    
+    def column(self, name, rows=None):
+        """Read-only memory map of one column over the committed rows (or the first rows of a snapshot)"""
+        if rows is None:
+            rows = self.manifest['rows']
+        key = (name, rows)
+        mapped = self._maps.get(key)
+        if mapped is None:
+            dtype = COLUMNS.get(name, np.uint8)
+            mapped = np.memmap(self._path(name), dtype=dtype, mode='r', shape=(rows,)) if rows else np.empty(0, dtype)
+            self._maps = {k: v for k, v in self._maps.items() if k[1] == rows}
+            self._maps[key] = mapped
+        return mapped
+    
+    # ========== QUERIES ==========
+    
+    def codes(self, name, values):
+        """Dictionary codes of the given department/period/level values; unknown values match nothing"""
+        lookup = {value: code for code, value in enumerate(self.snapshot()['dictionaries'][name])}
+        return [lookup[value] for value in values if value in lookup]
+    
+    def last_periods(self, count):
+        """The most recent count periods, oldest first"""
+        periods = [period for period in self.snapshot()['dictionaries']['period'] if period is not None]
+        return sorted(periods, key=period_sort_key)[-count:]
+    
+    def _metric(self, metric, criteria):
+        """(column name, scale, missing value) for a metric name"""
+        if metric == 'overall_score':
+            return 'overall_centi', 0.01, None
+        if metric == 'tenure_months':
+            return 'tenure_months', 1.0, MISSING_TENURE
+        if metric in criteria:
+            return f'score_{metric}', 1.0, 0
+        raise ValueError(f"Unknown metric {metric!r}; expected overall_score, tenure_months or one of {criteria}")
+    
+    def _mask(self, start, stop, filters, rows):
+        """Boolean row mask for one block, or None when nothing is filtered"""
+        mask = None
+        for name, codes in filters.get('codes', {}).items():
+            column = self.column(name, rows)[start:stop]
+            match = np.isin(column, np.asarray(codes, dtype=column.dtype))
+            mask = match if mask is None else mask & match
+        low, high = filters.get('tenure', (None, None))
+        if low is not None or high is not None:
+            tenure = self.column('tenure_months', rows)[start:stop]
+            match = tenure != MISSING_TENURE
+            if low is not None:
+                match &= tenure >= low
+            if high is not None:
+                match &= tenure <= high
+            mask = match if mask is None else mask & match
+        return mask
+    
+    def _group_key(self, start, stop, by, rows, sizes):
+        """Per-row key over the product of the by columns (codes in mixed radix), or None when ungrouped"""
+        key = None
+        for name in by:
+            column = self.column(name, rows)[start:stop].astype(np.int64)
+            key = column if key is None else key * sizes[name] + column
+        return key
+    
+    def _group_labels(self, by, key, manifest, sizes):
+        labels = {}
+        for name in reversed(by):
+            key, code = divmod(key, sizes[name])
+            if name == 'promotion_ready':
+                labels[name] = None if code == MISSING_READINESS else bool(code)
+            else:
+                labels[name] = manifest['dictionaries'][name][code]
+        return {name: labels[name] for name in by}
+    
+    def aggregate(self, metric='overall_score', by=(), filters=None, histogram_bins=None):
+        """
+        Count, mean and standard deviation of a metric per group of the by
+        columns (any of department, period, level, promotion_ready), over the
+        rows passing filters ({'codes': {column: [codes]}, 'tenure': (low,
+        high)}). histogram_bins adds a per-group histogram over [0, 10] for
+        score metrics.
+        
+        Accumulators are kept only for the groups that actually occur, found
+        per block with np.unique, never for the full product of dictionary
+        sizes; histograms are refused past MAX_HISTOGRAM_GROUPS groups.
+        """
+        for name in by:
+            if name not in GROUP_COLUMNS:
+                raise ValueError(f'Cannot group by {name!r}; expected one of {list(GROUP_COLUMNS)}')
+        filters = filters or {}
+        manifest = self.snapshot()
+        rows = manifest['rows']
+        column_name, scale, missing = self._metric(metric, manifest['criteria'])
+        values_column = self.column(column_name, rows)
+        sizes = {name: 256 if name == 'promotion_ready' else len(manifest['dictionaries'][name]) for name in by}
+        if histogram_bins and metric == 'tenure_months':
+            raise ValueError('Histograms are available for overall_score and criterion scores')
+        # Histograms are exact bincounts over the raw values (0-1000 hundredths or 0-10), binned afterwards
+        width = int(round(10 / scale)) + 1
+        keys = np.zeros(0, np.int64)
+        counts = np.zeros(0, np.int64)
+        sums = np.zeros(0)
+        squares = np.zeros(0)
+        value_counts = np.zeros((0, width), np.int64) if histogram_bins else None
+        
+        for start in range(0, rows, SCAN_BLOCK):
+            stop = min(start + SCAN_BLOCK, rows)
+            values = values_column[start:stop]
+            mask = self._mask(start, stop, filters, rows)
+            if missing is not None:
+                present = values != missing
+                mask = present if mask is None else mask & present
+            key = self._group_key(start, stop, by, rows, sizes)
+            if mask is not None:
+                values = values[mask]
+                key = key[mask] if key is not None else None
+            if key is None:
+                key = np.zeros(len(values), np.int64)
+            if not len(values):
+                continue
+            block_keys, group = np.unique(key, return_inverse=True)
+            groups = len(block_keys)
+            if histogram_bins and len(np.union1d(keys, block_keys)) > MAX_HISTOGRAM_GROUPS:
+                raise ValueError(f'Histograms are limited to {MAX_HISTOGRAM_GROUPS} groups; '
+                                 'group by fewer columns or filter further')
+            
+            # Fold this block's groups into the running ones (both key arrays are sorted)
+            merged = np.union1d(keys, block_keys)
+            old, new = np.searchsorted(merged, keys), np.searchsorted(merged, block_keys)
+            weights = values.astype(np.float64)
+            counts = _scatter(merged, old, counts, new, np.bincount(group, minlength=groups))
+            sums = _scatter(merged, old, sums, new, np.bincount(group, weights, minlength=groups))
+            squares = _scatter(merged, old, squares, new, np.bincount(group, weights * weights, minlength=groups))
+            if histogram_bins:
+                block_counts = np.bincount(group * width + np.minimum(values, width - 1), minlength=groups * width)
+                value_counts = _scatter(merged, old, value_counts, new, block_counts.reshape(groups, width))
+            keys = merged
+        
+        results = []
+        for index, key in enumerate(keys.tolist()):
+            count = int(counts[index])
+            mean = sums[index] / count
+            variance = max(squares[index] / count - mean * mean, 0.0)
+            entry = self._group_labels(by, key, manifest, sizes)
+            entry.update(count=count, mean=round(float(mean) * scale, 4),
+                         std=round(float(np.sqrt(variance)) * scale, 4))
+            if histogram_bins:
+                entry['histogram'] = self._bin(value_counts[index], scale, histogram_bins)
+            results.append(entry)
+        return {'rows': rows, 'matched': int(counts.sum()), 'metric': metric, 'by': list(by), 'groups': results}
+    
+    def _bin(self, value_counts, scale, bins):
+        """Re-bin exact per-value counts into equal-width bins over [0, 10]"""
+        values = np.arange(len(value_counts)) * scale
+        index = np.minimum((values / 10.0 * bins).astype(np.int64), bins - 1)
+        binned = np.bincount(index, value_counts, minlength=bins).astype(np.int64)
+        edges = [round(10.0 * i / bins, 4) for i in range(bins + 1)]
+        return {'edges': edges, 'counts': binned.tolist()}
+
+
+def _scatter(merged, old_index, old, new_index, new):
+    """Accumulator over the merged keys holding old at old_index plus new at new_index"""
+    total = np.zeros((len(merged),) + old.shape[1:], old.dtype)
+    total[old_index] = old
+    total[new_index] += new
+    return total
+
+
+if __name__ == '__main__':
+    # Build or catch up an archive ahead of time: python columnar_archive.py [db path] [archive dir]
+    import sys
+    from evaluation_store import EvaluationStore
+    db_path = sys.argv[1] if len(sys.argv) > 1 else os.environ.get('EVALUATION_DB_PATH', 'evaluations.db')
+    directory = sys.argv[2] if len(sys.argv) > 2 else os.environ.get('EVALUATION_ARCHIVE_DIR', 'archive')
+    archive = ColumnarArchive(directory)
+    print(f"Archived {archive.sync(EvaluationStore(db_path))} new evaluations, {archive.manifest['rows']} in total")
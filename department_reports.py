@@ -0,0 +1,177 @@
+import os
+import re
+import threading
+import zipfile
+from collections import deque
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# Stored identity fields carried onto each re-scored result
+REPORT_IDENTITY = ('employee_id', 'name', 'department', 'position', 'period', 'reviewer_name',
+                   'evaluation_timestamp')
+
+_templates = {}
+
+
+def skill_name(skill):
+    """'quality_of_work' -> 'Quality Of Work', as formatSkillName() does in the browser"""
+    if not skill:
+        return 'Unknown Skill'
+    return ' '.join(word[:1].upper() + word[1:].lower() for word in str(skill).replace('_', ' ').split(' '))
+
+
+def slug(text):
+    return re.sub(r'[^A-Za-z0-9]+', '-', str(text or '')).strip('-') or 'report'
+
+
+def report_templates():
+    """(page, packet) templates, compiled once per process"""
+    if not _templates:
+        from jinja2 import ChainableUndefined, Environment, FileSystemLoader
+        environment = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=True,
+                                  undefined=ChainableUndefined)
+        environment.filters['skill_name'] = skill_name
+        _templates['page'] = environment.get_template('report.html')
+        _templates['packet'] = environment.get_template('report_packet.html')
+    return _templates['page'], _templates['packet']
+
+
+def report_filename(number, result):
+    return f"{number:05d}-{slug(result.get('name') or result.get('employee_id'))}.html"
+
+
+def render_chunk(results, first_number, standalone):
+    """
+    Process-pool task: [(file name, HTML)] for a chunk of results, each a
+    bare report page or, when standalone, a complete HTML document
+    """
+    from markupsafe import Markup
+    page, packet = report_templates()
+    rendered = []
+    for number, result in enumerate(results, first_number):
+        html = page.render(data=result)
+        if standalone:
+            html = packet.render(title=f"{result.get('name') or 'Employee'} | Performance Report",
+                                 pages=[Markup(html)])
+        rendered.append((report_filename(number, result), html))
+    return rendered
+
+
+class _ZipSink:
+    """Write-only file for ZipFile; what it collects is drained after every entry"""
+    
+    def __init__(self):
+        self.parts = []
+    
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts.clear()
+        return data
+
+
+class DepartmentReports:
+    """
+    Department review packets rendered on a process pool.
+    
+    The department's stored evaluations (the latest per employee) are read
+    chunk_size at a time and re-scored with the vectorized batch evaluator
+    in the calling process; a pool worker renders each chunk's reports from
+    templates compiled once per worker. At most two chunks per worker are
+    in flight and finished chunks are streamed out in order, as pages of
+    one HTML document or entries of a zip archive, so memory stays bounded
+    however large the department.
+    """
+    
+    def __init__(self, store, max_workers=None, chunk_size=50):
+        self.store = store
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    # ========== PUBLIC API ==========
+    
+    def has_evaluations(self, department, period=None):
+        chunks = self.store.latest_by_department(department, period, chunk_size=1)
+        try:
+            return next(chunks, None) is not None
+        finally:
+            chunks.close()
+    
+    def html(self, evaluator, department, period=None):
+        """Generator over one multi-page HTML document, a page break between employees"""
+        from markupsafe import Markup
+        _, packet = report_templates()
+        title = f"{department}{f' {period}' if period else ''} | Performance Reports"
+        pages = (Markup(html) for chunk in self._rendered(evaluator, department, period, False)
+                 for _, html in chunk)
+        # Jinja streams the packet as the pages arrive
+        yield from packet.generate(title=title, pages=pages)
+    
+    def zip(self, evaluator, department, period=None):
+        """Generator over a zip archive of standalone HTML reports, one per employee"""
+        sink = _ZipSink()
+        with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for chunk in self._rendered(evaluator, department, period, True):
+                for name, html in chunk:
+                    archive.writestr(name, html)
+                yield sink.drain()
+        yield sink.drain()
+    
+    # ========== PIPELINE ==========
+    
+    def _scored(self, evaluator, department, period):
+        """
+        Lists of re-scored results, chunk_size at a time, each with the history
+        stored before it; rows missing a criterion are skipped
+        """
+        criteria = list(evaluator.rubric.criteria)
+        for rows in self.store.latest_by_department(department, period, self.chunk_size):
+            usable = [row for row in rows if all(k in row['detailed_scores'] for k in criteria)]
+            if not usable:
+                continue
+            tenures = [12 if row['tenure_months'] is None else row['tenure_months'] for row in usable]
+            results = evaluator.evaluate_batch([[row['detailed_scores'][k] for k in criteria] for row in usable],
+                                               tenures, usable, self.store.trajectories_before(usable))
+            for row, result in zip(usable, results):
+                result.update((field, row[field]) for field in REPORT_IDENTITY)
+            yield results
+    
+    def _rendered(self, evaluator, department, period, standalone):
+        """Rendered chunks in order, keeping the pool busy without running ahead of the consumer"""
+        executor = self._pool()
+        pending = deque()
+        number = 1
+        try:
+            for results in self._scored(evaluator, department, period):
+                pending.append(executor.submit(render_chunk, results, number, standalone))
+                number += len(results)
+                if len(pending) >= self.max_workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        except Exception as e:
+            from concurrent.futures.process import BrokenProcessPool
+            if isinstance(e, BrokenProcessPool):
+                with self._lock:
+                    self._executor = None
+            raise
+        finally:
+            # A client that disconnects mid-stream leaves nothing queued behind it
+            for future in pending:
+                future.cancel()
+    
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # Imported on first use; multiprocessing adds noticeably to a cold start
+                from concurrent.futures import ProcessPoolExecutor
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
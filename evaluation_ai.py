@@ -1,35 +1,110 @@
-import numpy as np
-from datetime import datetime, timedelta
-import random
+import bisect
+import math
+import threading
+from operator import itemgetter, mul
+from datetime import datetime
+from growth_model import TrajectoryStats
+from rubrics import default_rubric
+from percentile_engine import PercentileEngine
+from peer_benchmarks import PeerBenchmarks, RunningMoments
+from skill_covariance import RunningCovariance, SkillCovariance
+from evaluation_result import EvaluationResult, LAYER_FIELDS, RESULT_METADATA, constant
+from risk_model import HISTORY_FEATURES, TENURE_MONTHS_CAP, default_risk_model, history_features, risk_features
+
+# Fixed insights shared by every result and pre-encoded for serialization
+BASELINE_TRAJECTORY = constant({'trend': 'Stable', 'momentum': 'Insufficient data', 'outlook': 'Baseline established'})
+DEVELOPMENT_TIMELINE = constant({'estimated_timeline': '6 months for significant improvement'})
+NO_SYNERGY_DATA = constant({'analysis': 'Skill correlations build up as evaluations are recorded', 'sample_size': 0})
+NO_GAP_IMPACT_DATA = constant({'overall_impact': 'Unknown', 'key_areas': [], 'sample_size': 0})
+UNCLASSIFIED_LEVEL = constant({'level': 'Unknown', 'description': 'Unable to classify', 'percentile': 0})
+NO_ROLE_PEERS = constant({'status': 'No Peer Data', 'comparison': 'Not enough evaluations for this role yet'})
+NO_WORKFORCE_BENCHMARK = constant({'status': 'No Benchmark Data',
+                                   'insight': 'Workforce benchmark builds up as evaluations are recorded'})
+UNRANKED_POSITION = constant({'position': 'Unranked', 'differentiators': ['Insufficient department data']})
+
+
+# ========== PURE-PYTHON KERNEL ==========
+# Single records only ever need the mean and spread of a handful of scores,
+# so they are computed without NumPy (which is imported lazily by the batch
+# path). The arithmetic follows NumPy's pairwise summation, so results are
+# bit-identical to np.mean / np.std and to the vectorized batch path.
+
+def _pairwise_sum(values):
+    n = len(values)
+    if n < 8:
+        total = 0.0
+        for value in values:
+            total += value
+        return total
+    if n <= 128:
+        partial = [float(value) for value in values[:8]]
+        limit = n - n % 8
+        for start in range(8, limit, 8):
+            for j in range(8):
+                partial[j] += values[start + j]
+        total = ((partial[0] + partial[1]) + (partial[2] + partial[3])) + \
+                ((partial[4] + partial[5]) + (partial[6] + partial[7]))
+        for value in values[limit:]:
+            total += value
+        return total
+    half = n // 2
+    half -= half % 8
+    return _pairwise_sum(values[:half]) + _pairwise_sum(values[half:])
+
+
+def _mean(values):
+    return _pairwise_sum(values) / len(values)
+
+
+def _std(values):
+    mean = _mean(values)
+    deviations = [value - mean for value in values]
+    return math.sqrt(_pairwise_sum([d * d for d in deviations]) / len(values))
+
 
 class AdvancedPerformanceEvaluator:
-    def __init__(self):
-        self.performance_criteria = {
-            'quality_of_work': {
-                'weight': 0.25,
-                'description': 'Accuracy, attention to detail, and excellence of deliverables'
-            },
-            'productivity': {
-                'weight': 0.20,
-                'description': 'Efficiency, output volume, and time management'
-            },
-            'teamwork': {
-                'weight': 0.15,
-                'description': 'Collaboration, support for colleagues, and team contribution'
-            },
-            'communication': {
-                'weight': 0.20,
-                'description': 'Clarity, effectiveness, and professionalism in communication'
-            },
-            'initiative': {
-                'weight': 0.20,
-                'description': 'Proactivity, problem-solving, and innovative thinking'
-            }
-        }
+    # (metric label, method) for each analytical layer of evaluate_performance
+    EVALUATION_LAYERS = (
+        ('basic_scores', '_calculate_basic_scores'),
+        ('patterns', '_analyze_performance_patterns'),
+        ('predictive', '_generate_predictive_insights'),
+        ('skill_gaps', '_analyze_skill_gaps'),
+        ('benchmarking', '_benchmark_performance'),
+        ('growth', '_calculate_growth_trajectory'),
+        ('risk', '_assess_performance_risks')
+    )
+    
+    # Output fields contributed by each layer, for layers=/fields= selection
+    LAYER_FIELDS = LAYER_FIELDS
+    RESULT_METADATA = RESULT_METADATA
+    
+    def __init__(self, rubric=None, percentiles=None, benchmarks=None, covariance=None, risk_model=None):
+        # Criteria, weights and scoring tables come from a compiled rubric (rubrics/default.json by default)
+        self.rubric = rubric if rubric is not None else default_rubric()
+        self.performance_criteria = self.rubric.performance_criteria
+        # Logistic risk coefficients (models/risk_model.json by default)
+        self.risk_model = risk_model if risk_model is not None else default_risk_model()
+        
+        # Population statistics learned from every observed evaluation
+        self.percentiles = percentiles if percentiles is not None else PercentileEngine()
+        self.benchmarks = benchmarks if benchmarks is not None else PeerBenchmarks()
+        self.skill_correlations = covariance if covariance is not None else SkillCovariance(self.rubric.criteria)
         
         # Initialize AI model parameters
         self.initialize_ai_models()
     
+    def with_rubric(self, rubric):
+        """
+        Evaluator for another rubric that shares this one's population percentiles.
+        Peer benchmarks and skill covariance compare criterion by criterion, so
+        they are only shared between rubrics scoring the same criteria;
+        otherwise the new evaluator starts its own (see load_benchmarks).
+        """
+        if rubric.criteria == self.rubric.criteria:
+            return type(self)(rubric, self.percentiles, self.benchmarks, self.skill_correlations,
+                              risk_model=self.risk_model)
+        return type(self)(rubric, self.percentiles, risk_model=self.risk_model)
+    
     def initialize_ai_models(self):
         """Initialize various AI models and parameters"""
         # Performance patterns database (simulated)
@@ -40,86 +115,262 @@ class AdvancedPerformanceEvaluator:
             'needs_support': {'threshold': 4.0, 'traits': ['struggling', 'needs_guidance', 'developing']}
         }
         
-        # Skill correlation matrix (simulated ML insights)
-        self.skill_correlations = {
-            'quality_of_work': {'communication': 0.7, 'initiative': 0.6},
-            'productivity': {'initiative': 0.8, 'quality_of_work': 0.5},
-            'teamwork': {'communication': 0.9, 'initiative': 0.4},
-            'communication': {'teamwork': 0.9, 'quality_of_work': 0.7},
-            'initiative': {'productivity': 0.8, 'quality_of_work': 0.6}
-        }
+        # Scoring tables shared by the single-record and batch paths
+        rubric = self.rubric
+        self.performance_levels = rubric.performance_levels
+        self.simulated_percentiles = rubric.simulated_percentiles
+        self.trait_labels = rubric.trait_labels
+        self.growth_potential_tiers = [
+            {'level': 'Very High', 'timeline': '3-6 months',
+             'recommendation': 'Ready for advanced responsibilities and leadership roles'},
+            {'level': 'High', 'timeline': '6-12 months',
+             'recommendation': 'Strong potential for role expansion and skill development'},
+            {'level': 'Moderate', 'timeline': '12-18 months',
+             'recommendation': 'Focus on core competency development before advancement'},
+            {'level': 'Foundation', 'timeline': '18+ months',
+             'recommendation': 'Concentrate on building fundamental skills and consistency'}
+        ]
+        # Tenure (months) after which it stops adding to promotion readiness
+        self.promotion_tenure_cap = rubric.promotion_tenure_cap
+        self.promotion_tiers = [
+            {'ready': True, 'timeline': 'Immediate', 'confidence': 'High'},
+            {'ready': False, 'timeline': '6-12 months', 'confidence': 'Medium'},
+            {'ready': False, 'timeline': '12+ months', 'confidence': 'Low'}
+        ]
+        # (upper tenure bound in months, group label, benchmark score)
+        self.tenure_benchmarks = rubric.tenure_benchmarks
+        self.confidence_tiers = [
+            {'score': 0.95, 'level': 'Very High', 'reason': 'Consistent scoring pattern'},
+            {'score': 0.85, 'level': 'High', 'reason': 'Relatively consistent pattern'},
+            {'score': 0.75, 'level': 'Medium', 'reason': 'Moderate score variation'},
+            {'score': 0.65, 'level': 'Low', 'reason': 'High score variability detected'}
+        ]
+        self.skill_importance = rubric.importance_of
+        self.skill_level_bands = rubric.skill_level_bands
+        self.target_level_bands = rubric.target_level_bands
+        self.gap_mitigations = rubric.gap_mitigations
+        # Tier entries are returned as shared, pre-encoded constants
+        for tier in self.growth_potential_tiers + self.promotion_tiers + self.confidence_tiers:
+            constant(tier)
+        self._batch_label_cache = {}
+        self._shared_entry_cache = {}
+        self._synergy_models = {}
+        self._all_layers = frozenset(self.LAYER_FIELDS)
+        self._field_layers = {field: layer for layer, fields in self.LAYER_FIELDS.items() for field in fields}
     
-    def evaluate_performance(self, scores, tenure_months=12, previous_evaluations=None):
+    def evaluate_performance(self, scores, tenure_months=12, previous_evaluations=None, trajectory=None,
+                             profile=None, layers=None, fields=None):
         """
         Advanced AI-powered performance evaluation with multiple analytical layers
+        
+        History comes either as previous_evaluations (oldest first, each with
+        detailed_scores and overall_score) or as the employee's running
+        TrajectoryStats, which avoids rescanning long histories. profile holds
+        the employee's department and period for population comparisons.
+        
+        layers (names from LAYER_FIELDS) and fields (output keys) restrict the
+        result; only the layers they need are computed. Layer 1 always runs
+        since every other layer builds on the overall score.
         """
+        selected = self.select_layers(layers, fields)
+        
         # Layer 1: Basic Score Calculation
         basic_analysis = self._calculate_basic_scores(scores)
+        overall_score = basic_analysis['overall_score']
+        analyses = {'basic_scores': basic_analysis}
+        
+        # Running history statistics including this evaluation
+        history = None
+        if 'predictive' in selected or 'growth' in selected or 'risk' in selected:
+            history = self._build_trajectory(scores, overall_score, previous_evaluations, trajectory)
         
         # Layer 2: AI Pattern Recognition
-        pattern_analysis = self._analyze_performance_patterns(scores, basic_analysis['overall_score'])
+        if 'patterns' in selected:
+            analyses['patterns'] = self._analyze_performance_patterns(scores, overall_score, profile)
         
         # Layer 3: Predictive Analytics
-        predictive_insights = self._generate_predictive_insights(scores, tenure_months, previous_evaluations)
+        if 'predictive' in selected:
+            analyses['predictive'] = self._generate_predictive_insights(scores, tenure_months, history)
         
         # Layer 4: Skill Gap Analysis
-        gap_analysis = self._analyze_skill_gaps(scores)
+        if 'skill_gaps' in selected:
+            analyses['skill_gaps'] = self._analyze_skill_gaps(scores, profile)
         
         # Layer 5: Comparative Benchmarking
-        benchmarking = self._benchmark_performance(scores, tenure_months)
+        if 'benchmarking' in selected:
+            analyses['benchmarking'] = self._benchmark_performance(scores, tenure_months, overall_score, profile)
         
         # Layer 6: Growth Trajectory
-        growth_analysis = self._calculate_growth_trajectory(scores, previous_evaluations)
+        if 'growth' in selected:
+            analyses['growth'] = self._calculate_growth_trajectory(scores, history)
         
         # Layer 7: Risk Assessment
-        risk_analysis = self._assess_performance_risks(scores, pattern_analysis)
-        
-        # Combine all analyses
-        comprehensive_result = {
-            **basic_analysis,
-            **pattern_analysis,
-            **predictive_insights,
-            **gap_analysis,
-            **benchmarking,
-            **growth_analysis,
-            **risk_analysis,
-            'evaluation_timestamp': datetime.now().isoformat(),
-            'ai_model_version': 'v2.1.0',
-            'analysis_confidence': self._calculate_confidence_score(scores)
-        }
+        if 'risk' in selected:
+            analyses['risk'] = self._assess_performance_risks(scores, overall_score,
+                                                              basic_analysis['score_consistency'],
+                                                              tenure_months, history)
+        
+        # Combine the selected analyses
+        combined = {}
+        for layer in selected:
+            combined.update(analyses[layer])
+        comprehensive_result = EvaluationResult(
+            **combined,
+            evaluation_timestamp=datetime.now().isoformat(),
+            ai_model_version='v2.1.0',
+            rubric_version=self.rubric.version,
+            risk_model_version=self.risk_model.version
+        )
+        if fields is None or 'analysis_confidence' in fields:
+            comprehensive_result.analysis_confidence = self._calculate_confidence_score(scores)
         
-        return comprehensive_result
+        return self.select_fields(comprehensive_result, selected, fields)
+    
+    def select_layers(self, layers=None, fields=None):
+        """Layers whose output a layers=/fields= selection needs; everything when neither is given"""
+        if layers is None and fields is None:
+            return self._all_layers
+        selected = set()
+        for layer in layers or ():
+            if layer not in self.LAYER_FIELDS:
+                raise ValueError(f'Unknown layer {layer!r}; expected one of {list(self.LAYER_FIELDS)}')
+            selected.add(layer)
+        for field in fields or ():
+            layer = self._field_layers.get(field)
+            if layer is None and field not in self.RESULT_METADATA:
+                raise ValueError(f'Unknown field {field!r}')
+            if layer is not None:
+                selected.add(layer)
+        return frozenset(selected)
+    
+    def select_fields(self, result, selected, fields=None):
+        """Trim a result to the selected layers, or to exactly the requested fields"""
+        if fields is not None:
+            return {field: result[field] for field in fields if field in result}
+        if selected is self._all_layers or len(selected) == len(self.LAYER_FIELDS):
+            return result
+        keep = {field for layer in selected for field in self.LAYER_FIELDS[layer]}
+        keep.update(self.RESULT_METADATA)
+        return EvaluationResult(**{key: value for key, value in result.items() if key in keep})
+    
+    def apply_population(self, result, scores, tenure_months=12, profile=None, layers=None):
+        """Refresh the population-dependent fields of a previously computed result"""
+        layers = self._all_layers if layers is None else layers
+        if 'patterns' in layers:
+            level = result['performance_level']
+            if level['level'] != 'Unknown':
+                result['performance_level'] = dict(level, percentile=self._calculate_percentile(result['overall_score'], profile))
+        if 'skill_gaps' in layers:
+            department = (profile or {}).get('department')
+            result['skill_synergies'], result['gap_impact_analysis'] = self._skill_interactions(scores, department)
+        if 'benchmarking' in layers:
+            result.update(self._benchmark_performance(scores, tenure_months, result['overall_score'], profile))
+        return result
+    
+    def observe(self, result):
+        """Learn from a scored evaluation (evaluator output merged with employee info)"""
+        scores = result['detailed_scores']
+        values = dict(scores, overall=result['overall_score'], average=sum(scores.values()) / len(scores))
+        tenure_key = self._tenure_group(result['tenure_months'])[0] if 'tenure_months' in result else None
+        self.percentiles.observe(result['overall_score'], result.get('department'), result.get('period'))
+        self.benchmarks.observe(values, result.get('department'), result.get('position'), tenure_key)
+        self.skill_correlations.observe(scores, result.get('department'))
+    
+    def population_version(self):
+        """Changes whenever the learned population does, so cached responses can be told apart"""
+        return self.percentiles.total()
+    
+    def load_population(self, store):
+        """Seed percentile sketches and peer aggregates from an EvaluationStore"""
+        self.percentiles.load_histogram(store.score_histogram())
+        self.load_benchmarks(store)
+    
+    def load_benchmarks(self, store):
+        """Seed peer aggregates and skill covariance from the stored evaluations scored on this rubric's criteria"""
+        criteria = list(self.performance_criteria)
+        for kind, column in (('all', None), ('department', 'department'), ('position', 'position'),
+                             ('tenure', 'tenure_months')):
+            for name, count, sums, squares in store.score_moments(column, criteria):
+                if kind == 'tenure':
+                    name = self._tenure_group(name)[0]
+                self.benchmarks.load(kind, name, RunningMoments.from_sums(count, sums, squares))
+        for column in (None, 'department'):
+            for name, count, sums, products in store.score_products(column, criteria):
+                self.skill_correlations.load(name, RunningCovariance.from_sums(count, sums, products))
+    
+    def apply_history(self, result, scores, previous_evaluations=None, trajectory=None, layers=None):
+        """Overlay the history-dependent fields on a result evaluated without history"""
+        layers = self._all_layers if layers is None else layers
+        if 'predictive' not in layers and 'growth' not in layers:
+            return result
+        history = self._build_trajectory(scores, result['overall_score'], previous_evaluations, trajectory)
+        if 'predictive' in layers:
+            result.update(self._history_predictions(scores, history))
+        if 'growth' in layers:
+            result.update(self._calculate_growth_trajectory(scores, history))
+        return result
+    
+    def apply_risk(self, result, scores, tenure_months=12, previous_evaluations=None, trajectory=None,
+                   layers=None):
+        """Recompute the risk fields, which depend on exact tenure and on history, on a cached result"""
+        layers = self._all_layers if layers is None else layers
+        if 'risk' not in layers:
+            return result
+        history = None
+        if previous_evaluations or trajectory is not None:
+            history = self._build_trajectory(scores, result['overall_score'], previous_evaluations, trajectory)
+        result.update(self._assess_performance_risks(scores, result['overall_score'], result['score_consistency'],
+                                                     tenure_months, history))
+        return result
+    
+    def _history_predictions(self, scores, history):
+        """The history-dependent fields of layer 3"""
+        return {
+            'performance_trajectory': self._predict_performance_trajectory(scores, history),
+            'predicted_next_score': self._predict_next_performance(scores, history),
+            'forecast_interval': self._predict_forecast_interval(history)
+        }
+    
+    def _build_trajectory(self, scores, overall_score, previous_evaluations, trajectory):
+        """Running statistics over the prior history plus the current evaluation"""
+        if trajectory is None:
+            trajectory = TrajectoryStats.from_history(previous_evaluations or [])
+        return trajectory.updated(scores, overall_score)
     
     def _calculate_basic_scores(self, scores):
         """Layer 1: Basic score calculations with weighted averages"""
-        # Weighted overall score
-        weighted_score = sum(scores[k] * self.performance_criteria[k]['weight'] 
-                           for k in scores.keys())
+        # Weighted overall score; scores in rubric order zip straight against the weight vector
+        rubric = self.rubric
+        if tuple(scores) == rubric.criteria:
+            weighted_score = sum(map(mul, scores.values(), rubric.weights))
+        else:
+            weight_of = rubric.weight_of
+            weighted_score = sum(scores[k] * weight_of[k] for k in scores)
         
         # Standard deviation for consistency analysis
-        score_std = np.std(list(scores.values()))
+        score_std = _std(list(scores.values()))
         
         # Performance distribution analysis
-        score_distribution = {
-            'excellent_scores': len([s for s in scores.values() if s >= 9]),
-            'good_scores': len([s for s in scores.values() if 7 <= s < 9]),
-            'average_scores': len([s for s in scores.values() if 5 <= s < 7]),
-            'poor_scores': len([s for s in scores.values() if s < 5])
-        }
+        score_distribution = self._shared_entry('distribution', (
+            len([s for s in scores.values() if s >= 9]),
+            len([s for s in scores.values() if 7 <= s < 9]),
+            len([s for s in scores.values() if 5 <= s < 7]),
+            len([s for s in scores.values() if s < 5])
+        ))
         
         return {
             'overall_score': round(weighted_score, 2),
             'weighted_score': round(weighted_score, 2),
-            'simple_average': round(np.mean(list(scores.values())), 2),
+            'simple_average': round(_mean(list(scores.values())), 2),
             'score_consistency': round(score_std, 2),
             'score_distribution': score_distribution,
             'detailed_scores': scores
         }
     
-    def _analyze_performance_patterns(self, scores, overall_score):
+    def _analyze_performance_patterns(self, scores, overall_score, profile=None):
         """Layer 2: AI pattern recognition and classification"""
         # Classify performance level
-        performance_level = self._classify_performance_level(overall_score)
+        performance_level = self._classify_performance_level(overall_score, profile)
         
         # Identify dominant traits
         dominant_traits = self._identify_dominant_traits(scores)
@@ -138,7 +389,7 @@ class AdvancedPerformanceEvaluator:
             'ai_classification': self._get_ai_classification(scores, overall_score)
         }
     
-    def _generate_predictive_insights(self, scores, tenure_months, previous_evaluations):
+    def _generate_predictive_insights(self, scores, tenure_months, history):
         """Layer 3: Predictive analytics and future performance forecasting"""
         # Growth potential prediction
         growth_potential = self._predict_growth_potential(scores, tenure_months)
@@ -147,7 +398,7 @@ class AdvancedPerformanceEvaluator:
         promotion_readiness = self._assess_promotion_readiness(scores, tenure_months)
         
         # Performance trajectory
-        trajectory = self._predict_performance_trajectory(scores, previous_evaluations)
+        trajectory = self._predict_performance_trajectory(scores, history)
         
         # Skill development timeline
         development_timeline = self._estimate_development_timeline(scores)
@@ -157,90 +408,493 @@ class AdvancedPerformanceEvaluator:
             'promotion_readiness': promotion_readiness,
             'performance_trajectory': trajectory,
             'development_timeline': development_timeline,
-            'predicted_next_score': self._predict_next_performance(scores, previous_evaluations)
+            'predicted_next_score': self._predict_next_performance(scores, history),
+            'forecast_interval': self._predict_forecast_interval(history)
         }
     
-    def _analyze_skill_gaps(self, scores):
+    def _analyze_skill_gaps(self, scores, profile=None):
         """Layer 4: Comprehensive skill gap analysis"""
         critical_gaps = self._identify_critical_gaps(scores)
-        skill_synergies = self._analyze_skill_synergies(scores)
+        skill_synergies, gap_impact = self._skill_interactions(scores, (profile or {}).get('department'))
         improvement_priority = self._prioritize_improvement_areas(scores)
         
         return {
             'critical_skill_gaps': critical_gaps,
             'skill_synergies': skill_synergies,
             'improvement_priority': improvement_priority,
-            'gap_impact_analysis': self._analyze_gap_impact(scores)
+            'gap_impact_analysis': gap_impact
         }
     
-    def _benchmark_performance(self, scores, tenure_months):
-        """Layer 5: Multi-dimensional benchmarking"""
+    def _benchmark_performance(self, scores, tenure_months, overall_score, profile=None):
+        """Layer 5: Multi-dimensional benchmarking against materialized peer aggregates"""
+        profile = profile or {}
         tenure_benchmark = self._benchmark_against_tenure(scores, tenure_months)
-        role_benchmark = self._benchmark_against_role(scores)
-        industry_benchmark = self._benchmark_against_industry(scores)
+        role_benchmark = self._benchmark_against_role(scores, overall_score, profile.get('position'))
+        industry_benchmark = self._benchmark_against_industry(scores, overall_score)
         
         return {
             'tenure_benchmark': tenure_benchmark,
             'role_benchmark': role_benchmark,
             'industry_benchmark': industry_benchmark,
-            'competitive_positioning': self._determine_competitive_position(scores)
+            'competitive_positioning': self._determine_competitive_position(scores, overall_score,
+                                                                            profile.get('department'))
         }
     
-    def _calculate_growth_trajectory(self, scores, previous_evaluations):
+    def _calculate_growth_trajectory(self, scores, history):
         """Layer 6: Growth trajectory and development analysis"""
-        if previous_evaluations and len(previous_evaluations) >= 2:
-            growth_rate = self._calculate_growth_rate(previous_evaluations, scores)
-            learning_velocity = self._calculate_learning_velocity(previous_evaluations)
+        return self._growth_fields(scores, history)
+    
+    def _growth_fields(self, scores, history):
+        """Layer 6 itself, outside the layer timers so the batch path can share it"""
+        if history is not None and history.cycles >= 2:
+            growth_rate = self._calculate_growth_rate(history, scores)
+            learning_velocity = self._calculate_learning_velocity(history)
+            criterion_trends = {
+                skill: {'slope': round(history.slope(skill), 3) + 0.0,
+                        'acceleration': round(history.acceleration(skill), 3) + 0.0}
+                for skill in scores
+            }
         else:
             growth_rate = "Insufficient data"
             learning_velocity = "Baseline established"
+            criterion_trends = {}
         
         return {
             'growth_rate': growth_rate,
             'learning_velocity': learning_velocity,
+            'criterion_trends': criterion_trends,
             'skill_acquisition_pace': self._estimate_skill_acquisition(scores),
             'career_development_stage': self._determine_development_stage(scores)
         }
     
-    def _assess_performance_risks(self, scores, pattern_analysis):
-        """Layer 7: Risk assessment and mitigation analysis"""
-        burnout_risk = self._assess_burnout_risk(scores, pattern_analysis)
-        attrition_risk = self._assess_attrition_risk(scores)
-        performance_volatility = self._assess_volatility_risk(scores)
+    def _assess_performance_risks(self, scores, overall_score, score_spread, tenure_months, history):
+        """Layer 7: Logistic burnout, attrition and volatility risk with mitigation advice"""
+        ready = self._assess_promotion_readiness(scores, tenure_months)['ready']
+        features = risk_features(overall_score, min(scores.values()), score_spread, tenure_months, history, ready)
+        return self.risk_model.assess(features)
+    
+    # ========== VECTORIZED BATCH EVALUATION ==========
+    
+    def evaluate_batch(self, score_matrix, tenure_months=12, profiles=None, trajectories=None):
+        """
+        Evaluate many employees in one pass from an N x k score matrix.
+        
+        Columns follow the order of performance_criteria; tenure_months may be
+        a scalar or a length-N vector and profiles a single profile or one per
+        row. trajectories optionally holds each row's running TrajectoryStats
+        before this evaluation (None where there is no history). Every layer
+        is computed column-wise, history features included, and each record
+        matches evaluate_performance for the same row and trajectory; only the
+        forecast and growth fields of rows with history are filled in per
+        record. Constant sub-objects are shared between records, so copy them
+        before mutating.
+        """
+        import numpy as np
+        scores = np.asarray(score_matrix)
+        criteria = list(self.performance_criteria)
+        if scores.ndim != 2 or scores.shape[1] != len(criteria):
+            raise ValueError(f'score_matrix must have shape (N, {len(criteria)})')
+        
+        if profiles is None or isinstance(profiles, dict):
+            profiles = [profiles or {}] * len(scores)
+        
+        histories = self._batch_histories(scores, trajectories) if trajectories is not None else None
+        frame = self._build_batch_frame(scores, tenure_months, histories)
+        frame['percentile'] = self._batch_percentiles(frame['overall_score'], frame['percentile'], profiles)
+        static_fields = self._batch_static_fields()
+        timestamp = datetime.now().isoformat()
+        
+        records = [self._batch_record(row, score_row, criteria, static_fields, timestamp, profile)
+                   for row, score_row, profile in zip(self._batch_rows(frame), scores.tolist(), profiles)]
+        for record, history in zip(records, histories or ()):
+            if history is not None:
+                record.update(self._history_predictions(record['detailed_scores'], history))
+                record.update(self._growth_fields(record['detailed_scores'], history))
+        return records
+    
+    def _batch_histories(self, scores, trajectories):
+        """
+        Each row's trajectory including this evaluation, as _build_trajectory
+        makes it; None for rows without prior cycles, whose history-dependent
+        fields are exactly the batch defaults
+        """
+        if len(trajectories) != len(scores):
+            raise ValueError(f'trajectories must have one entry per row ({len(scores)})')
+        criteria = list(self.performance_criteria)
+        overall = self._batch_overall(scores.astype(float)).tolist()
+        return [trajectory.updated(dict(zip(criteria, score_row)), overall_score)
+                if trajectory is not None and trajectory.cycles else None
+                for trajectory, score_row, overall_score in zip(trajectories, scores.tolist(), overall)]
+    
+    def _build_batch_frame(self, scores, tenure_months, histories=None):
+        """Compute every score-dependent layer as columns over the whole batch"""
+        import numpy as np
+        criteria = list(self.performance_criteria)
+        values = scores.astype(np.float64)
+        n = len(values)
+        tenure = np.broadcast_to(np.asarray(tenure_months, dtype=np.float64), (n,))
+        weights = np.array(self.rubric.weights)
+        importance = np.array(self.rubric.importance)
+        column = {k: values[:, j] for j, k in enumerate(criteria)}
+        
+        # Layer 1
+        overall = self._batch_overall(values)
+        mean = values.mean(axis=1)
+        std = values.std(axis=1)
+        
+        # Layer 2: level, percentile and bit-coded trait/pattern/classification sets
+        level = self._batch_levels(overall)
+        rounded = np.rint(overall)
+        percentile = np.full(n, 50)
+        for score, value in self.simulated_percentiles.items():
+            percentile[rounded == score] = value
+        all_solid = (values >= 7).all(axis=1)
+        no_score = np.zeros(n)
+        initiative = column.get('initiative', no_score)
+        communication = column.get('communication', no_score)
+        teamwork = column.get('teamwork', no_score)
+        quality = column.get('quality_of_work', no_score)
+        bits = 1 << np.arange(len(criteria))
+        traits = ((values >= 8) * bits).sum(axis=1)
+        patterns = (all_solid * 1 + ((initiative >= 8) & (communication >= 8)) * 2 +
+                    ((teamwork >= 8) & (communication >= 8)) * 4 + (quality >= 9) * 8)
+        classification = (overall >= 8.5) * 1 + all_solid * 2 + (initiative >= 8) * 4
+        
+        # Layer 3: growth potential and promotion readiness tiers
+        growth = np.select([(mean >= 8.5) & (std <= 1.0), (mean >= 7.5) & (std <= 1.5), mean >= 6.5],
+                           [0, 1, 2], default=3)
+        promotion = self._batch_promotion(mean, tenure)
+        
+        # Layer 4: critical gaps and improvement priorities, ordered like sorted(..., reverse=True)
+        headroom = weights * (10 - values)
+        gap_mask = values <= 5
+        impact = np.round(headroom, 2)
+        gap_order = np.argsort(np.where(gap_mask, -impact, np.inf), axis=1, kind='stable')
+        priority = np.round(headroom * importance, 3)
+        priority_order = np.argsort(-priority, axis=1, kind='stable')[:, :3]
+        
+        # Layer 5: tenure benchmark
+        tenure_group = np.searchsorted(self.rubric.tenure_bounds, tenure, side='left')
+        benchmark = np.array([self._tenure_benchmark(key, score) for _, key, score in self.tenure_benchmarks])[tenure_group]
+        deviation = mean - benchmark
+        
+        # Analysis confidence
+        score_range = values.max(axis=1) - values.min(axis=1)
+        confidence = np.select([(std <= 1.0) & (score_range <= 3), (std <= 1.5) & (score_range <= 4), std <= 2.0],
+                               [0, 1, 2], default=3)
+        
+        # Layer 7: risk from the scores, tenure and, for rows with history, the running trajectory
+        risk_levels, risk_probabilities, risk_factors = self.risk_model.assess_batch(self._batch_risk_features(
+            overall, values.min(axis=1), np.round(std, 2), tenure, promotion, histories))
         
         return {
-            'burnout_risk': burnout_risk,
-            'attrition_risk': attrition_risk,
-            'performance_volatility': performance_volatility,
-            'mitigation_recommendations': self._generate_risk_mitigation(scores)
+            'overall_score': overall,
+            'simple_average': np.round(mean, 2),
+            'score_consistency': np.round(std, 2),
+            'excellent_scores': (values >= 9).sum(axis=1),
+            'good_scores': ((values >= 7) & (values < 9)).sum(axis=1),
+            'average_scores': ((values >= 5) & (values < 7)).sum(axis=1),
+            'poor_scores': (values < 5).sum(axis=1),
+            'level': level,
+            'percentile': percentile,
+            'traits': traits,
+            'patterns': patterns,
+            'classification': classification,
+            'stability': np.round(10 - std, 2),
+            'growth': growth,
+            'promotion': promotion,
+            'gap_count': gap_mask.sum(axis=1),
+            'gap_order': gap_order,
+            'impact': impact,
+            'priority': priority,
+            'priority_order': priority_order,
+            'tenure_group': tenure_group,
+            'benchmark_score': benchmark,
+            'deviation': deviation,
+            'rounded_deviation': np.round(deviation, 2),
+            'confidence': confidence,
+            'risk_level': risk_levels,
+            'risk_probability': risk_probabilities,
+            'risk_factors': risk_factors
         }
     
-    # ========== IMPLEMENTATION OF INDIVIDUAL AI METHODS ==========
+    def _batch_overall(self, values):
+        """Weighted overall scores, accumulated in criteria order so rounding matches the scalar sum()"""
+        import numpy as np
+        weighted = np.zeros(len(values))
+        for j, weight in enumerate(self.rubric.weights):
+            weighted = weighted + values[:, j] * weight
+        return np.round(weighted, 2)
+    
+    def _batch_levels(self, overall):
+        """Index into performance_levels per row, len(performance_levels) when unclassified"""
+        import numpy as np
+        ranges = list(self.performance_levels)
+        return np.select([(overall >= lo) & (overall <= hi) for lo, hi in ranges],
+                         range(len(ranges)), default=len(ranges))
+    
+    def _batch_promotion(self, mean, tenure):
+        """Index into promotion_tiers per row"""
+        import numpy as np
+        readiness = mean * 0.7 + np.minimum(tenure / self.promotion_tenure_cap, 1.0) * 0.3
+        return np.select([readiness >= 8.0, readiness >= 6.5], [0, 1], default=2)
+    
+    def _batch_risk_features(self, overall, lowest, spread, tenure, promotion, histories=None):
+        """N x F risk features as risk_features() builds them; rows without a history get the neutral ones"""
+        import numpy as np
+        n = len(overall)
+        no_history = np.zeros(n)
+        features = np.column_stack([overall, lowest, spread, np.minimum(tenure, TENURE_MONTHS_CAP) / 12,
+                                    no_history, no_history, no_history, no_history,
+                                    np.where(promotion == 0, 0.0, 1.0)])
+        for index, history in enumerate(histories or ()):
+            if history is not None:
+                features[index, -len(HISTORY_FEATURES):] = history_features(history, promotion[index] == 0)
+        return features
+    
+    def _batch_percentiles(self, overall, simulated, profiles):
+        """Population percentiles per (department, period) group, simulated where too few observations"""
+        groups = {}
+        for index, profile in enumerate(profiles):
+            groups.setdefault((profile.get('department'), profile.get('period')), []).append(index)
+        
+        percentile = simulated.copy()
+        for (department, period), rows in groups.items():
+            learned = self.percentiles.percentile_array(overall[rows], department, period)
+            if learned is not None:
+                percentile[rows] = learned
+        return percentile
+    
+    def _batch_rows(self, frame):
+        """Yield one dict of plain Python values per batch row"""
+        names = list(frame)
+        for values in zip(*(frame[name].tolist() for name in names)):
+            yield dict(zip(names, values))
     
-    def _classify_performance_level(self, overall_score):
-        levels = {
-            (9.0, 10.0): ('Exceptional', 'Top 5% of performers'),
-            (8.0, 9.0): ('Excellent', 'Top 15% of performers'),
-            (7.0, 8.0): ('Strong', 'Above average performer'),
-            (6.0, 7.0): ('Good', 'Meets all expectations'),
-            (5.0, 6.0): ('Developing', 'Meets basic expectations'),
-            (0.0, 5.0): ('Needs Support', 'Below expectations')
+    def _batch_static_fields(self):
+        """Layers that do not depend on the scores yet, computed once per batch"""
+        return {
+            'performance_trajectory': self._predict_performance_trajectory(None, None),
+            'development_timeline': self._estimate_development_timeline(None),
+            **self._growth_fields(None, None),
+            'ai_model_version': 'v2.1.0',
+            'rubric_version': self.rubric.version,
+            'risk_model_version': self.risk_model.version
         }
+    
+    def _batch_record(self, row, score_row, criteria, static_fields, timestamp, profile=None):
+        """Assemble one evaluate_performance-shaped record from a batch row"""
+        detailed_scores = dict(zip(criteria, score_row))
+        profile = profile or {}
+        levels = list(self.performance_levels.values())
+        if row['level'] < len(levels):
+            level, description = levels[row['level']]
+            performance_level = {'level': level, 'description': description, 'percentile': row['percentile']}
+        else:
+            performance_level = UNCLASSIFIED_LEVEL
+        
+        _, tenure_key, _ = self.tenure_benchmarks[row['tenure_group']]
+        deviation = row['deviation']
+        skill_synergies, gap_impact = self._skill_interactions(detailed_scores, profile.get('department'))
+        risk = self.risk_model.fields_from_columns(row['risk_level'], row['risk_probability'], row['risk_factors'])
+        
+        return EvaluationResult(
+            overall_score=row['overall_score'],
+            weighted_score=row['overall_score'],
+            simple_average=row['simple_average'],
+            score_consistency=row['score_consistency'],
+            score_distribution=self._shared_entry('distribution', (row['excellent_scores'], row['good_scores'],
+                                                                  row['average_scores'], row['poor_scores'])),
+            detailed_scores=detailed_scores,
+            performance_level=performance_level,
+            dominant_traits=self._batch_labels('traits', row['traits'], criteria),
+            detected_patterns=self._batch_labels('patterns', row['patterns'], criteria),
+            performance_stability=row['stability'],
+            ai_classification=self._batch_labels('classification', row['classification'], criteria),
+            growth_potential=self.growth_potential_tiers[row['growth']],
+            promotion_readiness=self.promotion_tiers[row['promotion']],
+            performance_trajectory=static_fields['performance_trajectory'],
+            development_timeline=static_fields['development_timeline'],
+            predicted_next_score=row['overall_score'],
+            forecast_interval=None,
+            critical_skill_gaps=[self._shared_entry('gap', (criteria[j], score_row[j], row['impact'][j]))
+                                 for j in row['gap_order'][:row['gap_count']]],
+            skill_synergies=skill_synergies,
+            improvement_priority=[self._shared_entry('priority', (criteria[j], score_row[j], row['priority'][j]))
+                                  for j in row['priority_order']],
+            gap_impact_analysis=gap_impact,
+            tenure_benchmark={
+                'tenure_group': tenure_key,
+                'benchmark_score': row['benchmark_score'],
+                'actual_score': row['simple_average'],
+                'deviation': row['rounded_deviation'],
+                'status': 'Above Benchmark' if deviation > 0.5 else
+                          'At Benchmark' if abs(deviation) <= 0.5 else 'Below Benchmark'
+            },
+            role_benchmark=self._benchmark_against_role(detailed_scores, row['overall_score'],
+                                                        profile.get('position')),
+            industry_benchmark=self._benchmark_against_industry(detailed_scores, row['overall_score']),
+            competitive_positioning=self._determine_competitive_position(detailed_scores, row['overall_score'],
+                                                                         profile.get('department')),
+            growth_rate=static_fields['growth_rate'],
+            learning_velocity=static_fields['learning_velocity'],
+            criterion_trends=static_fields['criterion_trends'],
+            skill_acquisition_pace=static_fields['skill_acquisition_pace'],
+            career_development_stage=static_fields['career_development_stage'],
+            burnout_risk=risk['burnout_risk'],
+            attrition_risk=risk['attrition_risk'],
+            performance_volatility=risk['performance_volatility'],
+            mitigation_recommendations=risk['mitigation_recommendations'],
+            evaluation_timestamp=timestamp,
+            ai_model_version=static_fields['ai_model_version'],
+            rubric_version=static_fields['rubric_version'],
+            risk_model_version=static_fields['risk_model_version'],
+            analysis_confidence=self.confidence_tiers[row['confidence']]
+        )
+    
+    def _shared_entry(self, kind, key):
+        """Interned score-distribution, critical-gap or improvement-priority entry"""
+        entry = self._shared_entry_cache.get((kind, key))
+        if entry is None:
+            if kind == 'distribution':
+                excellent, good, average, poor = key
+                entry = {'excellent_scores': excellent, 'good_scores': good,
+                         'average_scores': average, 'poor_scores': poor}
+            elif kind == 'gap':
+                skill, score, impact = key
+                entry = {
+                    'skill': skill.replace('_', ' ').title(),
+                    'current_score': score,
+                    'gap_severity': 'Critical' if score <= 4 else 'Significant',
+                    'business_impact': impact,
+                    'recommended_action': self._get_gap_mitigation(skill)
+                }
+            else:
+                skill, score, priority = key
+                entry = {
+                    'skill': skill,
+                    'priority_score': priority,
+                    'current_level': self._get_skill_level(score),
+                    'target_level': self._get_target_level(score),
+                    'improvement_urgency': 'High' if score <= 5 else 'Medium' if score <= 7 else 'Low'
+                }
+            entry = self._shared_entry_cache[(kind, key)] = constant(entry)
+        return entry
+    
+    def _batch_labels(self, kind, code, criteria):
+        """Decode a bit-coded label set, memoizing one shared list per code"""
+        key = (kind, code)
+        if key not in self._batch_label_cache:
+            if kind == 'traits':
+                labels = [self.trait_labels[k] for j, k in enumerate(criteria)
+                          if code >> j & 1 and k in self.trait_labels] or ['Balanced Performer']
+            elif kind == 'patterns':
+                names = ['Consistent High Performer', 'Leadership Potential', 'Team Player', 'Quality Focused']
+                labels = [name for j, name in enumerate(names) if code >> j & 1] or ['Standard Performance Pattern']
+            else:
+                names = ['High-Potential Employee', 'Well-Rounded Performer', 'Self-Starter']
+                labels = [name for j, name in enumerate(names) if code >> j & 1] or ['Standard Performer']
+            self._batch_label_cache[key] = constant(labels)
+        return self._batch_label_cache[key]
+    
+    # ========== WHAT-IF ANALYSIS ==========
+    
+    def what_if(self, scores, vary, tenure_months=12, score_range=(1, 10), max_points=10 ** 6):
+        """
+        Outcome surface over every combination of the varied criteria, with
+        the other criteria held at their base scores.
+        
+        All grid points are scored in one vectorized pass through the batch
+        kernels: overall score, performance level and promotion readiness per
+        point, in row-major order over vary (the first criterion varies
+        slowest). minimal_changes gives, for each level and readiness tier,
+        the reachable point nearest the base scores (smallest total of
+        absolute point moves, higher overall score on ties), or None.
+        """
+        import numpy as np
+        criteria = list(self.performance_criteria)
+        missing = [k for k in criteria if k not in scores]
+        if missing:
+            raise ValueError(f'Missing base scores for {missing}')
+        vary = list(dict.fromkeys(vary))
+        unknown = [k for k in vary if k not in self.performance_criteria]
+        if not vary or unknown:
+            raise ValueError(f'vary must name criteria from {criteria}' + (f', got {unknown}' if unknown else ''))
+        low, high = score_range
+        steps = high - low + 1
+        points = steps ** len(vary)
+        if points > max_points:
+            raise ValueError(f'{len(vary)} varied criteria give {points} grid points; the limit is {max_points}')
         
-        for range_, (level, description) in levels.items():
+        base = np.array([[scores[k] for k in criteria]], dtype=np.float64)
+        moves = np.indices((steps,) * len(vary), dtype=np.int64).reshape(len(vary), -1).T + low
+        values = np.repeat(base, points, axis=0)
+        columns = [criteria.index(k) for k in vary]
+        values[:, columns] = moves
+        tenure = np.float64(tenure_months)
+        
+        overall = self._batch_overall(values)
+        level = self._batch_levels(overall)
+        promotion = self._batch_promotion(values.mean(axis=1), tenure)
+        base_overall = self._batch_overall(base)
+        base_level = self._batch_levels(base_overall)
+        base_promotion = self._batch_promotion(base.mean(axis=1), tenure)
+        
+        # Nearest grid point per outcome: sort by distance then descending overall, keep each outcome's first
+        changes = moves - base[0, columns]
+        distance = np.abs(changes).sum(axis=1)
+        order = np.lexsort((-overall, distance))
+        
+        def nearest(codes, count):
+            found = [None] * count
+            outcomes, first = np.unique(codes[order], return_index=True)
+            for code, index in zip(outcomes.tolist(), first.tolist()):
+                point = int(order[index])
+                found[code] = {
+                    'total_change': round(float(distance[point]), 2) + 0.0,
+                    'changes': {k: round(float(delta), 2) + 0.0 for k, delta in zip(vary, changes[point]) if delta},
+                    'overall_score': float(overall[point])
+                }
+            return found
+        
+        levels = [label for label, _ in self.performance_levels.values()] + [UNCLASSIFIED_LEVEL['level']]
+        return {
+            'criteria': vary,
+            'values': list(range(low, high + 1)),
+            'shape': [steps] * len(vary),
+            'tenure_months': tenure_months,
+            'levels': levels,
+            'promotion_tiers': self.promotion_tiers,
+            'base': {
+                'scores': {k: scores[k] for k in criteria},
+                'overall_score': float(base_overall[0]),
+                'performance_level': levels[int(base_level[0])],
+                'promotion_readiness': self.promotion_tiers[int(base_promotion[0])]
+            },
+            'surface': {
+                'overall_score': overall.tolist(),
+                'performance_level': level.tolist(),
+                'promotion_readiness': promotion.tolist()
+            },
+            'minimal_changes': {
+                'performance_level': dict(zip(levels, nearest(level, len(levels)))),
+                'promotion_readiness': nearest(promotion, len(self.promotion_tiers))
+            },
+            'rubric_version': self.rubric.version
+        }
+    
+    # ========== IMPLEMENTATION OF INDIVIDUAL AI METHODS ==========
+    
+    def _classify_performance_level(self, overall_score, profile=None):
+        for range_, (level, description) in self.performance_levels.items():
             if range_[0] <= overall_score <= range_[1]:
-                return {'level': level, 'description': description, 'percentile': self._calculate_percentile(overall_score)}
-        return {'level': 'Unknown', 'description': 'Unable to classify', 'percentile': 0}
+                return {'level': level, 'description': description,
+                        'percentile': self._calculate_percentile(overall_score, profile)}
+        return UNCLASSIFIED_LEVEL
     
     def _identify_dominant_traits(self, scores):
         high_scores = {k: v for k, v in scores.items() if v >= 8}
-        traits = []
-        for skill, score in high_scores.items():
-            if skill == 'quality_of_work': traits.append('Detail-Oriented')
-            elif skill == 'productivity': traits.append('High-Output')
-            elif skill == 'teamwork': traits.append('Collaborative')
-            elif skill == 'communication': traits.append('Articulate')
-            elif skill == 'initiative': traits.append('Proactive')
+        traits = [self.trait_labels[skill] for skill in high_scores if skill in self.trait_labels]
         return traits if traits else ['Balanced Performer']
     
     def _detect_performance_patterns(self, scores):
@@ -256,89 +910,54 @@ class AdvancedPerformanceEvaluator:
         return patterns if patterns else ['Standard Performance Pattern']
     
     def _predict_growth_potential(self, scores, tenure_months):
-        avg_score = np.mean(list(scores.values()))
-        consistency = np.std(list(scores.values()))
+        avg_score = _mean(list(scores.values()))
+        consistency = _std(list(scores.values()))
         
         if avg_score >= 8.5 and consistency <= 1.0:
-            return {
-                'level': 'Very High',
-                'timeline': '3-6 months',
-                'recommendation': 'Ready for advanced responsibilities and leadership roles'
-            }
+            tier = 0
         elif avg_score >= 7.5 and consistency <= 1.5:
-            return {
-                'level': 'High', 
-                'timeline': '6-12 months',
-                'recommendation': 'Strong potential for role expansion and skill development'
-            }
+            tier = 1
         elif avg_score >= 6.5:
-            return {
-                'level': 'Moderate',
-                'timeline': '12-18 months', 
-                'recommendation': 'Focus on core competency development before advancement'
-            }
+            tier = 2
         else:
-            return {
-                'level': 'Foundation',
-                'timeline': '18+ months',
-                'recommendation': 'Concentrate on building fundamental skills and consistency'
-            }
+            tier = 3
+        return self.growth_potential_tiers[tier]
     
     def _assess_promotion_readiness(self, scores, tenure_months):
-        readiness_score = (np.mean(list(scores.values())) * 0.7 + 
-                          min(tenure_months / 24.0, 1.0) * 0.3)
+        readiness_score = (_mean(list(scores.values())) * 0.7 + 
+                          min(tenure_months / self.promotion_tenure_cap, 1.0) * 0.3)
         
         if readiness_score >= 8.0:
-            return {'ready': True, 'timeline': 'Immediate', 'confidence': 'High'}
+            tier = 0
         elif readiness_score >= 6.5:
-            return {'ready': False, 'timeline': '6-12 months', 'confidence': 'Medium'}
+            tier = 1
         else:
-            return {'ready': False, 'timeline': '12+ months', 'confidence': 'Low'}
+            tier = 2
+        return self.promotion_tiers[tier]
     
     def _identify_critical_gaps(self, scores):
         gaps = []
+        weight_of = self.rubric.weight_of
         for skill, score in scores.items():
             if score <= 5:
-                impact = self.performance_criteria[skill]['weight'] * (10 - score)
-                gaps.append({
-                    'skill': skill.replace('_', ' ').title(),
-                    'current_score': score,
-                    'gap_severity': 'Critical' if score <= 4 else 'Significant',
-                    'business_impact': round(impact, 2),
-                    'recommended_action': self._get_gap_mitigation(skill)
-                })
+                impact = weight_of[skill] * (10 - score)
+                gaps.append(self._shared_entry('gap', (skill, score, round(impact, 2))))
         return sorted(gaps, key=lambda x: x['business_impact'], reverse=True)
     
     def _prioritize_improvement_areas(self, scores):
         priorities = []
+        weight_of = self.rubric.weight_of
+        importance_of = self.skill_importance
         for skill, score in scores.items():
-            priority_score = (self.performance_criteria[skill]['weight'] * 
-                            (10 - score) * self._get_skill_importance(skill))
-            priorities.append({
-                'skill': skill,
-                'priority_score': round(priority_score, 3),
-                'current_level': self._get_skill_level(score),
-                'target_level': self._get_target_level(score),
-                'improvement_urgency': 'High' if score <= 5 else 'Medium' if score <= 7 else 'Low'
-            })
+            priority_score = weight_of[skill] * (10 - score) * importance_of.get(skill, 0.5)
+            priorities.append(self._shared_entry('priority', (skill, score, round(priority_score, 3))))
         return sorted(priorities, key=lambda x: x['priority_score'], reverse=True)[:3]
     
     def _benchmark_against_tenure(self, scores, tenure_months):
-        avg_score = np.mean(list(scores.values()))
-        
-        # Simulated tenure benchmarks
-        benchmarks = {
-            '0-6': 6.0, '7-12': 6.5, '13-24': 7.0, 
-            '25-36': 7.5, '37+': 8.0
-        }
-        
-        tenure_key = '37+'
-        if tenure_months <= 6: tenure_key = '0-6'
-        elif tenure_months <= 12: tenure_key = '7-12'
-        elif tenure_months <= 24: tenure_key = '13-24'
-        elif tenure_months <= 36: tenure_key = '25-36'
+        avg_score = _mean(list(scores.values()))
         
-        benchmark_score = benchmarks[tenure_key]
+        tenure_key, benchmark_score = self._tenure_group(tenure_months)
+        benchmark_score = self._tenure_benchmark(tenure_key, benchmark_score)
         deviation = avg_score - benchmark_score
         
         return {
@@ -350,26 +969,130 @@ class AdvancedPerformanceEvaluator:
                      'At Benchmark' if abs(deviation) <= 0.5 else 'Below Benchmark'
         }
     
+    def _tenure_group(self, tenure_months):
+        """(group label, simulated benchmark score) for a tenure"""
+        _, tenure_key, benchmark_score = self.tenure_benchmarks[bisect.bisect_left(self.rubric.tenure_bounds,
+                                                                                   tenure_months)]
+        return tenure_key, benchmark_score
+    
+    def _tenure_benchmark(self, tenure_key, simulated_score):
+        """Observed peer average for a tenure group once there are enough peers, else the simulated benchmark"""
+        peers = self.benchmarks.peers('tenure', tenure_key)
+        return round(peers.mean['average'], 2) if peers is not None else simulated_score
+    
     def _calculate_confidence_score(self, scores):
         """Calculate AI model confidence based on score patterns"""
-        consistency = np.std(list(scores.values()))
+        consistency = _std(list(scores.values()))
         score_range = max(scores.values()) - min(scores.values())
         
         if consistency <= 1.0 and score_range <= 3:
-            return {'score': 0.95, 'level': 'Very High', 'reason': 'Consistent scoring pattern'}
+            tier = 0
         elif consistency <= 1.5 and score_range <= 4:
-            return {'score': 0.85, 'level': 'High', 'reason': 'Relatively consistent pattern'}
+            tier = 1
         elif consistency <= 2.0:
-            return {'score': 0.75, 'level': 'Medium', 'reason': 'Moderate score variation'}
+            tier = 2
         else:
-            return {'score': 0.65, 'level': 'Low', 'reason': 'High score variability detected'}
+            tier = 3
+        return self.confidence_tiers[tier]
+    
+    def _skill_interactions(self, scores, department=None):
+        """(skill synergies, gap impact) from the live criterion covariance of the department or workforce"""
+        model = self._synergy_model(department)
+        if model is None:
+            return NO_SYNERGY_DATA, NO_GAP_IMPACT_DATA
+        key = tuple(map(scores.get, self.rubric.criteria))
+        analysis = model['memo'].get(key)
+        if analysis is None:
+            analysis = (self._analyze_skill_synergies(scores, model), self._analyze_gap_impact(scores, model))
+            if len(model['memo']) < 65536:
+                model['memo'][key] = analysis
+        return analysis
+    
+    def _synergy_model(self, department=None):
+        """Rubric-weighted view of a covariance snapshot, rebuilt only when the snapshot changes"""
+        snapshot = self.skill_correlations.snapshot(department)
+        if snapshot is None:
+            return None
+        model = self._synergy_models.get(snapshot.scope)
+        if model is None or model['snapshot'] is not snapshot:
+            criteria = snapshot.criteria
+            correlation = snapshot.correlation
+            pairs = sorted(((correlation[i][j], i, j) for i in range(len(criteria))
+                            for j in range(i + 1, len(criteria))), reverse=True)
+            # Overall points per point gained in a criterion, including the expected lift in the others
+            leverage = [sum(map(mul, self.rubric.weights, row)) for row in snapshot.slopes]
+            model = self._synergy_models[snapshot.scope] = {
+                'snapshot': snapshot,
+                'scope': snapshot.scope if snapshot.scope is not None else 'workforce',
+                'pairs': [{'skills': [criteria[i], criteria[j]], 'correlation': round(r, 2) + 0.0}
+                          for r, i, j in pairs[:3]],
+                'levers': sorted(zip(leverage, criteria), reverse=True),
+                'gaps': [(skill, peer_mean, gain, self.rubric.weight_of[skill])
+                         for skill, peer_mean, gain in zip(criteria, snapshot.mean, leverage)],
+                'synergies': {},
+                'areas': {},
+                'memo': {}
+            }
+        return model
+    
+    def _analyze_skill_synergies(self, scores, model):
+        # The improvable criterion whose gains carry furthest into the overall score
+        lever = next(((gain, skill) for gain, skill in model['levers']
+                      if scores.get(skill) is not None and scores[skill] < 10), None)
+        synergies = model['synergies'].get(lever)
+        if synergies is None:
+            snapshot = model['snapshot']
+            pairs = model['pairs']
+            if pairs and pairs[0]['correlation'] >= 0.3:
+                first, second = (skill.replace('_', ' ') for skill in pairs[0]['skills'])
+                strength = 'Strong' if pairs[0]['correlation'] >= 0.6 else 'Moderate'
+                analysis = f"{strength} correlation between {first} and {second} (r = {pairs[0]['correlation']:.2f})"
+            else:
+                analysis = 'No strong skill correlations'
+            synergies = model['synergies'][lever] = {
+                'analysis': f"{analysis} across {snapshot.count} {model['scope']} evaluations",
+                'top_pairs': pairs,
+                'best_lever': ({'skill': lever[1], 'overall_gain_per_point': round(lever[0], 3) + 0.0}
+                               if lever else None),
+                'scope': model['scope'],
+                'sample_size': snapshot.count
+            }
+        return synergies
+    
+    def _analyze_gap_impact(self, scores, model):
+        """Overall score gained by closing each below-peer criterion, directly and through correlated skills"""
+        areas = []
+        entries = model['areas']
+        for skill, peer_mean, leverage, weight in model['gaps']:
+            score = scores.get(skill)
+            if score is not None and score < peer_mean:
+                # An area depends only on (criterion, score) within a snapshot, so entries are shared
+                area = entries.get((skill, score))
+                if area is None:
+                    gap = peer_mean - score
+                    area = entries[(skill, score)] = ((leverage * gap, weight * gap, gap, skill), {
+                        'skill': skill, 'gap_to_peers': round(gap, 2), 'direct_gain': round(weight * gap, 2),
+                        'total_gain': round(leverage * gap, 2)})
+                areas.append(area)
+        areas.sort(key=itemgetter(0), reverse=True)
+        best = areas[0][0][0] if areas else 0.0
+        return {
+            'overall_impact': 'High' if best >= 0.75 else 'Moderate' if best >= 0.3 else 'Low',
+            'key_areas': [order[3].replace('_', ' ').title() for order, _ in areas[:2]],
+            'areas': [entry for _, entry in areas[:3]],
+            'scope': model['scope'],
+            'sample_size': model['snapshot'].count
+        }
     
     # ========== HELPER METHODS ==========
     
-    def _calculate_percentile(self, score):
-        # Simulated percentile calculation
-        percentiles = {10: 99, 9: 95, 8: 85, 7: 70, 6: 50, 5: 30, 4: 15, 3: 5}
-        return percentiles.get(round(score), 50)
+    def _calculate_percentile(self, score, profile=None):
+        profile = profile or {}
+        percentile = self.percentiles.percentile(score, profile.get('department'), profile.get('period'))
+        if percentile is not None:
+            return percentile
+        # Simulated percentile until enough of the population has been observed
+        return self.simulated_percentiles.get(round(score), 50)
     
     def _get_ai_classification(self, scores, overall_score):
         classifications = []
@@ -381,90 +1104,138 @@ class AdvancedPerformanceEvaluator:
             classifications.append('Self-Starter')
         return classifications if classifications else ['Standard Performer']
     
-    def _get_skill_importance(self, skill):
-        importance_weights = {
-            'quality_of_work': 1.0, 'productivity': 0.9, 
-            'communication': 0.9, 'initiative': 0.8, 'teamwork': 0.7
-        }
-        return importance_weights.get(skill, 0.5)
-    
     def _get_skill_level(self, score):
-        if score >= 9: return 'Expert'
-        elif score >= 8: return 'Advanced'
-        elif score >= 7: return 'Proficient'
-        elif score >= 6: return 'Competent'
-        elif score >= 5: return 'Developing'
-        else: return 'Beginner'
+        for threshold, label in self.skill_level_bands:
+            if score >= threshold: return label
     
     def _get_target_level(self, current_score):
-        if current_score >= 9: return 'Maintain Excellence'
-        elif current_score >= 8: return 'Reach Expert Level'
-        elif current_score >= 7: return 'Advance to Next Level'
-        elif current_score >= 6: return 'Become Proficient'
-        else: return 'Reach Competency'
+        for threshold, label in self.target_level_bands:
+            if current_score >= threshold: return label
     
     def _get_gap_mitigation(self, skill):
-        mitigations = {
-            'quality_of_work': 'Quality assurance training and peer review implementation',
-            'productivity': 'Time management workshop and workflow optimization',
-            'teamwork': 'Team building exercises and collaborative project assignments',
-            'communication': 'Communication skills training and presentation practice',
-            'initiative': 'Innovation challenges and self-directed project opportunities'
-        }
-        return mitigations.get(skill, 'Targeted skill development program')
+        return self.gap_mitigations.get(skill, 'Targeted skill development program')
     
     # ========== PLACEHOLDER METHODS FOR COMPREHENSIVE ANALYSIS ==========
     
     def _calculate_stability_score(self, scores):
-        return round(10 - np.std(list(scores.values())), 2)
+        return round(10 - _std(list(scores.values())), 2)
     
-    def _analyze_skill_synergies(self, scores):
-        return {'analysis': 'Positive skill correlations detected across communication and teamwork'}
-    
-    def _predict_performance_trajectory(self, scores, previous_evaluations):
-        return {'trend': 'Stable', 'momentum': 'Positive', 'outlook': 'Promising'}
+    def _predict_performance_trajectory(self, scores, history):
+        if history is None or history.cycles < 2:
+            return BASELINE_TRAJECTORY
+        slope = history.slope()
+        acceleration = history.acceleration()
+        forecast = history.forecast()
+        return {
+            'trend': 'Improving' if slope > 0.1 else 'Declining' if slope < -0.1 else 'Stable',
+            'momentum': 'Accelerating' if acceleration > 0.05 else 'Slowing' if acceleration < -0.05 else 'Steady',
+            'outlook': 'Promising' if forecast['point'] >= 8.0 or slope > 0.1 else
+                       'Concerning' if slope < -0.1 else 'Steady',
+            'slope': round(slope, 3) + 0.0,
+            'acceleration': round(acceleration, 3) + 0.0,
+            'cycles': history.cycles
+        }
     
     def _estimate_development_timeline(self, scores):
-        return {'estimated_timeline': '6 months for significant improvement'}
+        return DEVELOPMENT_TIMELINE
     
-    def _predict_next_performance(self, scores, previous_evaluations):
-        return round(np.mean(list(scores.values())) + 0.3, 2)
+    def _predict_next_performance(self, scores, history):
+        if history is None:
+            return None
+        forecast = history.forecast()
+        # With a single data point the best forecast is the current score
+        return round(forecast['point'] if forecast else history.mean(), 2)
     
-    def _analyze_gap_impact(self, scores):
-        return {'overall_impact': 'Moderate', 'key_areas': ['Communication', 'Initiative']}
+    def _predict_forecast_interval(self, history):
+        forecast = history.forecast() if history is not None else None
+        if not forecast or not forecast['interval']:
+            return None
+        low, high = forecast['interval']
+        return {'low': round(low, 2), 'high': round(high, 2), 'confidence': 0.95}
     
-    def _benchmark_against_role(self, scores):
-        return {'status': 'Meets Role Expectations', 'comparison': 'Aligned with peer group'}
+    def _benchmark_against_role(self, scores, overall_score=None, position=None):
+        peers = self.benchmarks.peers('position', position) if position is not None else None
+        if peers is None:
+            return NO_ROLE_PEERS
+        z_score = peers.z_score('overall', overall_score)
+        peer_mean = peers.mean['overall']
+        return {
+            'status': 'Exceeds Role Expectations' if z_score > 0.5 else
+                      'Below Role Expectations' if z_score < -0.5 else 'Meets Role Expectations',
+            'comparison': f'{overall_score - peer_mean:+.2f} vs {position} peer average of {peer_mean:.2f}',
+            'peer_count': peers.count,
+            'peer_mean': round(peer_mean, 2),
+            'z_score': round(z_score, 2) + 0.0
+        }
     
-    def _benchmark_against_industry(self, scores):
-        return {'status': 'Competitive', 'insight': 'Above industry average in quality and productivity'}
+    def _benchmark_against_industry(self, scores, overall_score=None):
+        peers = self.benchmarks.peers('all')
+        if peers is None:
+            return NO_WORKFORCE_BENCHMARK
+        z_score = peers.z_score('overall', overall_score)
+        strengths = [skill.replace('_', ' ') for skill, score in scores.items()
+                     if skill in peers.mean and score - peers.mean[skill] >= 0.5]
+        if len(strengths) > 1:
+            insight = f"Above workforce average in {', '.join(strengths[:-1])} and {strengths[-1]}"
+        elif strengths:
+            insight = f'Above workforce average in {strengths[0]}'
+        else:
+            insight = 'No criteria notably above the workforce average'
+        return {
+            'status': 'Above Average' if z_score > 0.5 else 'Below Average' if z_score < -0.5 else 'Competitive',
+            'insight': insight,
+            'peer_count': peers.count,
+            'z_score': round(z_score, 2) + 0.0
+        }
     
-    def _determine_competitive_position(self, scores):
-        return {'position': 'Strong Contender', 'differentiators': ['Quality Focus', 'Reliability']}
+    def _determine_competitive_position(self, scores, overall_score=None, department=None):
+        peers = self.benchmarks.peers('department', department) if department is not None else None
+        if peers is None:
+            return UNRANKED_POSITION
+        z_score = peers.z_score('overall', overall_score)
+        standouts = sorted(((peers.z_score(skill, score), skill) for skill, score in scores.items()
+                            if skill in peers.mean), reverse=True)
+        differentiators = [skill.replace('_', ' ').title() for z, skill in standouts if z >= 0.5]
+        return {
+            'position': 'Top Contender' if z_score >= 1.0 else 'Strong Contender' if z_score >= 0.25 else
+                        'Solid Contributor' if z_score > -0.25 else 'Developing Contributor',
+            'differentiators': differentiators or ['Balanced Profile'],
+            'peer_count': peers.count,
+            'z_score': round(z_score, 2) + 0.0
+        }
     
-    def _calculate_growth_rate(self, previous_evaluations, current_scores):
-        return '5.2% quarterly improvement'
+    def _calculate_growth_rate(self, history, current_scores):
+        mean = history.mean()
+        relative = history.slope() / mean * 100 if mean else 0.0
+        return f'{relative:+.1f}% per review cycle'
     
-    def _calculate_learning_velocity(self, previous_evaluations):
-        return 'Accelerated learning curve detected'
+    def _calculate_learning_velocity(self, history):
+        skills = [name for name in history.channels if name != TrajectoryStats.OVERALL]
+        velocity = sum(history.slope(k) for k in skills) / len(skills)
+        acceleration = sum(history.acceleration(k) for k in skills) / len(skills)
+        pace = ('Rapid' if velocity > 0.25 else 'Steady' if velocity > 0.05 else
+                'Plateaued' if velocity >= -0.05 else 'Regressing')
+        momentum = ', accelerating' if acceleration > 0.05 else ', slowing' if acceleration < -0.05 else ''
+        return f'{pace} learning curve{momentum} ({velocity:+.2f} pts/cycle)'
     
     def _estimate_skill_acquisition(self, scores):
         return 'Rapid skill development in technical domains'
     
     def _determine_development_stage(self, scores):
         return 'Mid-level professional with leadership potential'
-    
-    def _assess_burnout_risk(self, scores, pattern_analysis):
-        return {'risk_level': 'Low', 'factors': ['Good work-life balance indicators']}
-    
-    def _assess_attrition_risk(self, scores):
-        return {'risk_level': 'Low', 'retention_probability': 'High'}
-    
-    def _assess_volatility_risk(self, scores):
-        return {'risk_level': 'Low', 'stability': 'High performance consistency'}
-    
-    def _generate_risk_mitigation(self, scores):
-        return ['Continue current development path', 'Monitor workload balance']
 
-# Create advanced evaluator instance
-evaluator = AdvancedPerformanceEvaluator()
\ No newline at end of file
+
+# The shared evaluator instance is created on first access (PEP 562), so
+# importing the module for the class alone stays cheap
+_evaluator_lock = threading.Lock()
+
+
+def __getattr__(name):
+    if name != 'evaluator':
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    global evaluator
+    with _evaluator_lock:
+        if 'evaluator' not in globals():
+            # Create advanced evaluator instance
+            evaluator = AdvancedPerformanceEvaluator()
+    return evaluator
\ No newline at end of file
@@ -0,0 +1,176 @@
+import itertools
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+
+class EvaluationCache:
+    """
+    Memoizes evaluate_performance over the finite score space.
+    
+    Every criterion is an integer from 1 to 10 and tenure only matters through
+    a handful of buckets, so results are keyed on (scores, tenure bucket) and
+    only evaluation_timestamp is re-stamped on a hit. Population percentiles,
+    peer benchmarks, history-dependent growth fields and the risk scores are
+    recomputed on top of the cached result. Two modes are supported:
+    
+    - 'lru': lazily filled, bounded by maxsize, least recently used evicted
+    - 'table': the whole 10^k score grid is precomputed at startup into a
+      compact columnar table with evaluate_batch
+    
+    Cached results are shallow copies: nested objects are shared between hits.
+    """
+    
+    MODES = ('lru', 'table')
+    
+    def __init__(self, evaluator, mode='lru', maxsize=65536, score_range=(1, 10)):
+        if mode not in self.MODES:
+            raise ValueError(f'mode must be one of {self.MODES}')
+        self.evaluator = evaluator
+        self.mode = mode
+        self.maxsize = maxsize
+        self.score_range = score_range
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._tenure_fields = {}
+        self._table = None
+        if mode == 'table':
+            self._build_table()
+    
+    def tenure_bucket(self, tenure_months):
+        """Representative tenure that evaluates identically to tenure_months"""
+        # Promotion readiness scales with tenure until the cap, then only the
+        # tenure benchmark group matters
+        if tenure_months <= self.evaluator.promotion_tenure_cap:
+            return tenure_months
+        bounds = self.evaluator.rubric.tenure_bounds
+        for upper in bounds:
+            if tenure_months <= upper:
+                return max(upper, self.evaluator.promotion_tenure_cap)
+        return max(bounds[-1] + 1, self.evaluator.promotion_tenure_cap)
+    
+    def evaluate(self, scores, tenure_months=12, previous_evaluations=None, trajectory=None, profile=None,
+                 layers=None, fields=None):
+        """Cached drop-in for evaluator.evaluate_performance"""
+        selected = self.evaluator.select_layers(layers, fields)
+        bucket = self.tenure_bucket(tenure_months)
+        result = self._lookup_table(scores, bucket) if self.mode == 'table' else None
+        if result is None:
+            result = self._evaluate_lru(scores, bucket)
+        
+        # Percentiles and peer benchmarks move with the population, so they are never served from the cache
+        self.evaluator.apply_population(result, scores, bucket, profile, selected)
+        
+        # Only the growth layers depend on history, so overlay them on the cached core
+        if previous_evaluations or trajectory is not None:
+            self.evaluator.apply_history(result, scores, previous_evaluations, trajectory, selected)
+        # Risk sees exact tenure as well as history
+        self.evaluator.apply_risk(result, scores, tenure_months, previous_evaluations, trajectory, selected)
+        return self.evaluator.select_fields(result, selected, fields)
+    
+    def stats(self):
+        """Hit/miss counters and current size"""
+        total = self.hits + self.misses
+        return {
+            'mode': self.mode,
+            'size': len(self._entries) + (self._table['rows'] if self._table else 0),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
+    
+    def clear(self):
+        """Drop lazily cached entries and reset counters; the eager table is kept"""
+        with self._lock:
+            self._entries.clear()
+            self._tenure_fields.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    # ========== LRU MODE ==========
+    
+    def _evaluate_lru(self, scores, bucket):
+        key = (tuple(scores.items()), bucket)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if cached is None:
+            cached = self.evaluator.evaluate_performance(scores, bucket)
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = cached
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return self._restamp(cached)
+    
+    def _restamp(self, cached):
+        result = cached.copy()
+        result['evaluation_timestamp'] = datetime.now().isoformat()
+        return result
+    
+    # ========== TABLE MODE ==========
+    
+    def _build_table(self):
+        """Precompute every score combination once with the vectorized batch path"""
+        import numpy as np
+        low, high = self.score_range
+        criteria = list(self.evaluator.performance_criteria)
+        grid = np.array(list(itertools.product(range(low, high + 1), repeat=len(criteria))), dtype=np.int8)
+        frame = self.evaluator._build_batch_frame(grid, 0)
+        
+        # Pack the frame into one float block and one small-int block so a
+        # lookup is two row reads instead of one numpy index per column
+        layout = {}
+        blocks = {'f': [], 'i': []}
+        for name, column in frame.items():
+            kind = 'f' if column.dtype.kind == 'f' else 'i'
+            column = column.reshape(len(grid), -1)
+            start = sum(block.shape[1] for block in blocks[kind])
+            layout[name] = (kind, start, start + column.shape[1], column.shape[1] > 1 or frame[name].ndim > 1)
+            blocks[kind].append(column)
+        ints = np.hstack(blocks['i'])
+        self._table = {
+            'criteria': criteria,
+            'floats': np.hstack(blocks['f']).astype(np.float64),
+            'ints': ints.astype(np.min_scalar_type(int(ints.max()))) if ints.min() >= 0 else ints,
+            'layout': layout,
+            'rows': len(grid),
+            'radix': high - low + 1,
+            'static_fields': self.evaluator._batch_static_fields()
+        }
+    
+    def _lookup_table(self, scores, bucket):
+        table = self._table
+        if list(scores) != table['criteria']:
+            return None
+        low, high = self.score_range
+        index = 0
+        for value in scores.values():
+            if type(value) is not int or not low <= value <= high:
+                return None
+            index = index * table['radix'] + (value - low)
+        
+        values = {'f': table['floats'][index].tolist(), 'i': table['ints'][index].tolist()}
+        row = {name: values[kind][start:stop] if is_vector else values[kind][start]
+               for name, (kind, start, stop, is_vector) in table['layout'].items()}
+        result = self.evaluator._batch_record(row, list(scores.values()), table['criteria'],
+                                              table['static_fields'], datetime.now().isoformat())
+        # The tenure benchmark is part of the population layer refreshed by evaluate()
+        result['promotion_readiness'] = self._promotion_readiness(scores, bucket)
+        with self._lock:
+            self.hits += 1
+        return result
+    
+    def _promotion_readiness(self, scores, bucket):
+        """Readiness only sees the score mean, so memoize on (sum, bucket)"""
+        key = (sum(scores.values()), bucket)
+        readiness = self._tenure_fields.get(key)
+        if readiness is None:
+            readiness = self.evaluator._assess_promotion_readiness(scores, bucket)
+            self._tenure_fields[key] = readiness
+        return readiness
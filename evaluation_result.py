@@ -0,0 +1,198 @@
+import json
+from collections.abc import MutableMapping
+from operator import attrgetter
+from dataclasses import field as dataclass_field, make_dataclass
+
+# Output fields contributed by each evaluation layer, in result order
+LAYER_FIELDS = {
+    'basic_scores': ('overall_score', 'weighted_score', 'simple_average', 'score_consistency',
+                     'score_distribution', 'detailed_scores'),
+    'patterns': ('performance_level', 'dominant_traits', 'detected_patterns', 'performance_stability',
+                 'ai_classification'),
+    'predictive': ('growth_potential', 'promotion_readiness', 'performance_trajectory', 'development_timeline',
+                   'predicted_next_score', 'forecast_interval'),
+    'skill_gaps': ('critical_skill_gaps', 'skill_synergies', 'improvement_priority', 'gap_impact_analysis'),
+    'benchmarking': ('tenure_benchmark', 'role_benchmark', 'industry_benchmark', 'competitive_positioning'),
+    'growth': ('growth_rate', 'learning_velocity', 'criterion_trends', 'skill_acquisition_pace',
+               'career_development_stage'),
+    'risk': ('burnout_risk', 'attrition_risk', 'performance_volatility', 'mitigation_recommendations')
+}
+RESULT_METADATA = ('evaluation_timestamp', 'ai_model_version', 'rubric_version', 'risk_model_version',
+                   'analysis_confidence')
+RESULT_FIELDS = tuple(field for fields in LAYER_FIELDS.values() for field in fields) + RESULT_METADATA
+
+# Fields usually holding shared constants (tiers, labels, fixed insights); the
+# serializer only looks for pre-encoded fragments among these
+CONSTANT_FIELDS = ('score_distribution', 'performance_level', 'dominant_traits', 'detected_patterns',
+                   'ai_classification', 'growth_potential', 'promotion_readiness', 'performance_trajectory',
+                   'development_timeline', 'critical_skill_gaps', 'skill_synergies', 'improvement_priority',
+                   'gap_impact_analysis', 'role_benchmark', 'industry_benchmark', 'competitive_positioning',
+                   'burnout_risk', 'attrition_risk', 'performance_volatility', 'mitigation_recommendations',
+                   'analysis_confidence')
+VARIABLE_FIELDS = tuple(field for field in RESULT_FIELDS if field not in CONSTANT_FIELDS)
+
+_FIELD_SET = frozenset(RESULT_FIELDS)
+
+
+class _Missing:
+    """Marks a slot the evaluator did not fill, e.g. a layer left out by a selection"""
+    
+    __slots__ = ()
+    
+    def __reduce__(self):
+        return '_MISSING'
+    
+    def __repr__(self):
+        return '<missing>'
+
+
+_MISSING = _Missing()
+
+
+class _ResultMapping(MutableMapping):
+    """
+    Dict behaviour for EvaluationResult: evaluator fields live in slots and
+    keys added later (employee info, UI fields) in an overflow dict, so
+    result['overall_score'], result.update(...) and .get() keep working.
+    """
+    
+    __slots__ = ()
+    
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+    
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+    
+    def __delitem__(self, key):
+        if key in _FIELD_SET and getattr(self, key) is not _MISSING:
+            setattr(self, key, _MISSING)
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+    
+    def __contains__(self, key):
+        if key in _FIELD_SET:
+            return getattr(self, key) is not _MISSING
+        return self._extra is not None and key in self._extra
+    
+    def __iter__(self):
+        return iter([key for key, _ in self.items()])
+    
+    def __len__(self):
+        return len(self.items())
+    
+    def items(self):
+        # Materialized in one pass; the generic ItemsView looks every key up twice
+        items = [(field, value) for field, value in zip(RESULT_FIELDS, self._values()) if value is not _MISSING]
+        if self._extra is not None:
+            items.extend(self._extra.items())
+        return items
+    
+    def _values(self):
+        return _get_all(self)
+    
+    def __repr__(self):
+        return f'EvaluationResult({dict(self.items())!r})'
+    
+    def copy(self):
+        return EvaluationResult(*self._values(), dict(self._extra) if self._extra is not None else None)
+
+
+# Compact evaluation result: one slot per evaluator field instead of a
+# per-record hash table, built as fast as a dict literal. Nested values are
+# frequently shared constants (see constant()), so treat them as read-only
+# and replace a nested object rather than mutating it.
+EvaluationResult = make_dataclass(
+    'EvaluationResult',
+    [(field, object, dataclass_field(default=_MISSING)) for field in RESULT_FIELDS] +
+    [('_extra', object, dataclass_field(default=None))],
+    bases=(_ResultMapping,), slots=True, eq=False, repr=False)
+EvaluationResult.__module__ = __name__
+
+_get_all = attrgetter(*RESULT_FIELDS)
+_get_variable = attrgetter(*VARIABLE_FIELDS)
+_get_constant = attrgetter(*CONSTANT_FIELDS)
+
+
+# ========== SERIALIZATION ==========
+
+_encode = json.JSONEncoder(separators=(',', ':')).encode
+
+# id -> (object, pre-encoded JSON); holding the object keeps its id from being reused
+_fragments = {}
+_keys = {}
+
+
+def constant(value):
+    """
+    Register a shared, never-mutated sub-object so dumps() can emit its
+    pre-encoded JSON instead of re-encoding it on every response.
+    Returns value for use in assignments.
+    """
+    _fragments[id(value)] = (value, _encode(value))
+    return value
+
+
+def _encoded_key(key):
+    encoded = _keys.get(key)
+    if encoded is None:
+        encoded = _keys[key] = _encode(str(key)) + ':'
+    return encoded
+
+
+def _fragment(value):
+    fragment = _fragments.get(id(value))
+    if fragment is not None and fragment[0] is value:
+        return fragment[1]
+    return None
+
+
+def dumps(result):
+    """
+    Compact JSON for a result mapping. Fields are encoded in one pass of the
+    C encoder, with the pre-encoded fragments of constant sections spliced in
+    afterwards, so constant sections follow the other fields.
+    """
+    constants = []
+    if isinstance(result, EvaluationResult):
+        variable = {key: value for key, value in zip(VARIABLE_FIELDS, _get_variable(result))
+                    if value is not _MISSING}
+        candidates = zip(CONSTANT_FIELDS, _get_constant(result))
+        if result._extra:
+            variable.update(result._extra)
+    else:
+        variable = {}
+        candidates = result.items()
+    for key, value in candidates:
+        encoded = _fragment(value)
+        if encoded is None and type(value) is list and value:
+            # Lists assembled per result from interned entries
+            items = [_fragment(item) for item in value]
+            if None not in items:
+                encoded = '[' + ','.join(items) + ']'
+        if encoded is not None:
+            constants.append(_encoded_key(key) + encoded)
+        elif value is not _MISSING:
+            variable[key] = value
+    encoded = _encode(variable)
+    if not constants:
+        return encoded
+    return (encoded[:-1] + ',' if variable else '{') + ','.join(constants) + '}'
+
+
+def dumps_many(results):
+    """JSON array of results"""
+    return '[' + ','.join([dumps(result) for result in results]) + ']'
@@ -0,0 +1,412 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from growth_model import TrajectoryStats, promotion_ready
+
+
+class EvaluationStore:
+    """
+    Local SQLite store for evaluation history.
+    
+    The database runs in WAL mode so readers never block the writer, and each
+    worker process/thread keeps one pooled connection. History lookups are a
+    single query on the (employee_id, id) index, and every insert also folds
+    the evaluation into the employee's running TrajectoryStats so growth
+    forecasts never rescan the history.
+    """
+    
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS evaluations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            employee_id TEXT NOT NULL,
+            employee_name TEXT,
+            department TEXT,
+            position TEXT,
+            period TEXT,
+            reviewer_name TEXT,
+            tenure_months INTEGER,
+            overall_score REAL,
+            performance_level TEXT,
+            promotion_ready INTEGER,
+            scores TEXT NOT NULL,
+            evaluated_at TEXT NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_evaluations_employee ON evaluations (employee_id, id)",
+        "CREATE INDEX IF NOT EXISTS idx_evaluations_department ON evaluations (department, period)",
+        "CREATE INDEX IF NOT EXISTS idx_evaluations_period ON evaluations (period)",
+        """CREATE TABLE IF NOT EXISTS employee_trajectories (
+            employee_id TEXT PRIMARY KEY,
+            state TEXT NOT NULL
+        )"""
+    ]
+    
+    COLUMNS = ('employee_id', 'employee_name', 'department', 'position', 'period', 'reviewer_name',
+               'tenure_months', 'overall_score', 'performance_level', 'promotion_ready', 'scores',
+               'evaluated_at')
+    
+    def __init__(self, path='evaluations.db'):
+        self.path = path
+        self._local = threading.local()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+    
+    def connection(self):
+        """Pooled connection for the calling worker, reopened after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._ensure_schema(conn)
+        return conn
+    
+    @contextmanager
+    def _write_transaction(self):
+        """Immediate transaction so read-modify-write of trajectories cannot interleave"""
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+    
+    def _ensure_schema(self, conn):
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            with conn:
+                for statement in self.SCHEMA:
+                    conn.execute(statement)
+            self._schema_ready = True
+    
+    # ========== WRITES ==========
+    
+    def add(self, result):
+        """Persist one evaluation result (evaluator output merged with employee info)"""
+        return self.add_many([result])
+    
+    def add_many(self, results):
+        """Persist many results and update their trajectories in a single transaction"""
+        rows = [self._to_row(result) for result in results]
+        placeholders = ', '.join('?' for _ in self.COLUMNS)
+        with self._write_transaction() as conn:
+            trajectories = {}
+            for result in results:
+                employee_id = str(result.get('employee_id', ''))
+                if not employee_id:
+                    continue
+                if employee_id not in trajectories:
+                    trajectories[employee_id] = self._load_trajectory(conn, employee_id)
+                trajectories[employee_id].update(result['detailed_scores'], result['overall_score'],
+                                                  promotion_ready(result))
+            
+            conn.executemany(
+                f"INSERT INTO evaluations ({', '.join(self.COLUMNS)}) VALUES ({placeholders})", rows)
+            conn.executemany(
+                'INSERT OR REPLACE INTO employee_trajectories (employee_id, state) VALUES (?, ?)',
+                [(employee_id, stats.to_json()) for employee_id, stats in trajectories.items()])
+        return len(rows)
+    
+    def _to_row(self, result):
+        level = result.get('performance_level')
+        readiness = result.get('promotion_readiness')
+        return (
+            str(result.get('employee_id', '')),
+            result.get('name'),
+            result.get('department'),
+            result.get('position'),
+            result.get('period'),
+            result.get('reviewer_name'),
+            result.get('tenure_months'),
+            result.get('overall_score'),
+            level.get('level') if isinstance(level, dict) else level,
+            int(bool(readiness.get('ready'))) if isinstance(readiness, dict) else None,
+            json.dumps(result['detailed_scores']),
+            result.get('evaluation_timestamp', '')
+        )
+    
+    # ========== READS ==========
+    
+    def history(self, employee_id, limit=None):
+        """Prior evaluations for one employee, oldest first"""
+        query = 'SELECT * FROM evaluations WHERE employee_id = ? ORDER BY id DESC'
+        params = [str(employee_id)]
+        if limit:
+            query += ' LIMIT ?'
+            params.append(int(limit))
+        rows = self.connection().execute(query, params).fetchall()
+        return [self._from_row(row) for row in reversed(rows)]
+    
+    def trajectory(self, employee_id):
+        """Running TrajectoryStats for one employee, a single primary-key lookup"""
+        return self._load_trajectory(self.connection(), str(employee_id))
+    
+    def trajectories(self, employee_ids):
+        """trajectory() for many employees at once, keyed by employee_id; one IN query per 500 ids"""
+        conn = self.connection()
+        ids = sorted({str(employee_id) for employee_id in employee_ids if employee_id})
+        found = {}
+        for part in _batches(ids, 500):
+            rows = conn.execute('SELECT employee_id, state FROM employee_trajectories '
+                                f"WHERE employee_id IN ({', '.join('?' for _ in part)})", part)
+            found.update((row['employee_id'], TrajectoryStats.from_json(row['state'])) for row in rows)
+        # New employees, and rows written before trajectories were tracked, are folded in from the evaluations
+        missing = [employee_id for employee_id in ids if employee_id not in found]
+        for part in _batches(missing, 500):
+            found.update((employee_id, TrajectoryStats()) for employee_id in part)
+            rows = conn.execute(f"SELECT * FROM evaluations WHERE employee_id IN ({', '.join('?' for _ in part)}) "
+                                'ORDER BY employee_id, id', part)
+            for row in rows:
+                evaluation = self._from_row(row)
+                found[row['employee_id']].update(evaluation['detailed_scores'], evaluation['overall_score'],
+                                                 promotion_ready(evaluation))
+        return found
+    
+    def trajectories_before(self, evaluations):
+        """
+        TrajectoryStats of each stored evaluation's employee over the
+        evaluations stored before it, in the same order (None without an
+        employee_id). Used to re-score stored rows with the history they had.
+        """
+        targets = {}
+        for evaluation in evaluations:
+            if evaluation['employee_id']:
+                targets.setdefault(evaluation['employee_id'], []).append(evaluation['id'])
+        conn = self.connection()
+        before = {}
+        for part in _batches(sorted(targets), 500):
+            last_id = max(max(targets[employee_id]) for employee_id in part)
+            rows = conn.execute(f"SELECT * FROM evaluations WHERE employee_id IN ({', '.join('?' for _ in part)}) "
+                                'AND id < ? ORDER BY employee_id, id', part + [last_id])
+            stats = {employee_id: TrajectoryStats() for employee_id in part}
+            pending = {employee_id: sorted(targets[employee_id]) for employee_id in part}
+            for row in rows:
+                employee_id = row['employee_id']
+                waiting = pending[employee_id]
+                while waiting and waiting[0] <= row['id']:
+                    before[waiting.pop(0)] = stats[employee_id].copy()
+                evaluation = self._from_row(row)
+                stats[employee_id].update(evaluation['detailed_scores'], evaluation['overall_score'],
+                                          promotion_ready(evaluation))
+            for employee_id, waiting in pending.items():
+                before.update((evaluation_id, stats[employee_id].copy()) for evaluation_id in waiting)
+        return [before.get(evaluation['id']) if evaluation['employee_id'] else None for evaluation in evaluations]
+    
+    def _load_trajectory(self, conn, employee_id):
+        row = conn.execute('SELECT state FROM employee_trajectories WHERE employee_id = ?',
+                           (employee_id,)).fetchone()
+        if row is not None:
+            return TrajectoryStats.from_json(row['state'])
+        # Rows written before trajectories were tracked are folded in once
+        rows = conn.execute('SELECT * FROM evaluations WHERE employee_id = ? ORDER BY id', (employee_id,))
+        return TrajectoryStats.from_history(self._from_row(row) for row in rows)
+    
+    def by_department(self, department, period=None):
+        """Evaluations for a department, optionally restricted to one period"""
+        query = 'SELECT * FROM evaluations WHERE department = ?'
+        params = [department]
+        if period is not None:
+            query += ' AND period = ?'
+            params.append(period)
+        rows = self.connection().execute(query + ' ORDER BY id', params)
+        return [self._from_row(row) for row in rows]
+    
+    def latest_by_department(self, department, period=None, chunk_size=500):
+        """
+        Lists of up to chunk_size evaluations, the latest per employee in the
+        department (and period), ordered by name; rows without an employee_id
+        are each their own employee. Rows are fetched as they are consumed.
+        """
+        query = 'SELECT MAX(id) FROM evaluations WHERE department = ?'
+        params = [department]
+        if period is not None:
+            query += ' AND period = ?'
+            params.append(period)
+        query += " GROUP BY CASE WHEN employee_id = '' THEN id ELSE employee_id END"
+        cursor = self.connection().execute(f'SELECT * FROM evaluations WHERE id IN ({query}) '
+                                             'ORDER BY employee_name, id', params)
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield [self._from_row(row) for row in rows]
+        finally:
+            cursor.close()
+    
+    def latest_with_trajectories(self, department=None, chunk_size=5000):
+        """
+        Lists of up to chunk_size (evaluation, TrajectoryStats) pairs, the
+        latest evaluation of every employee (in the department) in id order.
+        Only the overall channel of each running trajectory is read, pulled
+        out of the stored state by SQLite, which is all risk scoring needs.
+        """
+        query = "SELECT MAX(id) FROM evaluations WHERE employee_id != ''"
+        params = []
+        if department is not None:
+            query += ' AND department = ?'
+            params.append(department)
+        conn = self.connection()
+        cursor = conn.execute(
+            "SELECT e.*, json_extract(t.state, '$.cycles') AS cycles, "
+            "json_extract(t.state, '$.channels.overall') AS overall_channel, "
+            "json_extract(t.state, '$.recent') AS recent, json_extract(t.state, '$.last_ready') AS last_ready "
+            f"FROM evaluations e LEFT JOIN employee_trajectories t ON t.employee_id = e.employee_id "
+            f"WHERE e.id IN ({query} GROUP BY employee_id) AND e.overall_score IS NOT NULL ORDER BY e.id", params)
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield [(self._from_row(row), self._overall_trajectory(conn, row)) for row in rows]
+        finally:
+            cursor.close()
+    
+    def _overall_trajectory(self, conn, row):
+        if row['overall_channel'] is None:
+            return self._load_trajectory(conn, row['employee_id'])
+        return TrajectoryStats(row['cycles'], {TrajectoryStats.OVERALL: json.loads(row['overall_channel'])},
+                               json.loads(row['recent']) if row['recent'] is not None else None, row['last_ready'])
+    
+    def histories(self):
+        """(employee_id, evaluations oldest first) for every employee, streamed in employee order"""
+        cursor = self.connection().execute(
+            "SELECT * FROM evaluations WHERE employee_id != '' AND overall_score IS NOT NULL "
+            "ORDER BY employee_id, id")
+        try:
+            employee_id, evaluations = None, []
+            for row in cursor:
+                if row['employee_id'] != employee_id and evaluations:
+                    yield employee_id, evaluations
+                    evaluations = []
+                employee_id = row['employee_id']
+                evaluations.append(self._from_row(row))
+            if evaluations:
+                yield employee_id, evaluations
+        finally:
+            cursor.close()
+    
+    def between(self, first_id, last_id):
+        """Evaluations with first_id <= id <= last_id, a primary-key range scan"""
+        rows = self.connection().execute('SELECT * FROM evaluations WHERE id BETWEEN ? AND ? ORDER BY id',
+                                         (first_id, last_id))
+        return [self._from_row(row) for row in rows]
+    
+    def last_id(self):
+        """Id of the latest stored evaluation (0 when empty); it moves with every insert"""
+        return self.connection().execute('SELECT MAX(id) FROM evaluations').fetchone()[0] or 0
+    
+    def id_bounds(self):
+        """(first id, last id) of the archive, or None when it is empty"""
+        first, last = self.connection().execute('SELECT MIN(id), MAX(id) FROM evaluations').fetchone()
+        return None if first is None else (first, last)
+    
+    def columns_since(self, last_id, limit):
+        """
+        Up to limit raw (id, department, period, tenure_months, overall_score,
+        performance_level, promotion_ready, scores JSON) tuples with id >
+        last_id, for feeding the columnar archive without building dicts
+        """
+        return self.connection().execute(
+            'SELECT id, department, period, tenure_months, overall_score, performance_level, promotion_ready, '
+            'scores FROM evaluations WHERE id > ? ORDER BY id LIMIT ?', (last_id, limit)).fetchall()
+    
+    def score_histogram(self):
+        """(department, period, score bin, count) rows for seeding percentile sketches"""
+        return self.connection().execute(
+            'SELECT department, period, CAST(ROUND(overall_score * 100) AS INTEGER), COUNT(*) '
+            'FROM evaluations WHERE overall_score IS NOT NULL GROUP BY 1, 2, 3').fetchall()
+    
+    def score_moments(self, group_by, criteria):
+        """
+        Per-group (name, count, sums, sums of squares) for every criterion plus
+        the overall score and simple average, aggregated inside SQLite over
+        the evaluations scored on all of the given criteria
+        """
+        if group_by not in (None, 'department', 'position', 'tenure_months'):
+            raise ValueError(f'Cannot group evaluations by {group_by!r}')
+        if not all(name.isidentifier() for name in criteria):
+            raise ValueError('Criterion names must be identifiers')
+        
+        expressions = {name: f"json_extract(scores, '$.{name}')" for name in criteria}
+        expressions['overall'] = 'overall_score'
+        expressions['average'] = f"({' + '.join(expressions[name] for name in criteria)}) / {float(len(criteria))}"
+        aggregates = ', '.join(f'SUM({expr}), SUM(({expr}) * ({expr}))' for expr in expressions.values())
+        scored = ' AND '.join(f'{expressions[name]} IS NOT NULL' for name in criteria)
+        rows = self.connection().execute(
+            f"SELECT {group_by or 'NULL'}, COUNT(*), {aggregates} FROM evaluations "
+            f"WHERE overall_score IS NOT NULL AND {scored} GROUP BY 1")
+        
+        for row in rows:
+            values = list(row)
+            sums = {name: values[2 + 2 * i] for i, name in enumerate(expressions)}
+            squares = {name: values[3 + 2 * i] for i, name in enumerate(expressions)}
+            yield values[0], values[1], sums, squares
+    
+    def score_products(self, group_by, criteria):
+        """
+        Per-group (name, count, sums, matrix of sums of pairwise products) over
+        the evaluations scored on all of the given criteria, in criteria order,
+        for seeding covariance accumulators
+        """
+        if group_by not in (None, 'department'):
+            raise ValueError(f'Cannot group evaluations by {group_by!r}')
+        if not all(name.isidentifier() for name in criteria):
+            raise ValueError('Criterion names must be identifiers')
+        
+        expressions = [f"json_extract(scores, '$.{name}')" for name in criteria]
+        pairs = [(i, j) for i in range(len(criteria)) for j in range(i, len(criteria))]
+        aggregates = ', '.join([f'SUM({expr})' for expr in expressions] +
+                               [f'SUM(({expressions[i]}) * ({expressions[j]}))' for i, j in pairs])
+        scored = ' AND '.join(f'{expr} IS NOT NULL' for expr in expressions)
+        rows = self.connection().execute(
+            f"SELECT {group_by or 'NULL'}, COUNT(*), {aggregates} FROM evaluations WHERE {scored} GROUP BY 1")
+        
+        for row in rows:
+            values = list(row)
+            sums = values[2:2 + len(criteria)]
+            products = [[0.0] * len(criteria) for _ in criteria]
+            for (i, j), total in zip(pairs, values[2 + len(criteria):]):
+                products[i][j] = products[j][i] = total
+            yield values[0], values[1], sums, products
+    
+    def count(self):
+        return self.connection().execute('SELECT COUNT(*) FROM evaluations').fetchone()[0]
+    
+    def _from_row(self, row):
+        return {
+            'id': row['id'],
+            'employee_id': row['employee_id'],
+            'name': row['employee_name'],
+            'department': row['department'],
+            'position': row['position'],
+            'period': row['period'],
+            'reviewer_name': row['reviewer_name'],
+            'tenure_months': row['tenure_months'],
+            'overall_score': row['overall_score'],
+            'performance_level': row['performance_level'],
+            'promotion_ready': None if row['promotion_ready'] is None else bool(row['promotion_ready']),
+            'detailed_scores': json.loads(row['scores']),
+            'evaluation_timestamp': row['evaluated_at']
+        }
+    
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _batches(items, size):
+    """Consecutive slices of at most size items, for IN (...) lists under SQLite's variable limit"""
+    return [items[start:start + size] for start in range(0, len(items), size)]
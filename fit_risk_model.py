@@ -0,0 +1,203 @@
+"""
+Fit the logistic risk model to the evaluation history in the local store.
+    
+    python fit_risk_model.py                                   # refit models/risk_model.json in place
+    python fit_risk_model.py --output models/risk_model.json --l2 2.0
+
+No burnout or attrition outcomes are recorded, so each evaluation is
+labelled from what happened next in the employee's history:
+
+- burnout: the next overall score drops by at least --drop points
+- volatility: the next overall score moves by at least --swing points
+- attrition: the employee has no later evaluation although the store
+  carries on for at least --horizon days; more recent last evaluations
+  are left out as censored
+
+Features are rebuilt by replaying every history through TrajectoryStats,
+exactly as they are built at scoring time. A fifth of the employees are
+held out to report AUC before the final fit on everyone; a risk with too
+few examples of either class keeps its current coefficients.
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+from datetime import datetime
+
+from growth_model import TrajectoryStats
+from risk_model import (DEFAULT_RISK_MODEL, RISK_FEATURES, RISKS, RiskModel, model_version, read_risk_model,
+                        risk_features, score_summary)
+
+
+def _timestamp(text):
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def training_set(store, drop=1.0, swing=1.5, horizon_days=180):
+    """
+    (N x F features, {risk: length-N labels with NaN where unknown}, length-N
+    employee index) over every stored evaluation with an employee_id
+    """
+    import numpy as np
+    features, employees, overall, following, timestamps, last = [], [], [], [], [], []
+    for index, (_, evaluations) in enumerate(store.histories()):
+        trajectory = TrajectoryStats()
+        for position, evaluation in enumerate(evaluations):
+            scores = evaluation['detailed_scores']
+            ready = bool(evaluation['promotion_ready'])
+            lowest, spread = score_summary(list(scores.values()))
+            history = trajectory.updated(scores, evaluation['overall_score'])
+            tenure = 12 if evaluation['tenure_months'] is None else evaluation['tenure_months']
+            features.append(risk_features(evaluation['overall_score'], lowest, spread, tenure, history, ready))
+            trajectory.update(scores, evaluation['overall_score'], ready)
+            
+            is_last = position == len(evaluations) - 1
+            employees.append(index)
+            overall.append(evaluation['overall_score'])
+            following.append(float('nan') if is_last else evaluations[position + 1]['overall_score'])
+            timestamps.append(_timestamp(evaluation['evaluation_timestamp']))
+            last.append(is_last)
+    
+    overall, following = np.array(overall, dtype=np.float64), np.array(following, dtype=np.float64)
+    timestamps, last = np.array(timestamps), np.array(last, dtype=bool)
+    change = following - overall
+    known = ~np.isnan(change)
+    # The store's own span decides whether a missing follow-up means the employee left
+    observed_until = np.nanmax(timestamps) if len(timestamps) and not np.isnan(timestamps).all() else np.nan
+    left = (observed_until - timestamps) >= horizon_days * 86400
+    labels = {
+        'burnout': np.where(known, change <= -drop, np.nan),
+        'volatility': np.where(known, np.abs(change) >= swing, np.nan),
+        'attrition': np.where(~last, 0.0, np.where(left, 1.0, np.nan))
+    }
+    return (np.array(features, dtype=np.float64).reshape(-1, len(RISK_FEATURES)),
+            {risk: labels[risk].astype(np.float64) for risk in RISKS}, np.array(employees))
+
+
+def fit_logistic(features, labels, l2=1.0, iterations=50, tolerance=1e-8):
+    """
+    L2-regularized logistic regression by Newton's method (IRLS) on
+    standardized features; returns the raw-scale (intercept, coefficients)
+    """
+    import numpy as np
+    mean = features.mean(axis=0)
+    scale = features.std(axis=0)
+    scale[scale == 0] = 1.0
+    X = np.column_stack([np.ones(len(features)), (features - mean) / scale])
+    penalty = np.full(X.shape[1], float(l2))
+    penalty[0] = 0.0
+    beta = np.zeros(X.shape[1])
+    for _ in range(iterations):
+        p = 1 / (1 + np.exp(-np.clip(X @ beta, -30, 30)))
+        gradient = X.T @ (labels - p) - penalty * beta
+        hessian = (X * (p * (1 - p))[:, None]).T @ X + np.diag(penalty)
+        step = np.linalg.solve(hessian, gradient)
+        beta += step
+        if np.abs(step).max() < tolerance:
+            break
+    coefficients = beta[1:] / scale
+    return float(beta[0] - coefficients @ mean), coefficients
+
+
+def predict(intercept, coefficients, features):
+    import numpy as np
+    return 1 / (1 + np.exp(-np.clip(intercept + features @ coefficients, -30, 30)))
+
+
+def auc(scores, labels):
+    """Area under the ROC curve via the rank-sum statistic, ties given their average rank"""
+    import numpy as np
+    _, inverse, counts = np.unique(scores, return_inverse=True, return_counts=True)
+    ranks = (np.cumsum(counts) - (counts - 1) / 2)[inverse.reshape(-1)]
+    positives = labels.sum()
+    negatives = len(labels) - positives
+    return float((ranks[labels == 1].sum() - positives * (positives + 1) / 2) / (positives * negatives))
+
+
+def log_loss(probabilities, labels):
+    import numpy as np
+    p = np.clip(probabilities, 1e-12, 1 - 1e-12)
+    return float(-(labels * np.log(p) + (1 - labels) * np.log(1 - p)).mean())
+
+
+def fit_model(config, features, labels, employees, l2=1.0, min_examples=20):
+    """Refitted copy of a risk model config, with a 'training' report"""
+    import numpy as np
+    config = copy.deepcopy(config)
+    holdout = employees % 5 == 0
+    report = {}
+    for risk in RISKS:
+        y = labels[risk]
+        usable = ~np.isnan(y)
+        positives = int(y[usable].sum())
+        negatives = int(usable.sum()) - positives
+        entry = report[risk] = {'examples': int(usable.sum()), 'positives': positives}
+        if min(positives, negatives) < min_examples:
+            entry['skipped'] = f'needs {min_examples} examples of each outcome'
+            continue
+        
+        train, test = usable & ~holdout, usable & holdout
+        if len(set(y[test].tolist())) == 2 and len(set(y[train].tolist())) == 2:
+            intercept, coefficients = fit_logistic(features[train], y[train], l2)
+            entry['holdout_auc'] = round(auc(predict(intercept, coefficients, features[test]), y[test]), 4)
+        intercept, coefficients = fit_logistic(features[usable], y[usable], l2)
+        entry['log_loss'] = round(log_loss(predict(intercept, coefficients, features[usable]), y[usable]), 4)
+        config['risks'][risk] = {'intercept': round(intercept, 6),
+                                 'coefficients': {name: round(float(w), 6)
+                                                  for name, w in zip(RISK_FEATURES, coefficients)}}
+    
+    if len(features):
+        config['reference'] = {name: round(float(m), 4) for name, m in zip(RISK_FEATURES, features.mean(axis=0))}
+    fitted_at = datetime.now()
+    config['version'] = f'fit-{fitted_at:%Y%m%d-%H%M%S}'
+    config['training'] = {'fitted_at': fitted_at.isoformat(timespec='seconds'), 'evaluations': len(features),
+                          'employees': int(len(np.unique(employees))), 'l2': l2, 'risks': report}
+    return config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fit the risk model to stored evaluation history')
+    parser.add_argument('--db', default=os.environ.get('EVALUATION_DB_PATH', 'evaluations.db'))
+    parser.add_argument('--model', default=DEFAULT_RISK_MODEL, help='model whose labels and levels are kept')
+    parser.add_argument('--output', help='where to write the refitted model (default: --model)')
+    parser.add_argument('--drop', type=float, default=1.0, help='next-score drop labelled as burnout')
+    parser.add_argument('--swing', type=float, default=1.5, help='next-score change labelled as volatility')
+    parser.add_argument('--horizon', type=float, default=180, help='days without a review labelled as attrition')
+    parser.add_argument('--l2', type=float, default=1.0, help='ridge penalty on standardized coefficients')
+    parser.add_argument('--min-examples', type=int, default=20, help='fewest positives and negatives per risk')
+    args = parser.parse_args(argv)
+    
+    from evaluation_store import EvaluationStore
+    base = read_risk_model(args.model)
+    features, labels, employees = training_set(EvaluationStore(args.db), args.drop, args.swing, args.horizon)
+    if not len(features):
+        print(f'No evaluations with an employee_id in {args.db}; nothing to fit')
+        return 1
+    
+    config = fit_model(base, features, labels, employees, args.l2, args.min_examples)
+    config['training']['labels'] = {'drop': args.drop, 'swing': args.swing, 'horizon_days': args.horizon}
+    report = config['training']['risks']
+    for risk, entry in report.items():
+        print(f"{risk:<11} {entry['examples']:>8} examples  {entry['positives']:>7} positive  " +
+              (entry['skipped'] if 'skipped' in entry else
+               f"holdout AUC {entry.get('holdout_auc', 'n/a')}  log loss {entry['log_loss']}"))
+    if all('skipped' in entry for entry in report.values()):
+        print(f'Not enough history to fit any risk; {args.model} left as it is')
+        return 1
+    
+    RiskModel(config)
+    output = args.output or args.model
+    with open(output + '.tmp', 'w') as handle:
+        json.dump(config, handle, indent=2)
+        handle.write('\n')
+    os.replace(output + '.tmp', output)
+    print(f'{model_version(base)} -> {model_version(config)} written to {output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import json
+import math
+
+# Two-sided 95% Student t critical values by degrees of freedom
+T_CRITICAL_95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365,
+                 8: 2.306, 9: 2.262, 10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086, 30: 2.042}
+
+
+def t_critical_95(df):
+    """Conservative 95% t critical value (rounds df down to the nearest tabulated entry)"""
+    for tabulated in sorted(T_CRITICAL_95, reverse=True):
+        if df >= tabulated:
+            return T_CRITICAL_95[tabulated] if df < 60 else 1.96
+    return T_CRITICAL_95[1]
+
+
+class TrajectoryStats:
+    """
+    Running sufficient statistics of one employee's review history.
+    
+    Each channel (every criterion plus 'overall') keeps
+    [n, St, St2, St3, St4, Sy, Sty, St2y, Syy] where t is the review cycle
+    index. That is enough for the linear trend, the quadratic curvature and
+    the residual variance, so adding an evaluation is O(k) and no history is
+    ever rescanned. recent holds the last two overall scores and last_ready
+    the cycle of the latest promotion-ready evaluation, for risk scoring.
+    """
+    
+    OVERALL = 'overall'
+    
+    def __init__(self, cycles=0, channels=None, recent=None, last_ready=None):
+        self.cycles = cycles
+        self.channels = channels if channels is not None else {}
+        self.recent = recent if recent is not None else []
+        self.last_ready = last_ready
+    
+    @classmethod
+    def from_history(cls, evaluations):
+        """Build statistics from evaluations (dicts with detailed_scores and overall_score), oldest first"""
+        stats = cls()
+        for evaluation in evaluations:
+            stats.update(evaluation['detailed_scores'], evaluation['overall_score'], promotion_ready(evaluation))
+        return stats
+    
+    def update(self, scores, overall_score, ready=None):
+        """Add the next review cycle in O(k); ready is its promotion readiness when known"""
+        t = float(self.cycles)
+        observations = dict(scores)
+        observations[self.OVERALL] = overall_score
+        for name, y in observations.items():
+            s = self.channels.setdefault(name, [0.0] * 9)
+            y = float(y)
+            s[0] += 1
+            s[1] += t
+            s[2] += t * t
+            s[3] += t ** 3
+            s[4] += t ** 4
+            s[5] += y
+            s[6] += t * y
+            s[7] += t * t * y
+            s[8] += y * y
+        self.recent = self.recent[-1:] + [float(overall_score)]
+        if ready:
+            self.last_ready = self.cycles
+        self.cycles += 1
+        return self
+    
+    def updated(self, scores, overall_score, ready=None):
+        """Copy with one more cycle added, leaving this instance untouched"""
+        return self.copy().update(scores, overall_score, ready)
+    
+    def copy(self):
+        return TrajectoryStats(self.cycles, {name: list(s) for name, s in self.channels.items()},
+                               list(self.recent), self.last_ready)
+    
+    def count(self, name=OVERALL):
+        return int(self.channels[name][0]) if name in self.channels else 0
+    
+    def mean(self, name=OVERALL):
+        s = self.channels.get(name)
+        return s[5] / s[0] if s and s[0] else None
+    
+    def spread(self, name=OVERALL):
+        """Population standard deviation of a channel across review cycles"""
+        s = self.channels.get(name)
+        if not s or s[0] < 2:
+            return 0.0
+        mean = s[5] / s[0]
+        return math.sqrt(max(s[8] / s[0] - mean * mean, 0.0))
+    
+    def prior_spread(self):
+        """spread() of the overall score before the latest cycle, backed out of the running sums"""
+        s = self.channels.get(self.OVERALL)
+        if not s or not self.recent:
+            return self.spread()
+        n = s[0] - 1
+        if n < 2:
+            return 0.0
+        y = self.recent[-1]
+        mean = (s[5] - y) / n
+        return math.sqrt(max((s[8] - y * y) / n - mean * mean, 0.0))
+    
+    def _linear_fit(self, name):
+        s = self.channels.get(name)
+        if not s or s[0] < 2:
+            return None
+        n, st, st2, sy, sty = s[0], s[1], s[2], s[5], s[6]
+        sxx = st2 - st * st / n
+        if sxx <= 0:
+            return None
+        slope = (sty - st * sy / n) / sxx
+        intercept = (sy - slope * st) / n
+        return intercept, slope, sxx
+    
+    def slope(self, name=OVERALL):
+        """Least-squares change per review cycle"""
+        fit = self._linear_fit(name)
+        return fit[1] if fit else 0.0
+    
+    def acceleration(self, name=OVERALL):
+        """Second derivative of the least-squares quadratic fit (needs three cycles)"""
+        s = self.channels.get(name)
+        if not s or s[0] < 3:
+            return 0.0
+        n, st, st2, st3, st4, sy, sty, st2y = s[:8]
+        det = n * (st2 * st4 - st3 * st3) - st * (st * st4 - st3 * st2) + st2 * (st * st3 - st2 * st2)
+        if abs(det) < 1e-9:
+            return 0.0
+        # Cramer's rule for the t^2 coefficient of the normal equations
+        c2 = (n * (st2 * st2y - sty * st3) - st * (st * st2y - sty * st2) + sy * (st * st3 - st2 * st2)) / det
+        return 2 * c2
+    
+    def forecast(self, name=OVERALL, steps_ahead=1, bounds=(0.0, 10.0)):
+        """Linear forecast for a future cycle with a 95% prediction interval"""
+        fit = self._linear_fit(name)
+        if fit is None:
+            return None
+        intercept, slope, sxx = fit
+        s = self.channels[name]
+        n = s[0]
+        t0 = self.cycles - 1 + steps_ahead
+        point = intercept + slope * t0
+        interval = None
+        if n > 2:
+            sse = max(s[8] - intercept * s[5] - slope * s[6], 0.0)
+            residual = math.sqrt(sse / (n - 2))
+            mean_t = s[1] / n
+            margin = t_critical_95(int(n - 2)) * residual * math.sqrt(1 + 1 / n + (t0 - mean_t) ** 2 / sxx)
+            low, high = bounds
+            interval = (max(low, point - margin), min(high, point + margin))
+        low, high = bounds
+        return {'point': min(max(point, low), high), 'interval': interval}
+    
+    def to_json(self):
+        return json.dumps({'cycles': self.cycles, 'channels': self.channels, 'recent': self.recent,
+                           'last_ready': self.last_ready})
+    
+    @classmethod
+    def from_json(cls, text):
+        state = json.loads(text)
+        # States saved before risk scoring lack recent and last_ready
+        return cls(state['cycles'], state['channels'], state.get('recent'), state.get('last_ready'))
+
+
+def promotion_ready(evaluation):
+    """Readiness of a stored row (promotion_ready) or an evaluator result (promotion_readiness); None if unknown"""
+    if evaluation.get('promotion_ready') is not None:
+        return bool(evaluation['promotion_ready'])
+    readiness = evaluation.get('promotion_readiness')
+    return bool(readiness.get('ready')) if isinstance(readiness, dict) else None
@@ -0,0 +1,104 @@
+import gzip
+import hashlib
+import json
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+# Encodings offered in content negotiation, preferred first
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+# Text formats worth compressing; images and fonts are already compressed
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/html', 'text/plain', 'text/csv',
+                      'application/javascript', 'text/css')
+
+# Bodies smaller than this cost more CPU to compress than they save on the wire
+MIN_COMPRESS_BYTES = 1024
+
+
+def compress(body, encoding, static=False):
+    """
+    Encode body for a negotiated Content-Encoding. Dynamic responses use a
+    fast setting; static assets are compressed once, so they get the
+    smallest output.
+    """
+    if encoding == 'br':
+        return brotli.compress(body, quality=11 if static else 4)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=9 if static else 5, mtime=0)
+    raise ValueError(f'Unsupported encoding {encoding!r}')
+
+
+def negotiate_encoding(request):
+    """Best encoding the client accepts, or None for identity"""
+    return request.accept_encodings.best_match(ENCODINGS)
+
+
+def compress_response(request, response, min_bytes=MIN_COMPRESS_BYTES):
+    """Compress a buffered response in place when the client and the content type allow it"""
+    if (response.direct_passthrough or response.is_streamed or 'Content-Encoding' in response.headers or
+            response.status_code < 200 or response.status_code in (204, 304) or
+            response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(request)
+    if encoding is None:
+        return response
+    body = response.get_data()
+    if len(body) < min_bytes:
+        return response
+    response.set_data(compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    # A weak ETag still identifies the content; a strong one names exact bytes
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f'{etag}-{encoding}')
+    return response
+
+
+def input_etag(items, *context):
+    """
+    Weak ETag over a request's inputs: the (key, value) pairs in canonical
+    order plus anything else that shapes the response (rubric version,
+    date). Responses differing only in their timestamp share it.
+    """
+    canonical = json.dumps([sorted(items), list(context)], separators=(',', ':'), sort_keys=True)
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
+class StaticPage:
+    """
+    A page rendered once and kept in memory with every encoding precomputed,
+    so a hit is a dictionary lookup instead of a template render. Each
+    encoding carries its own strong ETag for conditional requests.
+    """
+    
+    def __init__(self, render, mimetype='text/html', max_age=300):
+        self.render = render
+        self.mimetype = mimetype
+        self.max_age = max_age
+        self._variants = None
+    
+    def variants(self):
+        if self._variants is None:
+            body = self.render().encode()
+            etag = hashlib.sha1(body).hexdigest()[:20]
+            variants = {None: (body, etag)}
+            for encoding in ENCODINGS:
+                variants[encoding] = (compress(body, encoding, static=True), f'{etag}-{encoding}')
+            self._variants = variants
+        return self._variants
+    
+    def response(self, request, response_class):
+        encoding = negotiate_encoding(request)
+        body, etag = self.variants()[encoding]
+        response = response_class(body, mimetype=self.mimetype)
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        return response.make_conditional(request)
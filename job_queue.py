@@ -0,0 +1,232 @@
+import json
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import as_completed
+from datetime import datetime
+
+from evaluation_store import EvaluationStore
+
+# Evaluator settings a re-scoring job may override, merged per key
+RESCORE_OVERRIDABLE = ('performance_criteria',)
+
+# Fields kept from each re-scored evaluation in the job output
+RESCORE_FIELDS = ('overall_score', 'performance_level', 'growth_potential', 'promotion_readiness',
+                  'critical_skill_gaps', 'improvement_priority')
+
+_worker_evaluators = {}
+
+logger = logging.getLogger(__name__)
+
+
+def build_evaluator(overrides):
+    """Fresh evaluator with criterion weight/threshold overrides applied"""
+    from evaluation_ai import AdvancedPerformanceEvaluator
+    from rubrics import default_rubric
+    overrides = overrides or {}
+    for name in overrides:
+        if name not in RESCORE_OVERRIDABLE:
+            raise ValueError(f'{name} cannot be overridden; allowed: {", ".join(RESCORE_OVERRIDABLE)}')
+    # Criteria changes recompile the rubric rather than edit the shared compiled one
+    return AdvancedPerformanceEvaluator(default_rubric().with_overrides(overrides.get('performance_criteria')))
+
+
+def rescore_chunk(store_path, chunk_path, first_id, last_id, overrides):
+    """Process-pool task: re-score one id range and checkpoint it as NDJSON"""
+    key = json.dumps(overrides, sort_keys=True)
+    if key not in _worker_evaluators:
+        _worker_evaluators[key] = build_evaluator(overrides)
+    evaluator = _worker_evaluators[key]
+    criteria = list(evaluator.performance_criteria)
+    
+    store = EvaluationStore(store_path)
+    rows = store.between(first_id, last_id)
+    usable = [row for row in rows if all(k in row['detailed_scores'] for k in criteria)]
+    results = []
+    if usable:
+        # Each row is re-scored with the history stored before it, as it was first evaluated
+        results = evaluator.evaluate_batch([[row['detailed_scores'][k] for k in criteria] for row in usable],
+                                           [12 if row['tenure_months'] is None else row['tenure_months']
+                                            for row in usable], usable, store.trajectories_before(usable))
+    
+    # Write then rename so a crash never leaves a half-written checkpoint behind
+    temp_path = chunk_path + '.tmp'
+    with open(temp_path, 'w') as handle:
+        for row, result in zip(usable, results):
+            record = {'id': row['id'], 'employee_id': row['employee_id'], 'department': row['department'],
+                      'period': row['period'], 'previous_overall_score': row['overall_score']}
+            record.update((field, result[field]) for field in RESCORE_FIELDS)
+            handle.write(json.dumps(record) + '\n')
+    os.replace(temp_path, chunk_path)
+    return {'rows': len(usable), 'skipped': len(rows) - len(usable)}
+
+
+class JobManager:
+    """
+    Bulk re-evaluation of the stored archive on a process pool.
+    
+    A job splits the evaluations table into id-range chunks, runs them on a
+    ProcessPoolExecutor with one worker per core and checkpoints every
+    finished chunk as its own NDJSON file next to a job.json manifest. A job
+    whose coordinating process died is resumed from its checkpoints the next
+    time its status is requested.
+    """
+    
+    def __init__(self, store_path, jobs_dir='jobs', max_workers=None):
+        self.store_path = store_path
+        self.jobs_dir = jobs_dir
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+        self._lock = threading.Lock()
+        self._running = set()
+    
+    # ========== PUBLIC API ==========
+    
+    def submit(self, overrides=None, chunk_size=5000):
+        """Start re-scoring the whole archive with the given overrides"""
+        overrides = overrides or {}
+        build_evaluator(overrides)
+        bounds = EvaluationStore(self.store_path).id_bounds()
+        
+        job_id = uuid.uuid4().hex[:12]
+        chunks = []
+        if bounds:
+            first, last = bounds
+            for index, start in enumerate(range(first, last + 1, chunk_size)):
+                chunks.append({'index': index, 'first_id': start, 'last_id': min(start + chunk_size - 1, last),
+                               'done': False, 'rows': 0, 'skipped': 0})
+        job = {
+            'job_id': job_id,
+            'status': 'running',
+            'overrides': overrides,
+            'chunks': chunks,
+            'submitted_at': datetime.now().isoformat(),
+            'finished_at': None,
+            'error': None,
+            'owner_pid': os.getpid()
+        }
+        os.makedirs(self._job_dir(job_id), exist_ok=True)
+        self._save(job)
+        self._start(job)
+        return job_id
+    
+    def status(self, job_id):
+        """Progress summary; resumes the job if its coordinator is gone"""
+        job = self._load(job_id)
+        if job is None:
+            return None
+        # A restarted worker can come back with the dead coordinator's PID (PID 1 in a container)
+        orphaned = job['owner_pid'] == os.getpid() or not _process_alive(job['owner_pid'])
+        if job['status'] == 'running' and job_id not in self._running and orphaned:
+            job['owner_pid'] = os.getpid()
+            self._save(job)
+            self._start(job)
+        
+        done = [chunk for chunk in job['chunks'] if chunk['done']]
+        return {
+            'job_id': job_id,
+            'status': job['status'],
+            'chunks_total': len(job['chunks']),
+            'chunks_done': len(done),
+            'rows_done': sum(chunk['rows'] for chunk in done),
+            'rows_skipped': sum(chunk['skipped'] for chunk in done),
+            'progress': round(len(done) / len(job['chunks']), 4) if job['chunks'] else 1.0,
+            'submitted_at': job['submitted_at'],
+            'finished_at': job['finished_at'],
+            'error': job['error']
+        }
+    
+    def results(self, job_id):
+        """Generator over the finished job's NDJSON lines, chunk by chunk"""
+        job = self._load(job_id)
+        for chunk in job['chunks']:
+            with open(self._chunk_path(job_id, chunk['index'])) as handle:
+                for line in handle:
+                    yield line
+    
+    # ========== COORDINATION ==========
+    
+    def _start(self, job):
+        with self._lock:
+            if job['job_id'] in self._running:
+                return
+            self._running.add(job['job_id'])
+            if self._executor is None:
+                # Imported on first job; multiprocessing adds noticeably to a cold start
+                from concurrent.futures import ProcessPoolExecutor
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        threading.Thread(target=self._run, args=(job,), daemon=True).start()
+    
+    def _run(self, job):
+        job_id = job['job_id']
+        try:
+            pending = {}
+            for chunk in job['chunks']:
+                if chunk['done']:
+                    continue
+                # A checkpoint written after the last manifest save still counts
+                if os.path.exists(self._chunk_path(job_id, chunk['index'])):
+                    chunk.update(self._count_chunk(job_id, chunk['index']), done=True)
+                    continue
+                future = self._executor.submit(rescore_chunk, self.store_path, self._chunk_path(job_id, chunk['index']),
+                                               chunk['first_id'], chunk['last_id'], job['overrides'])
+                pending[future] = chunk
+            self._save(job)
+            
+            for future in as_completed(pending):
+                chunk = pending[future]
+                chunk.update(future.result(), done=True)
+                self._save(job)
+            job['status'] = 'completed'
+        except Exception as e:
+            logger.exception('Job %s failed', job_id)
+            from concurrent.futures.process import BrokenProcessPool
+            if isinstance(e, BrokenProcessPool):
+                with self._lock:
+                    self._executor = None
+            job['status'] = 'failed'
+            job['error'] = str(e)
+        finally:
+            job['finished_at'] = datetime.now().isoformat()
+            self._save(job)
+            with self._lock:
+                self._running.discard(job_id)
+    
+    def _count_chunk(self, job_id, index):
+        with open(self._chunk_path(job_id, index)) as handle:
+            return {'rows': sum(1 for _ in handle)}
+    
+    # ========== PERSISTENCE ==========
+    
+    def _job_dir(self, job_id):
+        return os.path.join(self.jobs_dir, job_id)
+    
+    def _chunk_path(self, job_id, index):
+        return os.path.join(self._job_dir(job_id), f'chunk-{index:06d}.ndjson')
+    
+    def _save(self, job):
+        path = os.path.join(self._job_dir(job['job_id']), 'job.json')
+        with self._lock:
+            with open(path + '.tmp', 'w') as handle:
+                json.dump(job, handle)
+            os.replace(path + '.tmp', path)
+    
+    def _load(self, job_id):
+        if not job_id.isalnum():
+            return None
+        path = os.path.join(self._job_dir(job_id), 'job.json')
+        if not os.path.exists(path):
+            return None
+        with open(path) as handle:
+            return json.load(handle)
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
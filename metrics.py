@@ -0,0 +1,216 @@
+import bisect
+import functools
+import math
+import threading
+import time
+from contextlib import nullcontext
+
+# Seconds; spans a sub-microsecond layer call up to a slow request
+DEFAULT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+_NULL_TIMER = nullcontext()
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(f'{name}="{value}"' for name, value in labels)
+    return '{' + pairs + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram, one series per label set"""
+    
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value, labels=()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+    
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count)
+                        for labels, (counts, total, count) in sorted(self._series.items())]
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(labels + (('le', _format_value(bound)),))
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(labels)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(labels)} {count}')
+        return lines
+
+
+class Counter:
+    """Monotonic counter, one series per label set"""
+    
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+    
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            snapshot = sorted(self._series.items())
+        lines.extend(f'{self.name}{_format_labels(labels)} {value}' for labels, value in snapshot)
+        return lines
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'start')
+    
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, self.labels)
+        return False
+
+
+class Metrics:
+    """
+    Per-process metric registry rendered in the Prometheus text format.
+    
+    When disabled, timer() hands back a shared no-op context manager and
+    count() returns immediately, so instrumented call sites cost one method
+    call. Layer timing is installed by instrument() as per-instance wrappers
+    around the evaluator's layer methods, so a disabled registry leaves the
+    evaluator untouched. Each worker process keeps its own registry.
+    """
+    
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.layer_seconds = Histogram('evaluation_layer_seconds', 'Time spent in each evaluation layer')
+        self.request_seconds = Histogram('http_request_seconds', 'End-to-end request latency')
+        self.stage_seconds = Histogram('http_request_stage_seconds', 'Request parsing and response serialization time')
+        self.queue_wait_seconds = Histogram('admission_queue_wait_seconds', 'Time admitted requests spent queued')
+        self.requests = Counter('http_requests_total', 'Requests handled')
+        self.errors = Counter('evaluation_errors_total', 'Requests that ended in an error response')
+        self._collectors = []
+    
+    def timer(self, histogram, **labels):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(histogram, tuple(sorted(labels.items())))
+    
+    def stage(self, endpoint, stage):
+        """Time one stage ('parse' or 'serialize') of a request"""
+        return self.timer(self.stage_seconds, endpoint=endpoint, stage=stage)
+    
+    def count(self, counter, **labels):
+        if self.enabled:
+            counter.inc(tuple(sorted(labels.items())))
+    
+    def observe(self, histogram, value, **labels):
+        if self.enabled:
+            histogram.observe(value, tuple(sorted(labels.items())))
+    
+    def instrument(self, evaluator):
+        """Wrap the evaluator's layer methods with timers; a no-op when disabled"""
+        if not self.enabled:
+            return evaluator
+        for layer, method_name in evaluator.EVALUATION_LAYERS:
+            method = getattr(evaluator, method_name)
+            setattr(evaluator, method_name, self._timed(method, (('layer', layer),)))
+        return evaluator
+    
+    def _timed(self, method, labels):
+        histogram = self.layer_seconds
+        
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, labels)
+        return timed
+    
+    def collect(self, callback):
+        """Register a callback returning [(name, type, help, value, labels dict), ...] at render time"""
+        self._collectors.append(callback)
+    
+    def render(self):
+        lines = []
+        for metric in (self.layer_seconds, self.request_seconds, self.stage_seconds, self.queue_wait_seconds,
+                       self.requests, self.errors):
+            lines.extend(metric.render())
+        # Samples of one metric (e.g. one per label value) share a single HELP/TYPE header
+        families = {}
+        for callback in self._collectors:
+            for name, metric_type, help_text, value, labels in callback():
+                family = families.setdefault(name, (metric_type, help_text, []))
+                family[2].append(f'{name}{_format_labels(tuple(sorted(labels.items())))} {_format_value(value)}')
+        for name, (metric_type, help_text, samples) in families.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+def cache_collector(cache):
+    """Expose EvaluationCache.stats() as gauges and counters"""
+    def collect():
+        stats = cache.stats()
+        labels = {'mode': stats['mode']}
+        return [
+            ('evaluation_cache_hits_total', 'counter', 'Evaluation cache hits', stats['hits'], labels),
+            ('evaluation_cache_misses_total', 'counter', 'Evaluation cache misses', stats['misses'], labels),
+            ('evaluation_cache_size', 'gauge', 'Entries held by the evaluation cache', stats['size'], labels),
+            ('evaluation_cache_hit_rate', 'gauge', 'Evaluation cache hit rate', stats['hit_rate'], labels)
+        ]
+    return collect
+
+
+def admission_collector(queue, flight):
+    """Expose AdmissionQueue.stats() and SingleFlight coalescing as gauges and counters"""
+    def collect():
+        stats = queue.stats()
+        metrics = [
+            ('admission_queue_depth', 'gauge', 'Requests waiting for an evaluation slot', stats['queue_depth'], {}),
+            ('admission_active', 'gauge', 'Requests holding an evaluation slot', stats['active'], {}),
+            ('admission_concurrency', 'gauge', 'Evaluation slots', stats['concurrency'], {}),
+            ('admission_admitted_total', 'counter', 'Requests admitted', stats['admitted'], {}),
+            ('admission_wait_seconds_total', 'counter', 'Total time admitted requests spent queued',
+             stats['wait_seconds'], {}),
+            ('admission_service_seconds', 'gauge', 'Recent average time a request holds a slot',
+             stats['service_seconds'], {}),
+            ('coalesced_requests_total', 'counter', 'Requests answered by an identical in-flight evaluation',
+             flight.coalesced, {}),
+            ('coalescing_in_flight', 'gauge', 'Distinct evaluations in flight', flight.in_flight(), {})
+        ]
+        metrics.extend(('admission_shed_total', 'counter', 'Requests shed by admission control', count,
+                        {'reason': reason}) for reason, count in stats['shed'].items())
+        return metrics
+    return collect
@@ -0,0 +1,130 @@
+import math
+import threading
+
+
+class RunningMoments:
+    """
+    Count, mean and M2 per channel.
+    
+    Updated one observation at a time with Welford's algorithm and combined
+    with Chan's parallel formula, so peer statistics never need a rescan.
+    """
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = {}
+        self.m2 = {}
+    
+    def update(self, values):
+        self.count += 1
+        for name, value in values.items():
+            mean = self.mean.get(name, 0.0)
+            delta = value - mean
+            mean += delta / self.count
+            self.m2[name] = self.m2.get(name, 0.0) + delta * (value - mean)
+            self.mean[name] = mean
+        return self
+    
+    def merge(self, other):
+        total = self.count + other.count
+        if not other.count:
+            return self
+        for name in set(self.mean) | set(other.mean):
+            mean_a, mean_b = self.mean.get(name, 0.0), other.mean.get(name, 0.0)
+            delta = mean_b - mean_a
+            self.mean[name] = mean_a + delta * other.count / total
+            self.m2[name] = (self.m2.get(name, 0.0) + other.m2.get(name, 0.0) +
+                             delta * delta * self.count * other.count / total)
+        self.count = total
+        return self
+    
+    @classmethod
+    def from_sums(cls, count, sums, squares):
+        """Build from per-channel sums and sums of squares (e.g. a SQL aggregate)"""
+        moments = cls()
+        moments.count = count
+        for name, total in sums.items():
+            moments.mean[name] = total / count
+            moments.m2[name] = max(squares[name] - total * total / count, 0.0)
+        return moments
+    
+    def variance(self, name):
+        return self.m2.get(name, 0.0) / (self.count - 1) if self.count > 1 else 0.0
+    
+    def std(self, name):
+        return math.sqrt(self.variance(name))
+    
+    def z_score(self, name, value):
+        std = self.std(name)
+        return (value - self.mean[name]) / std if std > 0 else 0.0
+    
+    def to_state(self):
+        return {'count': self.count, 'mean': dict(self.mean), 'm2': dict(self.m2)}
+    
+    @classmethod
+    def from_state(cls, state):
+        moments = cls()
+        moments.count = state['count']
+        moments.mean = dict(state['mean'])
+        moments.m2 = dict(state['m2'])
+        return moments
+
+
+class PeerBenchmarks:
+    """
+    Materialized peer-group aggregates, updated as each evaluation arrives.
+    
+    Moments for every criterion plus the overall score and simple average are
+    kept per department, position, tenure group and for the whole workforce,
+    so a benchmark comparison is a constant-time dictionary lookup. Groups
+    with fewer than min_peers evaluations are reported as missing.
+    """
+    
+    def __init__(self, min_peers=5):
+        self.min_peers = min_peers
+        self.groups = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def keys(department=None, position=None, tenure_group=None):
+        keys = [('all', None)]
+        if department is not None:
+            keys.append(('department', department))
+        if position is not None:
+            keys.append(('position', position))
+        if tenure_group is not None:
+            keys.append(('tenure', tenure_group))
+        return keys
+    
+    def observe(self, values, department=None, position=None, tenure_group=None):
+        """values maps each criterion plus 'overall' and 'average' to this evaluation's score"""
+        with self._lock:
+            for key in self.keys(department, position, tenure_group):
+                self.groups.setdefault(key, RunningMoments()).update(values)
+    
+    def peers(self, kind, name=None):
+        """Moments for one peer group, or None while it is too small to compare against"""
+        moments = self.groups.get((kind, name))
+        if moments is None or moments.count < self.min_peers:
+            return None
+        return moments
+    
+    def load(self, kind, name, moments):
+        with self._lock:
+            self.groups.setdefault((kind, name), RunningMoments()).merge(moments)
+    
+    def merge(self, other):
+        with self._lock:
+            for key, moments in other.groups.items():
+                self.groups.setdefault(key, RunningMoments()).merge(moments)
+        return self
+    
+    def to_state(self):
+        return [{'kind': kind, 'name': name, **moments.to_state()} for (kind, name), moments in self.groups.items()]
+    
+    @classmethod
+    def from_state(cls, state, min_peers=5):
+        benchmarks = cls(min_peers)
+        for entry in state:
+            benchmarks.groups[(entry['kind'], entry['name'])] = RunningMoments.from_state(entry)
+        return benchmarks
@@ -0,0 +1,166 @@
+import threading
+
+
+class ScoreSketch:
+    """
+    Mergeable quantile sketch for overall scores.
+    
+    Overall scores live on [0, 10] with two decimals, so a fixed histogram of
+    1001 bins is exact, never grows with volume and merges by adding counts.
+    A Fenwick tree over the bins keeps both updates and rank queries O(log n).
+    """
+    
+    def __init__(self, resolution=100, max_score=10.0):
+        self.resolution = resolution
+        self.size = int(round(max_score * resolution)) + 1
+        self.counts = [0] * self.size
+        self.tree = [0] * (self.size + 1)
+        self.total = 0
+    
+    def bin(self, score):
+        return min(max(int(round(score * self.resolution)), 0), self.size - 1)
+    
+    def add(self, score, count=1):
+        self.add_bin(self.bin(score), count)
+    
+    def add_bin(self, index, count=1):
+        self.counts[index] += count
+        self.total += count
+        position = index + 1
+        while position <= self.size:
+            self.tree[position] += count
+            position += position & -position
+    
+    def count_below(self, index):
+        """Number of observations in bins [0, index)"""
+        total = 0
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+    
+    def rank(self, score):
+        """Mid-rank of score in [0, 1]: share below plus half of the ties"""
+        if not self.total:
+            return None
+        index = self.bin(score)
+        return (self.count_below(index) + self.counts[index] / 2) / self.total
+    
+    def quantile(self, q):
+        """Smallest score with at least q of the population at or below it"""
+        if not self.total:
+            return None
+        target = max(q * self.total, 1)
+        position, seen = 0, 0
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = position + step
+            if nxt <= self.size and seen + self.tree[nxt] < target:
+                position = nxt
+                seen += self.tree[nxt]
+            step >>= 1
+        return position / self.resolution
+    
+    def merge(self, other):
+        if other.size != self.size:
+            raise ValueError('Cannot merge sketches with different resolutions')
+        for index, count in enumerate(other.counts):
+            if count:
+                self.add_bin(index, count)
+        return self
+    
+    def to_state(self):
+        return {'resolution': self.resolution, 'counts': list(self.counts)}
+    
+    @classmethod
+    def from_state(cls, state):
+        sketch = cls(state['resolution'], (len(state['counts']) - 1) / state['resolution'])
+        for index, count in enumerate(state['counts']):
+            if count:
+                sketch.add_bin(index, count)
+        return sketch
+
+
+class PercentileEngine:
+    """
+    Population percentiles per department and period, learned from every evaluation.
+    
+    Each observation updates the global, per-department, per-period and
+    per-(department, period) sketches. A lookup uses the most specific scope
+    with at least min_population observations and returns None before that,
+    so callers can fall back to the simulated table. Engines from separate
+    workers combine with merge() or via to_state()/from_state().
+    """
+    
+    def __init__(self, min_population=30):
+        self.min_population = min_population
+        self.sketches = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def scopes(department=None, period=None):
+        """Scopes from most to least specific, skipping unknown dimensions"""
+        scopes = []
+        for scope in [(department, period), (department, None), (None, period), (None, None)]:
+            if scope not in scopes:
+                scopes.append(scope)
+        return scopes
+    
+    def observe(self, score, department=None, period=None):
+        with self._lock:
+            for scope in self.scopes(department, period):
+                self.sketches.setdefault(scope, ScoreSketch()).add(score)
+    
+    def sketch_for(self, department=None, period=None):
+        """Most specific sketch with enough population, or None"""
+        for scope in self.scopes(department, period):
+            sketch = self.sketches.get(scope)
+            if sketch is not None and sketch.total >= self.min_population:
+                return sketch
+        return None
+    
+    def percentile(self, score, department=None, period=None):
+        sketch = self.sketch_for(department, period)
+        if sketch is None:
+            return None
+        return round(sketch.rank(score) * 100)
+    
+    def percentile_array(self, scores, department=None, period=None):
+        """Vectorized percentile for a numpy array of scores sharing one scope"""
+        import numpy as np
+        sketch = self.sketch_for(department, period)
+        if sketch is None:
+            return None
+        counts = np.array(sketch.counts)
+        below = np.cumsum(counts) - counts
+        bins = np.clip(np.rint(scores * sketch.resolution).astype(int), 0, sketch.size - 1)
+        return np.rint((below[bins] + counts[bins] / 2) / sketch.total * 100).astype(int)
+    
+    def total(self):
+        """Evaluations observed or loaded so far; it moves whenever any percentile can"""
+        sketch = self.sketches.get((None, None))
+        return sketch.total if sketch is not None else 0
+    
+    def load_histogram(self, rows):
+        """Seed from (department, period, bin, count) rows, e.g. aggregated from the store"""
+        with self._lock:
+            for department, period, index, count in rows:
+                for scope in self.scopes(department, period):
+                    sketch = self.sketches.setdefault(scope, ScoreSketch())
+                    sketch.add_bin(min(max(int(index), 0), sketch.size - 1), count)
+    
+    def merge(self, other):
+        with self._lock:
+            for scope, sketch in other.sketches.items():
+                self.sketches.setdefault(scope, ScoreSketch(sketch.resolution)).merge(sketch)
+        return self
+    
+    def to_state(self):
+        return [{'department': d, 'period': p, **sketch.to_state()} for (d, p), sketch in self.sketches.items()]
+    
+    @classmethod
+    def from_state(cls, state, min_population=30):
+        engine = cls(min_population)
+        for entry in state:
+            engine.sketches[(entry['department'], entry['period'])] = ScoreSketch.from_state(entry)
+        return engine
@@ -0,0 +1,317 @@
+import hashlib
+import json
+import math
+import os
+import threading
+from operator import mul
+
+from evaluation_result import constant
+
+# Shipped coefficients; EVALUATION_RISK_MODEL points the app at another (e.g. refitted) file
+DEFAULT_RISK_MODEL = os.environ.get('EVALUATION_RISK_MODEL',
+                                    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models',
+                                                 'risk_model.json'))
+
+# Model inputs, in coefficient order; the last ones come from the employee's history
+HISTORY_FEATURES = ('score_drop', 'trend', 'volatility', 'volatility_change', 'cycles_since_ready')
+RISK_FEATURES = ('overall_score', 'lowest_score', 'score_spread', 'tenure_years') + HISTORY_FEATURES
+RISKS = ('burnout', 'attrition', 'volatility')
+# Result field holding each risk's entry
+RISK_FIELDS = {'burnout': 'burnout_risk', 'attrition': 'attrition_risk', 'volatility': 'performance_volatility'}
+
+# Feature caps, so a long career or a long wait does not dominate the logit
+TENURE_MONTHS_CAP = 120
+READY_CYCLES_CAP = 8
+# Reasons shown per risk
+MAX_FACTORS = 2
+
+
+def risk_features(overall_score, lowest_score, score_spread, tenure_months, history, ready):
+    """
+    Feature vector in RISK_FEATURES order.
+    
+    history is the employee's TrajectoryStats including this evaluation
+    (None when there is none) and ready this evaluation's promotion
+    readiness. Without history the history features are neutral: no drop,
+    trend or volatility, and one cycle since readiness unless ready now.
+    """
+    return [float(overall_score), float(lowest_score), float(score_spread),
+            min(tenure_months or 0, TENURE_MONTHS_CAP) / 12] + history_features(history, ready)
+
+
+def history_features(history, ready):
+    """The HISTORY_FEATURES part of risk_features()"""
+    drop = trend = volatility = change = 0.0
+    since_ready = 0 if ready else 1
+    if history is not None and history.cycles:
+        recent = history.recent
+        if len(recent) == 2:
+            drop = max(recent[0] - recent[1], 0.0)
+        trend = history.slope()
+        volatility = history.spread()
+        change = volatility - history.prior_spread()
+        if not ready:
+            last = history.last_ready
+            since_ready = history.cycles - 1 - last if last is not None else history.cycles
+    return [drop, trend, volatility, change, float(min(since_ready, READY_CYCLES_CAP))]
+
+
+def score_summary(values):
+    """(lowest score, spread rounded like score_consistency) of one evaluation's criterion scores"""
+    mean = sum(values) / len(values)
+    return float(min(values)), round(math.sqrt(sum((v - mean) ** 2 for v in values) / len(values)), 2)
+
+
+def model_version(config):
+    """Content-derived version, '<name>@<digest>'"""
+    digest = hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:12]
+    return f"{config['name']}@{digest}"
+
+
+def _probability(z):
+    """Logistic function, rounded for display; overflow-safe at both ends"""
+    if z >= 0:
+        return round(1 / (1 + math.exp(-z)), 2)
+    e = math.exp(z)
+    return round(e / (1 + e), 2)
+
+
+class RiskModel:
+    """
+    Logistic burnout, attrition and volatility risk compiled from a JSON file.
+    
+    Each risk is intercept + coefficients . features over RISK_FEATURES. The
+    scalar path accumulates the logit feature by feature and the batch path
+    does the same column by column over an N x F matrix, so both produce
+    identical probabilities and levels. Factors are the features pushing the
+    logit furthest above the reference (training mean) profile. Entries are
+    interned and pre-encoded, since probabilities are shown to two decimals
+    and the combinations are few. version is derived from the file content.
+    """
+    
+    def __init__(self, config):
+        self.config = config
+        self.name = config['name']
+        self.label = str(config.get('version', ''))
+        self.version = model_version(config)
+        
+        self.intercepts = []
+        self.coefficients = []
+        for risk in RISKS:
+            spec = config['risks'][risk]
+            missing = [name for name in RISK_FEATURES if name not in spec['coefficients']]
+            if missing:
+                raise ValueError(f'Risk model {self.name!r}: {risk} has no coefficient for {missing}')
+            self.intercepts.append(float(spec['intercept']))
+            self.coefficients.append(tuple(float(spec['coefficients'][name]) for name in RISK_FEATURES))
+        self.reference = tuple(float(config['reference'].get(name, 0.0)) for name in RISK_FEATURES)
+        
+        levels = sorted(config['levels'], key=lambda level: -level['min_probability'])
+        if levels[-1]['min_probability'] > 0:
+            raise ValueError(f'Risk model {self.name!r}: levels must end with a catch-all (min_probability 0)')
+        self.level_bounds = tuple(float(level['min_probability']) for level in levels)
+        self.level_names = tuple(level['level'] for level in levels)
+        self.factor_threshold = float(config.get('factor_min_contribution', 0.25))
+        self.factor_labels = tuple((config['factor_labels'][name]['low'], config['factor_labels'][name]['high'])
+                                   for name in RISK_FEATURES)
+        self.no_factors = config['no_factors']
+        self.stability = config['stability']
+        self.mitigations = config['mitigations']
+        self._entries = {}
+        self._mitigation_lists = {}
+    
+    # ========== SINGLE RECORD ==========
+    
+    def assess(self, features):
+        """Risk-layer fields for one feature vector"""
+        deviations = [value - ref for value, ref in zip(features, self.reference)]
+        threshold = self.factor_threshold
+        levels, probabilities, factors = [], [], []
+        for intercept, coefficients in zip(self.intercepts, self.coefficients):
+            z = intercept
+            for weight, value in zip(coefficients, features):
+                z = z + weight * value
+            probability = _probability(z)
+            probabilities.append(probability)
+            levels.append(self._level(probability))
+            contributions = list(map(mul, coefficients, deviations))
+            shown = [j for j, c in enumerate(contributions) if c >= threshold]
+            if len(shown) > 1:
+                shown.sort(key=contributions.__getitem__, reverse=True)
+            factors.append(tuple([(j, deviations[j] > 0) for j in shown[:MAX_FACTORS]]))
+        return self.fields(levels, probabilities, factors)
+    
+    def _level(self, probability):
+        for bound, name in zip(self.level_bounds, self.level_names):
+            if probability >= bound:
+                return name
+        return self.level_names[-1]
+    
+    # ========== BATCH ==========
+    
+    def assess_batch(self, features):
+        """
+        Per-row risk columns for an N x F feature matrix: (N x 3 level index,
+        N x 3 probability, N x 3 factor code), one column per risk
+        """
+        import numpy as np
+        features = np.asarray(features, dtype=np.float64)
+        n = len(features)
+        count = len(RISK_FEATURES)
+        reference = np.array(self.reference)
+        above = features > reference
+        levels = np.zeros((n, len(RISKS)), dtype=np.int64)
+        probabilities = np.zeros((n, len(RISKS)))
+        codes = np.zeros((n, len(RISKS)), dtype=np.int64)
+        for r, (intercept, coefficients) in enumerate(zip(self.intercepts, self.coefficients)):
+            z = np.full(n, intercept)
+            for j, weight in enumerate(coefficients):
+                z = z + weight * features[:, j]
+            # The logistic is evaluated once per distinct logit, with the scalar function
+            unique, inverse = np.unique(z, return_inverse=True)
+            probability = np.array([_probability(value) for value in unique.tolist()])[inverse.reshape(-1)]
+            probabilities[:, r] = probability
+            levels[:, r] = np.select([probability >= bound for bound in self.level_bounds],
+                                     range(len(self.level_bounds)), default=len(self.level_bounds) - 1)
+            
+            contributions = np.array(coefficients) * (features - reference)
+            order = np.argsort(-contributions, axis=1, kind='stable')[:, :MAX_FACTORS]
+            code = np.zeros(n, dtype=np.int64)
+            for position in range(order.shape[1]):
+                j = order[:, position]
+                shown = np.take_along_axis(contributions, j[:, None], axis=1)[:, 0] >= self.factor_threshold
+                direction = np.take_along_axis(above, j[:, None], axis=1)[:, 0]
+                code = code + np.where(shown, (2 * j + direction + 1) * (2 * count + 1) ** position, 0)
+            codes[:, r] = code
+        return levels, probabilities, codes
+    
+    def fields_from_columns(self, levels, probabilities, codes):
+        """Risk-layer fields from one row of assess_batch's columns (plain Python lists)"""
+        base = 2 * len(RISK_FEATURES) + 1
+        factors = []
+        for code in codes:
+            decoded = []
+            while code:
+                code, digit = divmod(code, base)
+                decoded.append(((digit - 1) // 2, bool((digit - 1) % 2)))
+            factors.append(tuple(decoded))
+        return self.fields([self.level_names[level] for level in levels], probabilities, factors)
+    
+    def probabilities(self, features):
+        """Unrounded N x 3 risk probabilities for an N x F feature matrix, for ranking"""
+        import numpy as np
+        features = np.asarray(features, dtype=np.float64)
+        z = np.array(self.intercepts) + features @ np.array(self.coefficients).T
+        return 1 / (1 + np.exp(-z))
+    
+    # ========== ENTRIES ==========
+    
+    def fields(self, levels, probabilities, factors):
+        """Result fields from per-risk levels, display probabilities and (feature, above) factor tuples"""
+        fields = {RISK_FIELDS[risk]: self._entry(risk, level, probability, factor)
+                  for risk, level, probability, factor in zip(RISKS, levels, probabilities, factors)}
+        fields['mitigation_recommendations'] = self._mitigation(tuple(levels))
+        return fields
+    
+    def _entry(self, risk, level, probability, factors):
+        key = (risk, level, probability, factors)
+        entry = self._entries.get(key)
+        if entry is None:
+            labels = [self.factor_labels[j][above] for j, above in factors] or [self.no_factors[risk]]
+            entry = {'risk_level': level, 'probability': probability}
+            if risk == 'attrition':
+                entry['retention_probability'] = f'{100 - round(probability * 100)}%'
+            elif risk == 'volatility':
+                entry['stability'] = self.stability[level]
+            entry['factors'] = labels
+            entry = self._entries[key] = constant(entry)
+        return entry
+    
+    def _mitigation(self, levels):
+        recommendations = self._mitigation_lists.get(levels)
+        if recommendations is None:
+            recommendations = [self.mitigations[risk][level] for risk, level in zip(RISKS, levels)
+                               if level in self.mitigations[risk]] or list(self.mitigations['default'])
+            recommendations = self._mitigation_lists[levels] = constant(recommendations)
+        return recommendations
+    
+    def summary(self):
+        return {'name': self.name, 'version': self.version, 'label': self.label,
+                'features': list(RISK_FEATURES), 'training': self.config.get('training')}
+
+
+def read_risk_model(path=DEFAULT_RISK_MODEL):
+    with open(path) as handle:
+        config = json.load(handle)
+    config.setdefault('name', os.path.splitext(os.path.basename(path))[0])
+    return config
+
+
+_default_models = {}
+_default_lock = threading.Lock()
+
+
+def default_risk_model(path=DEFAULT_RISK_MODEL):
+    """The compiled risk model of a file, read once per process"""
+    model = _default_models.get(path)
+    if model is None:
+        with _default_lock:
+            model = _default_models.get(path)
+            if model is None:
+                model = _default_models[path] = RiskModel(read_risk_model(path))
+    return model
+
+
+# ========== WORKFORCE RANKING ==========
+
+def rank_workforce(store, model, risk='attrition', department=None, limit=None, chunk_size=5000):
+    """
+    Every employee's latest stored evaluation scored in one matrix pass,
+    highest risk first. Features come from the stored scores and readiness
+    and the employee's running trajectory, so no history is rescanned.
+    """
+    import numpy as np
+    if risk not in RISKS:
+        raise ValueError(f'Unknown risk {risk!r}; expected one of {list(RISKS)}')
+    employees, features = [], []
+    for chunk in store.latest_with_trajectories(department, chunk_size):
+        for row, history in chunk:
+            lowest, spread = score_summary(list(row['detailed_scores'].values()))
+            tenure = 12 if row['tenure_months'] is None else row['tenure_months']
+            features.append(risk_features(row['overall_score'], lowest, spread, tenure, history,
+                                          bool(row['promotion_ready'])))
+            employees.append(row)
+    if not employees:
+        return []
+    
+    probabilities = model.probabilities(np.array(features))
+    order = np.argsort(-probabilities[:, RISKS.index(risk)], kind='stable')[:limit]
+    return [dict({field: employees[i][field] for field in ('employee_id', 'name', 'department', 'position',
+                                                           'period', 'overall_score')},
+                 **{name: round(p, 4) for name, p in zip(RISKS, probabilities[i].tolist())})
+            for i in order.tolist()]
+
+
+if __name__ == '__main__':
+    # Nightly ranking: python risk_model.py --risk attrition --top 100 --output ranking.ndjson
+    import argparse
+    import sys
+    from evaluation_store import EvaluationStore
+    
+    parser = argparse.ArgumentParser(description='Rank the workforce by a risk, highest first, as NDJSON')
+    parser.add_argument('--db', default=os.environ.get('EVALUATION_DB_PATH', 'evaluations.db'))
+    parser.add_argument('--model', default=DEFAULT_RISK_MODEL)
+    parser.add_argument('--risk', choices=RISKS, default='attrition')
+    parser.add_argument('--department')
+    parser.add_argument('--top', type=int)
+    parser.add_argument('--output', help='NDJSON file (default: stdout)')
+    args = parser.parse_args()
+    
+    model = RiskModel(read_risk_model(args.model))
+    ranking = rank_workforce(EvaluationStore(args.db), model, args.risk, args.department, args.top)
+    out = open(args.output, 'w') if args.output else sys.stdout
+    for entry in ranking:
+        out.write(json.dumps(dict(entry, model_version=model.version)) + '\n')
+    if args.output:
+        out.close()
+        print(f'Ranked {len(ranking)} employees by {args.risk} risk with {model.version}', file=sys.stderr)
@@ -0,0 +1,251 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+# Shipped rubric files; EVALUATION_RUBRICS_DIR points the app at another directory
+DEFAULT_RUBRICS_DIR = os.environ.get('EVALUATION_RUBRICS_DIR',
+                                     os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rubrics'))
+DEFAULT_RUBRIC = 'default'
+
+logger = logging.getLogger(__name__)
+
+# Criterion weights must be positive and add up to 1 within this tolerance
+WEIGHT_TOLERANCE = 1e-6
+
+# Sections a department rubric may omit; they are inherited from the default rubric
+INHERITED_SECTIONS = ('criteria', 'performance_levels', 'simulated_percentiles', 'promotion_tenure_cap',
+                      'tenure_benchmarks', 'skill_levels', 'target_levels')
+
+
+class Rubric:
+    """
+    A rubric compiled once into flat tables for the hot path.
+    
+    criteria, weights and importance are aligned tuples, so a score dict in
+    criteria order is weighted with a single zip; weight_of and importance_of
+    are flat name -> value dicts for everything else. Level ranges, tenure
+    bounds and skill bands are kept as ordered boundary tables. version is
+    derived from the file content, so an edited file compiles to a new
+    version while unchanged files keep theirs across reloads.
+    """
+    
+    __slots__ = ('name', 'label', 'version', 'departments', 'config', 'criteria', 'weights', 'importance',
+                 'weight_of', 'importance_of', 'performance_criteria', 'trait_labels', 'gap_mitigations',
+                 'performance_levels', 'simulated_percentiles', 'promotion_tenure_cap', 'tenure_benchmarks',
+                 'tenure_bounds', 'skill_level_bands', 'target_level_bands')
+    
+    def __init__(self, config):
+        self.config = config
+        self.name = config['name']
+        self.label = str(config.get('version', ''))
+        self.version = rubric_version(config)
+        self.departments = tuple(config.get('departments', ()))
+        
+        criteria = config['criteria']
+        if not criteria:
+            raise ValueError(f'Rubric {self.name!r} defines no criteria')
+        self.criteria = tuple(criterion['name'] for criterion in criteria)
+        if len(set(self.criteria)) != len(self.criteria):
+            raise ValueError(f'Rubric {self.name!r} repeats a criterion')
+        if not all(name.isidentifier() for name in self.criteria):
+            raise ValueError(f'Rubric {self.name!r}: criterion names must be identifiers')
+        self.weights = self._weights(criteria)
+        self.importance = tuple(float(criterion.get('importance', 0.5)) for criterion in criteria)
+        self.weight_of = dict(zip(self.criteria, self.weights))
+        self.importance_of = dict(zip(self.criteria, self.importance))
+        self.performance_criteria = {name: {'weight': weight, 'description': criterion.get('description', '')}
+                                     for name, weight, criterion in zip(self.criteria, self.weights, criteria)}
+        self.trait_labels = {criterion['name']: criterion['trait'] for criterion in criteria if 'trait' in criterion}
+        self.gap_mitigations = {criterion['name']: criterion['mitigation']
+                                for criterion in criteria if 'mitigation' in criterion}
+        
+        self.performance_levels = {(level['min'], level['max']): (level['level'], level['description'])
+                                   for level in config['performance_levels']}
+        self.simulated_percentiles = {int(score): percentile
+                                      for score, percentile in config['simulated_percentiles'].items()}
+        self.promotion_tenure_cap = float(config['promotion_tenure_cap'])
+        
+        self.tenure_benchmarks = [(group['max_months'], group['group'], group['score'])
+                                  for group in config['tenure_benchmarks']]
+        self.tenure_bounds = tuple(upper for upper, _, _ in self.tenure_benchmarks if upper is not None)
+        if (list(self.tenure_bounds) != sorted(self.tenure_bounds) or
+                self.tenure_benchmarks[-1][0] is not None or len(self.tenure_bounds) != len(self.tenure_benchmarks) - 1):
+            raise ValueError(f'Rubric {self.name!r}: tenure_benchmarks must ascend and end with an open group')
+        self.skill_level_bands = self._bands(config['skill_levels'])
+        self.target_level_bands = self._bands(config['target_levels'])
+    
+    def _weights(self, criteria):
+        """Criterion weights, which must be positive numbers summing to 1 so overall scores stay on 1-10"""
+        weights = []
+        for criterion in criteria:
+            weight = criterion['weight']
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not weight > 0:
+                raise ValueError(f"Rubric {self.name!r}: {criterion['name']} weight must be a positive number, "
+                                 f'got {weight!r}')
+            weights.append(float(weight))
+        if abs(sum(weights) - 1.0) > WEIGHT_TOLERANCE:
+            raise ValueError(f'Rubric {self.name!r}: criterion weights must sum to 1, got {round(sum(weights), 6)}')
+        return tuple(weights)
+    
+    def _bands(self, bands):
+        compiled = [(float('-inf') if band['min'] is None else band['min'], band['label']) for band in bands]
+        if compiled[-1][0] != float('-inf'):
+            raise ValueError(f'Rubric {self.name!r}: score bands must end with a catch-all (min null) band')
+        return compiled
+    
+    def with_overrides(self, criteria=None):
+        """
+        Recompiled copy with per-criterion settings merged in, e.g.
+        {'teamwork': {'weight': 0.2}, 'initiative': {'weight': 0.15}}
+        """
+        config = copy.deepcopy(self.config)
+        by_name = {criterion['name']: criterion for criterion in config['criteria']}
+        for name, changes in (criteria or {}).items():
+            if name not in by_name:
+                raise ValueError(f'Unknown performance_criteria entry: {name}')
+            if not isinstance(changes, dict):
+                raise ValueError(f'performance_criteria.{name} must be an object of settings')
+            by_name[name].update(changes)
+        return Rubric(config)
+    
+    def summary(self):
+        return {'name': self.name, 'version': self.version, 'label': self.label,
+                'departments': list(self.departments), 'criteria': dict(zip(self.criteria, self.weights))}
+
+
+def rubric_version(config):
+    """Content-derived version, '<name>@<digest>'"""
+    digest = hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:12]
+    return f"{config['name']}@{digest}"
+
+
+def read_rubric_config(path, base=None):
+    """Rubric config from a JSON file, with sections it omits taken from base"""
+    with open(path) as handle:
+        config = json.load(handle)
+    config.setdefault('name', os.path.splitext(os.path.basename(path))[0])
+    for section in INHERITED_SECTIONS:
+        if section not in config and base is not None:
+            config[section] = base[section]
+    return config
+
+
+_default_rubrics = {}
+_default_lock = threading.Lock()
+
+
+def default_rubric(directory=DEFAULT_RUBRICS_DIR):
+    """The compiled default rubric of a directory, read once per process"""
+    rubric = _default_rubrics.get(directory)
+    if rubric is None:
+        with _default_lock:
+            rubric = _default_rubrics.get(directory)
+            if rubric is None:
+                path = os.path.join(directory, DEFAULT_RUBRIC + '.json')
+                rubric = _default_rubrics[directory] = Rubric(read_rubric_config(path))
+    return rubric
+
+
+class RubricRegistry:
+    """
+    Compiled rubrics from a directory of JSON files, one rubric per file.
+    
+    default.json covers every department no other rubric lists in its
+    'departments'. Routing lives in one immutable (departments, default)
+    snapshot, so for_department() is a single dict lookup with no locking.
+    reload() recompiles only files whose content changed and publishes the
+    new snapshot in one assignment: requests never wait on a reload, and
+    in-flight requests finish on the rubric they started with. Only the
+    versions routed to stay compiled: a version superseded by an edit (or
+    whose file was removed) is dropped from versions by the reload.
+    """
+    
+    def __init__(self, directory=DEFAULT_RUBRICS_DIR, check_interval=None):
+        self.directory = directory
+        self.check_interval = check_interval
+        self.versions = {}
+        self._signature = None
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+        self._routing = ({}, None)
+        self.reload()
+    
+    def for_department(self, department):
+        departments, default = self._routing
+        return departments.get(department, default)
+    
+    def get(self, version):
+        rubric = self.versions.get(version)
+        if rubric is None:
+            raise ValueError(f'Unknown rubric version {version!r}')
+        return rubric
+    
+    @property
+    def default(self):
+        return self._routing[1]
+    
+    def departments(self):
+        """department -> rubric, for every department with its own rubric"""
+        return dict(self._routing[0])
+    
+    def active(self):
+        """Rubrics currently routed to, default first"""
+        departments, default = self._routing
+        seen = {default.version: default}
+        for rubric in departments.values():
+            seen.setdefault(rubric.version, rubric)
+        return list(seen.values())
+    
+    def maybe_reload(self):
+        """
+        reload() at most once per check_interval seconds; a no-op when hot
+        reload is off. A file that fails to compile (e.g. half-saved) is
+        reported and the current rubrics keep serving.
+        """
+        if self.check_interval is None or time.monotonic() < self._next_check:
+            return False
+        self._next_check = time.monotonic() + self.check_interval
+        try:
+            return self.reload()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning('Rubric reload skipped: %s', e)
+            return False
+    
+    def reload(self):
+        """Recompile changed rubric files and publish the new routing; False when nothing changed"""
+        with self._reload_lock:
+            paths = sorted(os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                           if name.endswith('.json'))
+            signature = tuple((path, stat.st_mtime_ns, stat.st_size) for path, stat in
+                              ((path, os.stat(path)) for path in paths))
+            if signature == self._signature:
+                return False
+            
+            default_path = os.path.join(self.directory, DEFAULT_RUBRIC + '.json')
+            compiled = {}
+            default = self._compile(read_rubric_config(default_path), compiled)
+            departments = {}
+            for path in paths:
+                if path == default_path:
+                    continue
+                rubric = self._compile(read_rubric_config(path, default.config), compiled)
+                for department in rubric.departments:
+                    if department in departments:
+                        raise ValueError(f'Department {department!r} is claimed by rubrics '
+                                         f'{departments[department].name!r} and {rubric.name!r}')
+                    departments[department] = rubric
+            
+            self._routing = (departments, default)
+            self.versions = compiled
+            self._signature = signature
+            return True
+    
+    def _compile(self, config, compiled):
+        """Compiled rubric for a config into compiled, reusing the current one when its content is unchanged"""
+        version = rubric_version(config)
+        rubric = compiled[version] = self.versions.get(version) or Rubric(config)
+        return rubric
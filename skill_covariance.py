@@ -0,0 +1,167 @@
+import math
+import threading
+
+
+class RunningCovariance:
+    """
+    Count, means and co-moment matrix over a fixed list of criteria.
+    
+    Updated one evaluation at a time with Welford's algorithm (O(k^2) per
+    update) and combined with Chan's parallel formula, so worker
+    accumulators merge without a rescan.
+    """
+    
+    def __init__(self, size):
+        self.count = 0
+        self.mean = [0.0] * size
+        self.comoment = [[0.0] * size for _ in range(size)]
+    
+    def update(self, values):
+        """values: one score per criterion, in criteria order"""
+        self.count += 1
+        mean = self.mean
+        before = [value - m for value, m in zip(values, mean)]
+        for i, delta in enumerate(before):
+            mean[i] += delta / self.count
+        after = [value - m for value, m in zip(values, mean)]
+        for row, delta in zip(self.comoment, before):
+            for j, residual in enumerate(after):
+                row[j] += delta * residual
+        return self
+    
+    def merge(self, other):
+        if not other.count:
+            return self
+        total = self.count + other.count
+        delta = [b - a for a, b in zip(self.mean, other.mean)]
+        scale = self.count * other.count / total
+        for i, (row, other_row) in enumerate(zip(self.comoment, other.comoment)):
+            for j in range(len(row)):
+                row[j] += other_row[j] + delta[i] * delta[j] * scale
+        self.mean = [a + d * other.count / total for a, d in zip(self.mean, delta)]
+        self.count = total
+        return self
+    
+    @classmethod
+    def from_sums(cls, count, sums, products):
+        """Build from per-criterion sums and the matrix of sums of pairwise products (e.g. a SQL aggregate)"""
+        moments = cls(len(sums))
+        moments.count = count
+        moments.mean = [total / count for total in sums]
+        moments.comoment = [[products[i][j] - sums[i] * sums[j] / count for j in range(len(sums))]
+                            for i in range(len(sums))]
+        return moments
+    
+    def covariance(self):
+        """Sample covariance matrix"""
+        if self.count < 2:
+            return [[0.0] * len(self.mean) for _ in self.mean]
+        return [[value / (self.count - 1) for value in row] for row in self.comoment]
+    
+    def correlation(self):
+        spread = [math.sqrt(max(self.comoment[i][i], 0.0)) for i in range(len(self.mean))]
+        return [[value / (spread[i] * spread[j]) if spread[i] and spread[j] else float(i == j)
+                 for j, value in enumerate(row)] for i, row in enumerate(self.comoment)]
+    
+    def slopes(self):
+        """slopes[i][j]: expected change in criterion j per point gained in criterion i"""
+        return [[value / row[i] if row[i] > 0 else float(i == j) for j, value in enumerate(row)]
+                for i, row in enumerate(self.comoment)]
+    
+    def to_state(self):
+        return {'count': self.count, 'mean': list(self.mean), 'comoment': [list(row) for row in self.comoment]}
+    
+    @classmethod
+    def from_state(cls, state):
+        moments = cls(len(state['mean']))
+        moments.count = state['count']
+        moments.mean = list(state['mean'])
+        moments.comoment = [list(row) for row in state['comoment']]
+        return moments
+
+
+class CovarianceSnapshot:
+    """Correlations, regression slopes and means of one scope, derived once per population change"""
+    
+    __slots__ = ('scope', 'count', 'criteria', 'mean', 'correlation', 'slopes')
+    
+    def __init__(self, scope, criteria, moments):
+        self.scope = scope
+        self.count = moments.count
+        self.criteria = criteria
+        self.mean = tuple(moments.mean)
+        self.correlation = moments.correlation()
+        self.slopes = moments.slopes()
+
+
+class SkillCovariance:
+    """
+    Criterion covariance learned from every evaluation, per department.
+    
+    Each observation updates the workforce accumulator and its department's,
+    O(k^2) each. A lookup uses the department once it has min_samples
+    evaluations, then the workforce, and returns None before that. Derived
+    matrices are cached per scope until the next observation in it.
+    Accumulators from separate workers combine with merge() or via
+    to_state()/from_state().
+    """
+    
+    def __init__(self, criteria, min_samples=30):
+        self.criteria = tuple(criteria)
+        self.min_samples = min_samples
+        self.groups = {}
+        self._snapshots = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def scopes(department=None):
+        return [department, None] if department is not None else [None]
+    
+    def observe(self, scores, department=None):
+        """Fold in one evaluation; scores missing any criterion are skipped"""
+        try:
+            values = [float(scores[name]) for name in self.criteria]
+        except KeyError:
+            return
+        with self._lock:
+            for scope in self.scopes(department):
+                self.groups.setdefault(scope, RunningCovariance(len(self.criteria))).update(values)
+                self._snapshots.pop(scope, None)
+    
+    def snapshot(self, department=None):
+        """Snapshot of the most specific scope with enough evaluations, or None"""
+        for scope in self.scopes(department):
+            moments = self.groups.get(scope)
+            if moments is None or moments.count < self.min_samples:
+                continue
+            snapshot = self._snapshots.get(scope)
+            if snapshot is None:
+                with self._lock:
+                    snapshot = self._snapshots[scope] = CovarianceSnapshot(scope, self.criteria, moments)
+            return snapshot
+        return None
+    
+    def load(self, department, moments):
+        with self._lock:
+            self.groups.setdefault(department, RunningCovariance(len(self.criteria))).merge(moments)
+            self._snapshots.pop(department, None)
+    
+    def merge(self, other):
+        if other.criteria != self.criteria:
+            raise ValueError('Cannot merge covariance over different criteria')
+        with self._lock:
+            for scope, moments in other.groups.items():
+                self.groups.setdefault(scope, RunningCovariance(len(self.criteria))).merge(moments)
+            self._snapshots.clear()
+        return self
+    
+    def to_state(self):
+        return {'criteria': list(self.criteria),
+                'groups': [{'department': scope, **moments.to_state()} for scope, moments in self.groups.items()]}
+    
+    @classmethod
+    def from_state(cls, state, min_samples=30):
+        covariance = cls(state['criteria'], min_samples)
+        for entry in state['groups']:
+            covariance.groups[entry['department']] = RunningCovariance.from_state(entry)
+        return covariance
@@ -0,0 +1,25 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+# The app reads its configuration at import time, so point it at a scratch store first
+SCRATCH = tempfile.mkdtemp(prefix='evaluation-tests-')
+os.environ['EVALUATION_DB_PATH'] = os.path.join(SCRATCH, 'evaluations.db')
+os.environ['EVALUATION_JOBS_DIR'] = os.path.join(SCRATCH, 'jobs')
+os.environ['EVALUATION_ARCHIVE_DIR'] = os.path.join(SCRATCH, 'archive')
+
+
+@pytest.fixture
+def app_module():
+    import app
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
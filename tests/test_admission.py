@@ -0,0 +1,40 @@
+import pytest
+
+from admission import AdmissionQueue, Overloaded
+
+CRITERIA = ('quality_of_work', 'productivity', 'teamwork', 'communication', 'initiative')
+
+
+def test_full_queue_is_shed_with_429():
+    queue = AdmissionQueue(concurrency=1, max_queue=0)
+    with queue.admit():
+        with pytest.raises(Overloaded) as shed:
+            with queue.admit():
+                pass
+    assert shed.value.status == 429 and shed.value.retry_after >= 1
+    assert queue.stats()['shed'] == {'queue_full': 1, 'timeout': 0}
+
+
+def test_wait_past_max_wait_is_shed_with_503():
+    queue = AdmissionQueue(concurrency=1, max_queue=1, max_wait=0.01)
+    with queue.admit():
+        with pytest.raises(Overloaded) as shed:
+            with queue.admit():
+                pass
+    assert shed.value.status == 503
+    assert queue.stats()['shed'] == {'queue_full': 0, 'timeout': 1} and queue.depth == 0
+    
+    # The slot is free again once the holder is done
+    with queue.admit() as waited:
+        assert waited >= 0
+
+
+def test_saturated_endpoint_answers_429_with_retry_after(client, app_module, monkeypatch):
+    queue = AdmissionQueue(concurrency=1, max_queue=0)
+    monkeypatch.setattr(app_module, 'admission', queue)
+    with queue.admit():
+        response = client.post('/what-if', json={'scores': dict.fromkeys(CRITERIA, 5), 'vary': ['teamwork']})
+    
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    assert 'error' in response.get_json()
@@ -0,0 +1,27 @@
+import json
+
+import numpy as np
+import pytest
+
+from evaluation_ai import evaluator
+
+
+def comparable(result):
+    """JSON round trip (NumPy scalars become floats) without the per-call timestamp"""
+    result = dict(result)
+    result.pop('evaluation_timestamp', None)
+    return json.loads(json.dumps(result, default=float))
+
+
+@pytest.mark.parametrize('tenure_months', [0, 6, 7, 12, 24, 37])
+def test_batch_matches_one_by_one_evaluation(tenure_months):
+    criteria = list(evaluator.performance_criteria)
+    rows = np.random.default_rng(tenure_months).integers(1, 11, size=(200, len(criteria)))
+    rows[:2] = [[1] * len(criteria), [10] * len(criteria)]
+    
+    batch = evaluator.evaluate_batch(rows, tenure_months)
+    
+    assert len(batch) == len(rows)
+    for row, result in zip(rows.tolist(), batch):
+        single = evaluator.evaluate_performance(dict(zip(criteria, row)), tenure_months)
+        assert comparable(result) == comparable(single)
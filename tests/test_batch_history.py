@@ -0,0 +1,98 @@
+import json
+
+CRITERIA = ('quality_of_work', 'productivity', 'teamwork', 'communication', 'initiative')
+PRIOR_REVIEWS = (9, 8, 6, 4)
+
+# Fields computed from the employee's stored history rather than from the population
+HISTORY_FIELDS = ('performance_trajectory', 'predicted_next_score', 'forecast_interval', 'growth_rate',
+                  'learning_velocity', 'criterion_trends', 'burnout_risk', 'attrition_risk',
+                  'performance_volatility', 'mitigation_recommendations')
+
+
+def evaluate(client, employee_id, score):
+    form = dict.fromkeys(CRITERIA, str(score))
+    form.update(employee_id=employee_id, tenure_months='24')
+    return client.post('/evaluate', data=form).get_json()
+
+
+def batch_row(employee_id, score):
+    return {'employee_id': employee_id, 'tenure_months': 24, 'scores': dict.fromkeys(CRITERIA, score)}
+
+
+def history_fields(result):
+    return {field: result[field] for field in HISTORY_FIELDS}
+
+
+def test_batch_matches_single_evaluation_with_history(client):
+    for employee_id in ('HIST-SINGLE', 'HIST-BATCH'):
+        for score in PRIOR_REVIEWS:
+            evaluate(client, employee_id, score)
+    
+    single = evaluate(client, 'HIST-SINGLE', 3)
+    batch = client.post('/evaluate/batch', json={'employees': [batch_row('HIST-BATCH', 3)]}).get_json()['results'][0]
+    
+    assert history_fields(batch) == history_fields(single)
+    assert batch['performance_trajectory']['trend'] == 'Declining'
+    assert batch['burnout_risk']['risk_level'] == 'High'
+    assert batch['predicted_next_score'] < 3
+
+
+def test_repeated_employee_in_one_batch_sees_its_earlier_rows(client):
+    for score in PRIOR_REVIEWS + (3,):
+        single = evaluate(client, 'REPEAT-SINGLE', score)
+    
+    rows = [batch_row('REPEAT-BATCH', score) for score in PRIOR_REVIEWS + (3,)]
+    results = client.post('/evaluate/batch', json={'employees': rows}).get_json()['results']
+    
+    assert history_fields(results[-1]) == history_fields(single)
+    assert results[-1]['performance_trajectory']['cycles'] == len(rows)
+
+
+def test_import_scores_with_stored_history(client):
+    for employee_id in ('IMPORT-SINGLE', 'IMPORT-BATCH'):
+        for score in PRIOR_REVIEWS:
+            evaluate(client, employee_id, score)
+    
+    single = evaluate(client, 'IMPORT-SINGLE', 3)
+    response = client.post('/evaluate/import', data=json.dumps(batch_row('IMPORT-BATCH', 3)) + '\n',
+                           content_type='application/x-ndjson')
+    imported = json.loads(response.get_data(as_text=True).splitlines()[0])
+    
+    assert history_fields(imported) == history_fields(single)
+
+
+def test_department_report_rescoring_uses_history_before_each_row(app_module):
+    store = app_module.evaluation_store
+    for score in PRIOR_REVIEWS + (3,):
+        single = app_module.evaluation_ai.evaluator.evaluate_performance(
+            dict.fromkeys(CRITERIA, score), 24, trajectory=store.trajectory('REPORT-1'))
+        single.update(employee_id='REPORT-1', department='History Dept', tenure_months=24)
+        store.add(single)
+    
+    evaluator = app_module.cache_for('History Dept').evaluator
+    rescored = [result for results in app_module.department_reports._scored(evaluator, 'History Dept', None)
+                for result in results]
+    
+    assert len(rescored) == 1
+    assert history_fields(rescored[0]) == history_fields(single)
+
+
+def observed(evaluator):
+    """(percentile sketch, peer benchmark, skill covariance) observation counts over everyone"""
+    sketch = evaluator.percentiles.sketches.get((None, None))
+    peers = evaluator.benchmarks.groups.get(('all', None))
+    covariance = evaluator.skill_correlations.groups.get(None)
+    return tuple(part.total if part is sketch else part.count if part is not None else 0
+                 for part in (sketch, peers, covariance))
+
+
+def test_every_round_of_a_repeating_batch_is_observed(app_module, client):
+    evaluator = app_module.default_cache().evaluator
+    stored, before = app_module.evaluation_store.count(), observed(evaluator)
+    rows = [batch_row(f'ROUNDS-{index % 7}', 1 + index % 10) for index in range(30)]
+    
+    response = client.post('/evaluate/batch', json={'employees': rows}).get_json()
+    
+    assert response['count'] == len(rows)
+    assert app_module.evaluation_store.count() - stored == len(rows)
+    assert [after - count for after, count in zip(observed(evaluator), before)] == [len(rows)] * 3
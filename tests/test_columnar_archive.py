@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+import columnar_archive
+from columnar_archive import ColumnarArchive
+
+
+class Store:
+    """The slice of EvaluationStore a sync reads"""
+    
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def columns_since(self, last_id, limit):
+        return [row for row in self.rows if row[0] > last_id][:limit]
+
+
+def row(row_id, department, period, overall, ready):
+    return (row_id, department, period, 24, overall, 'Meets Expectations', ready, json.dumps({'teamwork': 6}))
+
+
+ROWS = [row(1, 'Eng', 'Q1 2024', 8.0, 1), row(2, 'Eng', 'Q2 2024', 6.0, 0),
+        row(3, 'Sales', 'Q1 2024', 4.0, None), row(4, 'Eng', 'Q1 2024', 6.0, 1)]
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = ColumnarArchive(str(tmp_path))
+    archive.sync(Store(ROWS))
+    return archive
+
+
+def test_groups_are_the_combinations_present(archive, monkeypatch):
+    # Small scan blocks so groups found in later blocks are merged into earlier ones
+    monkeypatch.setattr(columnar_archive, 'SCAN_BLOCK', 3)
+    result = archive.aggregate('overall_score', ('department', 'period', 'promotion_ready'), histogram_bins=2)
+    
+    groups = [(group['department'], group['period'], group['promotion_ready'], group['count'], group['mean'])
+              for group in result['groups']]
+    assert groups == [('Eng', 'Q1 2024', True, 2, 7.0), ('Eng', 'Q2 2024', False, 1, 6.0),
+                      ('Sales', 'Q1 2024', None, 1, 4.0)]
+    assert result['groups'][0]['histogram']['counts'] == [0, 2]
+
+
+def test_histograms_over_too_many_groups_are_refused(archive, monkeypatch):
+    monkeypatch.setattr(columnar_archive, 'MAX_HISTOGRAM_GROUPS', 2)
+    with pytest.raises(ValueError, match='limited to 2 groups'):
+        archive.aggregate('overall_score', ('department', 'period'), histogram_bins=4)
+    assert len(archive.aggregate('overall_score', ('department', 'period'))['groups']) == 3
+
+
+def test_queries_read_a_snapshot_of_the_manifest(archive):
+    snapshot = archive.snapshot()
+    archive.manifest['dictionaries']['department'].append('Half-appended')
+    archive.manifest['rows'] += 1
+    
+    assert snapshot['rows'] == 4
+    assert 'Half-appended' not in snapshot['dictionaries']['department']
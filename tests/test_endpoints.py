@@ -0,0 +1,84 @@
+import json
+import time
+
+CRITERIA = ('quality_of_work', 'productivity', 'teamwork', 'communication', 'initiative')
+
+# Moves 0.05 of weight from initiative (0.2) to teamwork (0.15)
+OVERRIDES = {'performance_criteria': {'teamwork': {'weight': 0.2}, 'initiative': {'weight': 0.15}}}
+
+
+def evaluate(client, employee_id, department, scores):
+    form = {name: str(scores.get(name, 6)) for name in CRITERIA}
+    form.update(employee_id=employee_id, department=department, tenure_months='24')
+    return client.post('/evaluate', data=form).get_json()
+
+
+def test_what_if_varies_one_criterion_over_its_range(client):
+    response = client.post('/what-if', json={'scores': dict.fromkeys(CRITERIA, 5), 'vary': ['teamwork'],
+                                             'tenure_months': 18})
+    result = response.get_json()
+    
+    assert response.status_code == 200
+    assert result['values'] == list(range(1, 11)) and result['shape'] == [10]
+    surface = result['surface']['overall_score']
+    assert surface[4] == result['base']['overall_score'] == 5.0
+    assert surface == sorted(surface) and surface[0] < surface[-1]
+    
+    lean = client.post('/what-if', json={'scores': dict.fromkeys(CRITERIA, 5), 'vary': 'teamwork', 'surface': False})
+    assert 'surface' not in lean.get_json()
+
+
+def test_what_if_rejects_unknown_criteria(client):
+    response = client.post('/what-if', json={'scores': dict.fromkeys(CRITERIA, 5), 'vary': ['charisma']})
+    assert 'error' in response.get_json()
+
+
+def test_rescore_job_rescores_stored_evaluations(client):
+    stored = evaluate(client, 'RESCORE-1', 'Rescore', {'teamwork': 10, 'initiative': 2})
+    
+    status = client.post('/jobs/rescore', json={'overrides': OVERRIDES, 'chunk_size': 2}).get_json()
+    for _ in range(300):
+        status = client.get(f"/jobs/{status['job_id']}").get_json()
+        if status['status'] != 'running':
+            break
+        time.sleep(0.1)
+    assert status['status'] == 'completed' and status['progress'] == 1.0
+    
+    results = client.get(f"/jobs/{status['job_id']}/results")
+    assert results.status_code == 200
+    rows = [row for row in map(json.loads, results.get_data(as_text=True).splitlines())
+            if row['employee_id'] == 'RESCORE-1']
+    assert len(rows) == 1
+    assert rows[0]['previous_overall_score'] == stored['overall_score']
+    assert rows[0]['overall_score'] > stored['overall_score']
+
+
+def test_unknown_job_is_not_found(client):
+    assert client.get('/jobs/no-such-job').status_code == 404
+
+
+def test_analytics_groups_the_archive(client):
+    for index, score in enumerate((4, 6, 8)):
+        evaluate(client, f'ANALYTICS-{index}', 'Analytics', dict.fromkeys(CRITERIA, score))
+    
+    result = client.get('/analytics?by=department&department=Analytics&histogram=2').get_json()
+    
+    assert result['matched'] == 3
+    (group,) = result['groups']
+    assert group['department'] == 'Analytics' and group['count'] == 3
+    assert group['mean'] == 6.0 and group['histogram']['counts'] == [1, 2]
+    assert 'error' in client.get('/analytics?metric=charisma').get_json()
+
+
+def test_department_report_covers_each_employee(client):
+    for index in range(2):
+        evaluate(client, f'REPORT-{index}', 'Reports', dict.fromkeys(CRITERIA, 7))
+    
+    html = client.get('/reports/department?department=Reports')
+    assert html.status_code == 200 and html.mimetype == 'text/html'
+    body = html.get_data(as_text=True)
+    assert 'REPORT-0' in body and 'REPORT-1' in body
+    
+    packet = client.get('/reports/department?department=Reports&format=zip')
+    assert packet.mimetype == 'application/zip' and packet.get_data().startswith(b'PK')
+    assert 'error' in client.get('/reports/department?department=Nobody').get_json()
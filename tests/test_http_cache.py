@@ -0,0 +1,43 @@
+CRITERIA = ('quality_of_work', 'productivity', 'teamwork', 'communication', 'initiative')
+
+
+def form(employee_id, score):
+    data = dict.fromkeys(CRITERIA, str(score))
+    data.update(employee_id=employee_id, tenure_months='24')
+    return data
+
+
+def stored(app_module, employee_id):
+    return len(app_module.evaluation_store.history(employee_id))
+
+
+def test_identical_resubmission_is_not_modified(client, app_module):
+    first = client.post('/evaluate', data=form('ETAG-SAME', 7))
+    assert first.status_code == 200
+    
+    again = client.post('/evaluate', data=form('ETAG-SAME', 7), headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert stored(app_module, 'ETAG-SAME') == 1
+
+
+def test_new_history_invalidates_the_client_copy(client, app_module):
+    first = client.post('/evaluate', data=form('ETAG-HIST', 7))
+    client.post('/evaluate', data=form('ETAG-HIST', 3))
+    
+    # The trajectory now includes the 3, so the earlier response is stale
+    again = client.post('/evaluate', data=form('ETAG-HIST', 7), headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 200
+    assert again.headers['ETag'] != first.headers['ETag']
+    assert stored(app_module, 'ETAG-HIST') == 3
+
+
+def test_batch_resubmission_after_other_evaluations_is_rescored(client):
+    payload = {'employees': [{'employee_id': 'ETAG-BATCH', 'tenure_months': 24,
+                              'scores': dict.fromkeys(CRITERIA, 6)}]}
+    first = client.post('/evaluate/batch', json=payload)
+    again = client.post('/evaluate/batch', json=payload, headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    
+    client.post('/evaluate', data=form('ETAG-BATCH', 2))
+    after = client.post('/evaluate/batch', json=payload, headers={'If-None-Match': first.headers['ETag']})
+    assert after.status_code == 200
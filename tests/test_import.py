@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+SCORES = {'quality_of_work': 7, 'communication': 8, 'teamwork': 6, 'initiative': 7, 'productivity': 9}
+
+
+def import_ndjson(client, rows):
+    body = ''.join((row if isinstance(row, str) else json.dumps(row)) + '\n' for row in rows)
+    response = client.post('/evaluate/import', data=body, content_type='application/x-ndjson')
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+@pytest.mark.parametrize('bad_row', [
+    {'employee_id': 'IMP-BAD', 'scores': dict(SCORES, teamwork=None)},
+    {'employee_id': 'IMP-BAD', 'scores': dict(SCORES, teamwork=[7])},
+    {'employee_id': 'IMP-BAD', 'scores': dict(SCORES, teamwork={'value': 7})},
+    {'employee_id': 'IMP-BAD', 'scores': dict(SCORES, teamwork=7.9)},
+    {'employee_id': 'IMP-BAD', 'scores': dict(SCORES, teamwork=True)},
+    {'employee_id': 'IMP-BAD', 'scores': [7, 8, 6, 7, 9]},
+    {'employee_id': 'IMP-BAD', 'scores': 'excellent'},
+    {'employee_id': 'IMP-BAD', 'scores': SCORES, 'tenure_months': None},
+    {'employee_id': 'IMP-BAD', 'scores': SCORES, 'department': ['Engineering']},
+])
+def test_malformed_row_is_reported_and_the_rest_of_the_chunk_is_scored(client, bad_row):
+    lines = import_ndjson(client, [
+        {'employee_id': 'IMP-1', 'scores': SCORES},
+        bad_row,
+        {'employee_id': 'IMP-2', 'scores': SCORES, 'tenure_months': 0}
+    ])
+    
+    assert [line.get('row') for line in lines[:3]] == [1, 2, 3]
+    assert lines[0]['employee_id'] == 'IMP-1'
+    assert 'error' in lines[1] and 'overall_score' not in lines[1]
+    assert lines[2]['employee_id'] == 'IMP-2' and lines[2]['tenure_months'] == 0
+    assert lines[3] == {'summary': {'rows': 3, 'scored': 2, 'errors': 1}}
+
+
+def test_fractional_score_is_rejected_not_truncated(client):
+    lines = import_ndjson(client, [{'employee_id': 'IMP-3', 'scores': dict(SCORES, teamwork=7.9)}])
+    assert lines[0] == {'row': 1, 'error': 'teamwork must be a whole number, got 7.9'}
+
+
+def test_integral_float_and_numeric_string_scores_are_accepted(client):
+    lines = import_ndjson(client, [{'employee_id': 'IMP-4', 'scores': dict(SCORES, teamwork=6.0, initiative='7')}])
+    assert lines[0]['detailed_scores']['teamwork'] == 6
+    assert lines[0]['detailed_scores']['initiative'] == 7
+    assert lines[1]['summary']['errors'] == 0
+
+
+def test_batch_rejects_malformed_employee_with_its_index(client):
+    response = client.post('/evaluate/batch', json={'employees': [{'scores': SCORES}, {'scores': None}]})
+    assert response.get_json() == {'error': 'employees[1]: scores must be an object'}
@@ -0,0 +1,26 @@
+from metrics import Metrics, admission_collector
+
+
+class Queue:
+    def stats(self):
+        return {'queue_depth': 0, 'active': 1, 'concurrency': 4, 'admitted': 9, 'wait_seconds': 0.5,
+                'service_seconds': 0.01, 'shed': {'queue_full': 2, 'timeout': 3}}
+
+
+class Flight:
+    coalesced = 0
+    
+    def in_flight(self):
+        return 0
+
+
+def test_labelled_collector_samples_share_one_header():
+    metrics = Metrics(enabled=True)
+    metrics.collect(admission_collector(Queue(), Flight()))
+    lines = metrics.render().splitlines()
+    
+    type_lines = [line for line in lines if line.startswith('# TYPE ')]
+    assert len(type_lines) == len(set(type_lines))
+    start = lines.index('# TYPE admission_shed_total counter')
+    assert lines[start + 1:start + 3] == ['admission_shed_total{reason="queue_full"} 2',
+                                          'admission_shed_total{reason="timeout"} 3']
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from rubrics import RubricRegistry, default_rubric
+
+
+@pytest.mark.parametrize('overrides', [
+    {'teamwork': {'weight': 0.3}},
+    {'teamwork': {'weight': 5}},
+    {'teamwork': {'weight': 0}},
+    {'teamwork': {'weight': -0.15}, 'initiative': {'weight': 0.5}},
+    {'teamwork': {'weight': '0.15'}}
+])
+def test_overrides_must_keep_positive_weights_summing_to_one(overrides):
+    with pytest.raises(ValueError):
+        default_rubric().with_overrides(overrides)
+
+
+def test_balanced_override_is_accepted():
+    rubric = default_rubric().with_overrides({'teamwork': {'weight': 0.2}, 'initiative': {'weight': 0.15}})
+    assert rubric.weight_of['teamwork'] == 0.2 and sum(rubric.weights) == pytest.approx(1.0)
+
+
+def test_rescore_job_with_unbalanced_weights_is_rejected(client):
+    response = client.post('/jobs/rescore', json={'overrides': {'performance_criteria': {'teamwork': {'weight': 0.3}}}})
+    assert response.status_code == 400
+    assert 'must sum to 1' in response.get_json()['error']
+
+
+def test_rubric_file_with_unbalanced_weights_is_rejected(tmp_path):
+    with open(tmp_path / 'default.json', 'w') as handle:
+        json.dump(default_rubric().config, handle)
+    with open(tmp_path / 'eng.json', 'w') as handle:
+        json.dump({'name': 'eng', 'departments': ['Engineering'],
+                   'criteria': [{'name': 'code_quality', 'weight': 0.7}, {'name': 'delivery', 'weight': 0.7}]},
+                  handle)
+    with pytest.raises(ValueError, match='must sum to 1'):
+        RubricRegistry(str(tmp_path))
+
+
+def write_rubrics(directory, eng_weights):
+    with open(directory / 'default.json', 'w') as handle:
+        json.dump(default_rubric().config, handle)
+    with open(directory / 'eng.json', 'w') as handle:
+        json.dump({'name': 'eng', 'departments': ['Engineering'],
+                   'criteria': [{'name': 'code_quality', 'weight': eng_weights[0]},
+                                {'name': 'delivery', 'weight': eng_weights[1]}]}, handle)
+
+
+def test_reload_evicts_the_superseded_version(tmp_path):
+    write_rubrics(tmp_path, (0.6, 0.4))
+    registry = RubricRegistry(str(tmp_path))
+    before = registry.for_department('Engineering').version
+    
+    write_rubrics(tmp_path, (0.5, 0.5))
+    assert registry.reload()
+    after = registry.for_department('Engineering').version
+    
+    assert after != before
+    assert set(registry.versions) == {registry.default.version, after}
+    with pytest.raises(ValueError):
+        registry.get(before)
+
+
+def test_reload_endpoint_evicts_the_superseded_cache(client, app_module, tmp_path, monkeypatch):
+    write_rubrics(tmp_path, (0.6, 0.4))
+    monkeypatch.setattr(app_module, 'rubric_registry', RubricRegistry(str(tmp_path)))
+    before = app_module.cache_for('Engineering').evaluator.rubric.version
+    
+    write_rubrics(tmp_path, (0.5, 0.5))
+    assert client.post('/rubrics/reload').get_json()['changed']
+    after = app_module.cache_for('Engineering').evaluator.rubric.version
+    
+    assert before not in app_module.rubric_caches and after in app_module.rubric_caches
+    assert client.get('/rubrics').get_json()['cached_versions'] == sorted({app_module.rubric_registry.default.version,
+                                                                           after})